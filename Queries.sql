@@ -1,3 +1,5 @@
+-- Base schema and sample data. Later schema changes live in migrations/ and are
+-- applied only by migrate.py; FarmerMainWindow warns at startup when some are pending.
 DROP DATABASE IF EXISTS farmer_schema;
 Create database farmer_schema;
 use farmer_schema;
@@ -81,6 +83,22 @@ CREATE TABLE SeasonalAnalysis (
     FOREIGN KEY (ProductID) REFERENCES Product(ProductID)
 );
 
+CREATE TABLE SaleRollupProduct (
+    ProductID INT PRIMARY KEY,
+    TotalUnitsSold BIGINT NOT NULL DEFAULT 0,
+    TotalRevenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (ProductID) REFERENCES Product(ProductID)
+);
+
+CREATE TABLE SaleRollupDaily (
+    ProductID INT,
+    SaleDate DATE,
+    UnitsSold BIGINT NOT NULL DEFAULT 0,
+    Revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (ProductID, SaleDate),
+    FOREIGN KEY (ProductID) REFERENCES Product(ProductID)
+);
+
 -- Insert data into Users
 INSERT INTO Users (id, username, role, created_at) VALUES
 (1, 'jdoe', 'admin', '2023-01-15'),
@@ -158,3 +176,14 @@ INSERT INTO SeasonalAnalysis (SeasonID, ProductID, DemandTrend, SeasonalPeakPeri
 (4, 4, 'Very High Demand', 'Summer'),
 (5, 5, 'High Demand', 'Fall'),
 (6, 6, 'Moderate Demand', 'Summer');
+
+-- Backfill the sales rollups from the rows above
+INSERT INTO SaleRollupProduct (ProductID, TotalUnitsSold, TotalRevenue)
+SELECT ProductID, COALESCE(SUM(QuantitySold), 0), COALESCE(SUM(TotalPrice), 0)
+FROM Sale
+GROUP BY ProductID;
+
+INSERT INTO SaleRollupDaily (ProductID, SaleDate, UnitsSold, Revenue)
+SELECT ProductID, SaleDate, COALESCE(SUM(QuantitySold), 0), COALESCE(SUM(TotalPrice), 0)
+FROM Sale
+GROUP BY ProductID, SaleDate;
@@ -1,29 +1,142 @@
-import mysql.connector
-from mysql.connector import Error
 import sys
-from PyQt5.QtCore import QSize, Qt
+
+from startup_report import StartupReport
+
+# Installed before the heavy imports below so --startup-report can time them
+startup_report = StartupReport.from_argv(sys.argv)
+
+from mysql.connector import Error
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from PyQt5.QtCore import QSize, Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QColor, QPixmap, QFont
 from PyQt5.QtWidgets import (QHBoxLayout, QLabel, QMessageBox, QPushButton,
                              QToolButton, QVBoxLayout, QWidget, QMainWindow, QScrollArea,
-                             QLineEdit, QDialog, QTableWidget, QTableWidgetItem, QHeaderView,
-                             QInputDialog, QComboBox)
+                             QLineEdit, QDialog, QInputDialog, QComboBox, QCheckBox, QFileDialog,
+                             QProgressDialog)
 
 
 from PyQt5.QtWidgets import QApplication
 
-from farmer import FarmerMainWindow
+from db_pool import RETRYABLE_LOCK_ERRORS, ConnectionPool
+from farmer_queries import (INVENTORY_BY_ID_SQL, INVENTORY_LEVELS_SQL, PRODUCT_BY_ID_SQL, RESTOCK_ALERTS_SQL,
+                            UPDATE_INVENTORY_SQL, UPDATE_PRODUCT_SQL)
+from keyset import page_query, quote_identifier
+from local_replica import DEFAULT_REPLICA_PATH, LocalReplica, ReplicaSyncer
+from reference_cache import ReferenceCache
+from sales_timeseries import SQLITE_BUCKETS, timeseries_query
+from query_executor import QueryExecutor
+from query_stats import DEFAULT_SLOW_QUERY_THRESHOLD, QueryStats
+from query_stats_panel import QueryStatsPanel
+from table_browser import TableBrowser
+from table_export import TableExporter, describe_result
+from table_model import DEFAULT_CHUNK_SIZE, LazyTableModel
+
+# Relative, so concurrent sales of the same product never overwrite each other;
+# only a row that still holds the quantity qualifies, so stock never goes negative
+DECREMENT_STOCK_SQL = (
+    "UPDATE Inventory SET QuantityInStock = QuantityInStock - %s "
+    "WHERE ProductID = %s AND VendorID = %s AND QuantityInStock >= %s ORDER BY InventoryID LIMIT 1"
+)
+
+# ER_SIGNAL_EXCEPTION, as a stock-check trigger would report it, so callers
+# treat a sale with no stock behind it like any other row the server refuses
+INSUFFICIENT_STOCK_ERROR = 1644
+
+DEADLOCK_RETRIES = 3
+DEADLOCK_BACKOFF = 0.02
+
+SALE_ROLLUP_PRODUCT_SQL = (
+    "INSERT INTO SaleRollupProduct (ProductID, TotalUnitsSold, TotalRevenue) "
+    "VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE "
+    "TotalUnitsSold = TotalUnitsSold + VALUES(TotalUnitsSold), "
+    "TotalRevenue = TotalRevenue + VALUES(TotalRevenue)"
+)
+
+SALE_ROLLUP_DAILY_SQL = (
+    "INSERT INTO SaleRollupDaily (ProductID, SaleDate, UnitsSold, Revenue) "
+    "VALUES (%s, %s, %s, %s) ON DUPLICATE KEY UPDATE "
+    "UnitsSold = UnitsSold + VALUES(UnitsSold), "
+    "Revenue = Revenue + VALUES(Revenue)"
+)
+
+
+# Reference tables served from the in-process cache: table -> primary key column
+REFERENCE_TABLES = {
+    "Product": "ProductID",
+    "Vendor": "VendorID",
+    "Customer": "CustomerID",
+}
+
+REFERENCE_BY_ID_SQL = {
+    "Product": PRODUCT_BY_ID_SQL,
+    "Vendor": "SELECT * FROM Vendor WHERE VendorID = %s",
+    "Customer": "SELECT * FROM Customer WHERE CustomerID = %s",
+}
+
+
+class InsufficientStockError(Error):
+    def __init__(self, product_id, vendor_id, quantity):
+        super().__init__(msg=f"Not enough stock of product {product_id} from vendor {vendor_id} to sell {quantity}.",
+                         errno=INSUFFICIENT_STOCK_ERROR)
+
+
+def _sale_product_vendors(columns, rows):
+    product_index = columns.index("ProductID")
+    vendor_index = columns.index("VendorID")
+    return {(row[product_index], row[vendor_index]) for row in rows}
+
+
+@lru_cache(maxsize=256)
+def insert_sql(table, columns):
+    # Same (table, columns) always yields the same string object, which is
+    # what lets a cached prepared statement be reused without re-preparing
+    placeholders = ", ".join(["%s"] * len(columns))
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
 
 class DatabaseConnection:
-    def __init__(self):
-        self.connection = None
+    def __init__(self, min_pool_size=1, max_pool_size=8, idle_timeout=300, reference_ttl=300,
+                 slow_query_threshold=DEFAULT_SLOW_QUERY_THRESHOLD):
+        self.pool = None
+        self.min_pool_size = min_pool_size
+        self.max_pool_size = max_pool_size
+        self.idle_timeout = idle_timeout
+        self._column_cache = {}
+        self.reference_cache = ReferenceCache(ttl=reference_ttl)
+        self.query_stats = QueryStats(slow_threshold=slow_query_threshold)
+        self._use_lock = threading.Lock()
+        self.use_statements_sent = 0
+        self.use_statements_saved = 0
+        self.prepared_hits = 0
+        self.prepared_misses = 0
+        self.prepared_evictions = 0
+        self.deadlock_retries = 0
+        # Connections each running job has borrowed, so a cancelled job's
+        # statement can be interrupted with KILL QUERY
+        self._current_job = threading.local()
+        self._job_connections = {}
+        self._kill_connection = None
+        self._kill_lock = threading.Lock()
+        self._inventory_listeners = []
         
     def connect(self, host, username, password, database=None):
         try:
-            self.connection = mysql.connector.connect(
-                host=host,
-                user=username,
-                password=password,
-                database=database
+            self.pool = ConnectionPool(
+                {
+                    "host": host,
+                    "user": username,
+                    "password": password,
+                    "database": database
+                },
+                min_size=max(self.min_pool_size, 1),
+                max_size=self.max_pool_size,
+                idle_timeout=self.idle_timeout,
+                query_stats=self.query_stats
             )
             print("Successfully connected to database server")
             return True
@@ -32,164 +145,1022 @@ class DatabaseConnection:
             return False
             
     def close(self):
-        if self.connection:
-            self.connection.close()
+        if self.pool:
+            stats = self.round_trip_stats()
+            print(f"USE statements sent: {stats['use_statements_sent']}, "
+                  f"round trips saved: {stats['round_trips_saved']}")
+            print(f"Prepared statements: {stats['prepared_hits']} hits, "
+                  f"{stats['prepared_misses']} misses, {stats['prepared_evictions']} evictions")
+            if stats["deadlock_retries"]:
+                print(f"Transactions retried after deadlock/lock timeout: {stats['deadlock_retries']}")
+            reference = self.reference_cache.stats()
+            print(f"Reference cache: {reference['hits']} hits, {reference['misses']} misses")
+            self.pool.close()
+        with self._kill_lock:
+            if self._kill_connection is not None:
+                try:
+                    self._kill_connection.close()
+                except Error:
+                    pass
+                self._kill_connection = None
+        self.query_stats.close()
+
+    @contextmanager
+    def job(self, job_key):
+        """Attribute the connections borrowed on this thread to job_key until the block ends."""
+        previous = getattr(self._current_job, "key", None)
+        self._current_job.key = job_key
+        try:
+            yield
+        finally:
+            self._current_job.key = previous
+            with self._use_lock:
+                self._job_connections.pop(job_key, None)
+
+    @contextmanager
+    def borrow(self):
+        with self.pool.connection() as connection:
+            job_key = getattr(self._current_job, "key", None)
+            if job_key is not None:
+                with self._use_lock:
+                    self._job_connections.setdefault(job_key, []).append(connection.connection_id)
+            try:
+                yield connection
+            finally:
+                if job_key is not None:
+                    with self._use_lock:
+                        borrowed = self._job_connections.get(job_key, [])
+                        if connection.connection_id in borrowed:
+                            borrowed.remove(connection.connection_id)
+
+    def kill_queries(self, job_key):
+        """Interrupt the statements job_key is running, leaving its connections open.
+
+        KILL QUERY goes over a dedicated connection outside the pool: when
+        every pooled connection is busy, which is exactly when a cancel is
+        most likely, a checkout would block the GUI thread until one frees up.
+        """
+        with self._use_lock:
+            connection_ids = list(self._job_connections.get(job_key, []))
+        if not connection_ids or not self.pool:
+            return False
+        try:
+            with self._kill_lock:
+                if self._kill_connection is None or not self._kill_connection.is_connected():
+                    self._kill_connection = self.pool.connect_unpooled()
+                cursor = self._kill_connection.cursor()
+                for connection_id in connection_ids:
+                    cursor.execute(f"KILL QUERY {int(connection_id)}")
+                cursor.close()
+            return True
+        except Error as e:
+            print(f"Error cancelling query: {e}")
+            return False
+
+    def _use(self, connection, cursor, database):
+        # Each pooled connection remembers its current schema, so USE is only
+        # sent when a borrower actually needs a different database.
+        if getattr(connection, "active_schema", None) == database:
+            with self._use_lock:
+                self.use_statements_saved += 1
+            return
+        cursor.execute(f"USE {database}")
+        connection.active_schema = database
+        with self._use_lock:
+            self.use_statements_sent += 1
+
+    def _execute_prepared(self, connection, database, sql, params):
+        # Repeated statements skip the server-side parse: the statement is
+        # prepared once per connection and then only executed
+        cache = connection.statement_cache
+        cursor, sql, hit, evicted = cache.cursor(database, sql)
+        with self._use_lock:
+            if hit:
+                self.prepared_hits += 1
+            else:
+                self.prepared_misses += 1
+            self.prepared_evictions += evicted
+        try:
+            cursor.execute(sql, params)
+        except Error:
+            cache.discard(database, sql)
+            raise
+        return cursor
+
+    def _fetch_one_dict(self, connection, database, sql, params):
+        self._use(connection, connection.cursor(), database)
+        cursor = self._execute_prepared(connection, database, sql, params)
+        rows = cursor.fetchall()
+        if not rows:
+            return None
+        return dict(zip(cursor.column_names, rows[0]))
+
+    def round_trip_stats(self):
+        with self._use_lock:
+            return {
+                "use_statements_sent": self.use_statements_sent,
+                "round_trips_saved": self.use_statements_saved,
+                "prepared_hits": self.prepared_hits,
+                "prepared_misses": self.prepared_misses,
+                "prepared_evictions": self.prepared_evictions,
+                "deadlock_retries": self.deadlock_retries
+            }
 
     def get_databases(self):
-        if self.connection:
-            cursor = self.connection.cursor()
-            cursor.execute("SHOW DATABASES")
-            return [db[0] for db in cursor.fetchall()]
+        if self.pool:
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                cursor.execute("SHOW DATABASES")
+                return [db[0] for db in cursor.fetchall()]
         return []
 
     def get_tables(self, database):
-        if self.connection:
-            cursor = self.connection.cursor()
-            cursor.execute(f"USE {database}")
-            cursor.execute("SHOW TABLES")
-            return [table[0] for table in cursor.fetchall()]
+        if self.pool:
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                self._use(connection, cursor, database)
+                cursor.execute("SHOW TABLES")
+                return [table[0] for table in cursor.fetchall()]
         return []
 
     def get_table_contents(self, database, table):
-        if self.connection:
-            cursor = self.connection.cursor()
-            cursor.execute(f"USE {database}")
-            cursor.execute(f"SELECT * FROM {table}")
-            return cursor.fetchall(), cursor.description
+        if self.pool:
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                self._use(connection, cursor, database)
+                cursor.execute(f"SELECT * FROM {table}")
+                return cursor.fetchall(), cursor.description
+        return [], []
+
+    def get_table_chunk(self, database, table, offset, limit, where=None, where_params=()):
+        if self.pool:
+            sql = f"SELECT * FROM {table}"
+            params = list(where_params)
+            if where:
+                sql += f" WHERE {where}"
+            sql += " LIMIT %s OFFSET %s"
+            params.extend((limit, offset))
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                self._use(connection, cursor, database)
+                cursor.execute(sql, params)
+                return cursor.fetchall(), cursor.description
         return [], []
+
+    def iter_table_chunks(self, database, table, chunk_size):
+        """Yield (description, rows) chunks of a whole table from an unbuffered cursor.
+
+        Rows are streamed from the server as they are fetched, so memory use
+        is bounded by chunk_size rather than the size of the table.
+        """
+        return self.iter_query_chunks(database, f"SELECT * FROM {table}", None, chunk_size)
+
+    def iter_query_chunks(self, database, sql, params, chunk_size):
+        """iter_table_chunks for an arbitrary query."""
+        if not self.pool:
+            return
+        with self.borrow() as connection:
+            cursor = connection.cursor(buffered=False)
+            self._use(connection, cursor, database)
+            cursor.execute(sql, params)
+            finished = False
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        finished = True
+                        break
+                    yield cursor.description, rows
+            finally:
+                if not finished:
+                    # Stopped early: draining the rest of the stream could take
+                    # minutes, so drop the connection instead of returning it
+                    try:
+                        connection.close()
+                    except Error:
+                        pass
+
+    def count_rows(self, database, table, where=None, where_params=()):
+        if self.pool:
+            sql = f"SELECT COUNT(*) FROM {table}"
+            if where:
+                sql += f" WHERE {where}"
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                self._use(connection, cursor, database)
+                cursor.execute(sql, list(where_params))
+                return cursor.fetchall()[0][0]
+        return 0
+
+    def get_column_info(self, database, table):
+        key = (database, table)
+        cached = self._column_cache.get(key)
+        if cached is not None:
+            return cached
+        if self.pool:
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                # Generated columns (e.g. Inventory.NeedsRestock) are computed by
+                # the server and can't be written, so they are left out here.
+                # DEFAULT_GENERATED only marks an expression default, such as
+                # CURRENT_TIMESTAMP, and that column is still writable.
+                cursor.execute(
+                    "SELECT COLUMN_NAME, COLUMN_TYPE, COLUMN_KEY FROM information_schema.COLUMNS "
+                    "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s "
+                    "AND EXTRA NOT IN ('VIRTUAL GENERATED', 'STORED GENERATED') "
+                    "ORDER BY ORDINAL_POSITION",
+                    (database, table)
+                )
+                info = cursor.fetchall()
+            if info:
+                self._column_cache[key] = info
+            return info
+        return []
+
+    def get_columns(self, database, table):
+        return [column[0] for column in self.get_column_info(database, table)]
+
+    def get_primary_key(self, database, table):
+        return [column[0] for column in self.get_column_info(database, table) if column[2] == "PRI"]
+
+    def get_page_key(self, database, table, sort_column=None):
+        # Sort column first, then the primary key to make the order total
+        primary_key = self.get_primary_key(database, table)
+        if sort_column is None:
+            return primary_key
+        return [sort_column] + [column for column in primary_key if column != sort_column]
+
+    def get_page(self, database, table, sort_column=None, descending=False, after=None,
+                 limit=DEFAULT_CHUNK_SIZE, from_end=False, where=None, where_params=()):
+        if self.pool:
+            primary_key = self.get_primary_key(database, table)
+            if not primary_key:
+                raise ValueError(f"Table {table} has no primary key to page by.")
+            key_columns = self.get_page_key(database, table, sort_column)
+            # The last page is the first page of the reversed order, flipped back
+            sql, params = page_query(table, key_columns, descending != from_end, after, limit,
+                                     not_null=set(primary_key), where=where, where_params=where_params)
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                self._use(connection, cursor, database)
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+                description = cursor.description
+            if from_end:
+                rows.reverse()
+            return rows, description
+        return [], []
+
+    def invalidate_schema(self, database, table=None):
+        if table is None:
+            for key in [key for key in self._column_cache if key[0] == database]:
+                self._column_cache.pop(key, None)
+            for reference_table in REFERENCE_TABLES:
+                self.reference_cache.invalidate(database, reference_table)
+        else:
+            self._column_cache.pop((database, table), None)
+            self._invalidate_reference(database, table)
+
+    def _invalidate_reference(self, database, table, row_id=None):
+        if table in REFERENCE_TABLES:
+            self.reference_cache.invalidate(database, table, row_id)
+
+    def flush_caches(self):
+        # Drops everything read from the server; prepared statements stay valid
+        self._column_cache.clear()
+        self.reference_cache.clear()
+
+    def has_rows(self, database, table):
+        if self.pool:
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                self._use(connection, cursor, database)
+                cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+                return bool(cursor.fetchall())
+        return False
+
+    def run_query(self, database, sql, params=None):
+        if self.pool:
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                self._use(connection, cursor, database)
+                cursor.execute(sql, params)
+                return cursor.fetchall(), cursor.description
+        return [], []
+
+    @contextmanager
+    def transaction(self, database):
+        # (connection, cursor) whose statements commit together, or roll back if the block raises
+        with self.borrow() as connection:
+            cursor = connection.cursor()
+            self._use(connection, cursor, database)
+            connection.start_transaction()
+            try:
+                yield connection, cursor
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+    def execute(self, database, sql, params=None):
+        if self.pool:
+            with self.borrow() as connection:
+                cursor = connection.cursor()
+                self._use(connection, cursor, database)
+                cursor.execute(sql, params)
+                connection.commit()
+                return cursor.rowcount
+        return 0
     
     def create_table(self, database, table_name, columns):
-        if self.connection:
+        if self.pool:
             try:
-                cursor = self.connection.cursor()
-                cursor.execute(f"USE {database}")
-                
-                # Create column definitions
-                column_defs = ", ".join([f"{name} {type}" for name, type in columns])
-                query = f"CREATE TABLE {table_name} ({column_defs})"
-                
-                cursor.execute(query)
-                self.connection.commit()
-                return True
+                with self.borrow() as connection:
+                    cursor = connection.cursor()
+                    self._use(connection, cursor, database)
+                    
+                    # Create column definitions
+                    column_defs = ", ".join([f"{name} {type}" for name, type in columns])
+                    query = f"CREATE TABLE {table_name} ({column_defs})"
+                    
+                    cursor.execute(query)
+                    connection.commit()
+                    self.invalidate_schema(database, table_name)
+                    return True
             except Error as e:
                 print(f"Error creating table: {e}")
                 return False
         return False
 
     def delete_table(self, database, table_name):
-        if self.connection:
+        if self.pool:
             try:
-                cursor = self.connection.cursor()
-                cursor.execute(f"USE {database}")
-                cursor.execute(f"DROP TABLE {table_name}")
-                self.connection.commit()
-                return True
+                with self.borrow() as connection:
+                    cursor = connection.cursor()
+                    self._use(connection, cursor, database)
+                    cursor.execute(f"DROP TABLE {table_name}")
+                    connection.commit()
+                    self.invalidate_schema(database, table_name)
+                    return True
             except Error as e:
                 print(f"Error deleting table: {e}")
                 return False
         return False
 
     def add_column(self, database, table, column_name, column_type):
-        if self.connection:
+        if self.pool:
             try:
-                cursor = self.connection.cursor()
-                cursor.execute(f"USE {database}")
-                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column_name} {column_type}")
-                self.connection.commit()
-                return True
+                with self.borrow() as connection:
+                    cursor = connection.cursor()
+                    self._use(connection, cursor, database)
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column_name} {column_type}")
+                    connection.commit()
+                    self.invalidate_schema(database, table)
+                    return True
             except Error as e:
                 print(f"Error adding column: {e}")
                 return False
         return False
 
     def delete_column(self, database, table, column_name):
-        if self.connection:
+        if self.pool:
             try:
-                cursor = self.connection.cursor()
-                cursor.execute(f"USE {database}")
-                cursor.execute(f"ALTER TABLE {table} DROP COLUMN {column_name}")
-                self.connection.commit()
-                return True
+                with self.borrow() as connection:
+                    cursor = connection.cursor()
+                    self._use(connection, cursor, database)
+                    cursor.execute(f"ALTER TABLE {table} DROP COLUMN {column_name}")
+                    connection.commit()
+                    self.invalidate_schema(database, table)
+                    return True
             except Error as e:
                 print(f"Error deleting column: {e}")
                 return False
         return False
 
     def add_row(self, database, table, values, columns=None):
-        if self.connection:
+        if self.pool:
             try:
-                cursor = self.connection.cursor()
-                cursor.execute(f"USE {database}")
-                
-                # Get column names
-                cursor.execute(f"SHOW COLUMNS FROM {table}")
-                table_columns = [column[0] for column in cursor.fetchall()]
-                
-                if columns is None:
-                    columns = table_columns
-                else:
-                    # Ensure the provided columns match the table columns
-                    if set(columns) != set(table_columns):
-                        raise ValueError("Provided columns do not match the table columns.")
-                
-                # Debug print to check columns and values
-                print(f"Columns: {columns}")
-                print(f"Values: {values}")
-                
-                # Ensure the number of columns matches the number of values
-                if len(columns) != len(values):
-                    raise ValueError("Column count doesn't match value count.")
-                
-                # Create the INSERT query
-                placeholders = ", ".join(["%s"] * len(values))
-                columns_str = ", ".join(columns)
-                query = f"INSERT INTO {table} ({columns_str}) VALUES ({placeholders})"
-                
-                cursor.execute(query, values)
-                self.connection.commit()  # Corrected this line
-                return True
+                # Column names come from the schema cache, not a per-insert SHOW COLUMNS
+                table_columns = self.get_columns(database, table)
+
+                with self.borrow() as connection:
+                    cursor = connection.cursor()
+                    self._use(connection, cursor, database)
+                    
+                    if columns is None:
+                        columns = table_columns
+                    else:
+                        # Ensure the provided columns match the table columns
+                        if set(columns) != set(table_columns):
+                            raise ValueError("Provided columns do not match the table columns.")
+                    
+                    # Debug print to check columns and values
+                    print(f"Columns: {columns}")
+                    print(f"Values: {values}")
+                    
+                    # Ensure the number of columns matches the number of values
+                    if len(columns) != len(values):
+                        raise ValueError("Column count doesn't match value count.")
+                    
+                    if table == "Sale":
+                        # Same transaction as the insert, like record_sale
+                        self._decrement_stock(connection, database, columns, [values])
+                    self._execute_prepared(connection, database, insert_sql(table, tuple(columns)), values)
+                    if table == "Sale" and "SaleID" in columns:
+                        self.add_to_sales_rollup(cursor, [values[list(columns).index("SaleID")]])
+                    connection.commit()
+                    # Also drops any cached "no such id" answer for the new row
+                    self._invalidate_reference(database, table)
+                    self._inventory_rows_written(table, columns, [values])
+                    return True
             except Error as e:
                 print(f"Error adding row: {e}")
                 return False
         return False
         
+    def add_rows(self, database, table, columns, rows):
+        # Batched insert in a single transaction; raises on failure so callers
+        # can tell which batch (or row) was rejected and why
+        if not self.pool:
+            raise Error(msg="Not connected")
+        placeholders = ", ".join(["%s"] * len(columns))
+        columns_str = ", ".join(columns)
+        with self.borrow() as connection:
+            cursor = connection.cursor()
+            self._use(connection, cursor, database)
+            connection.start_transaction()
+            try:
+                if table == "Sale":
+                    self._decrement_stock(connection, database, columns, rows)
+                cursor.executemany(f"INSERT INTO {table} ({columns_str}) VALUES ({placeholders})", rows)
+                if table == "Sale" and "SaleID" in columns:
+                    sale_ids = [row[columns.index("SaleID")] for row in rows]
+                    self.add_to_sales_rollup(cursor, sale_ids)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+        self._invalidate_reference(database, table)
+        self._inventory_rows_written(table, columns, rows)
+        return len(rows)
+
+    def add_to_sales_rollup(self, cursor, sale_ids):
+        # Aggregate just the given sales server-side and fold them into the rollups.
+        # Runs on the caller's cursor, so it commits or rolls back with the insert
+        id_placeholders = ", ".join(["%s"] * len(sale_ids))
+        cursor.execute(
+            "INSERT INTO SaleRollupProduct (ProductID, TotalUnitsSold, TotalRevenue) "
+            "SELECT * FROM ("
+            "SELECT ProductID, COALESCE(SUM(QuantitySold), 0) AS Units, COALESCE(SUM(TotalPrice), 0) AS Amount "
+            f"FROM Sale WHERE SaleID IN ({id_placeholders}) AND ProductID IS NOT NULL GROUP BY ProductID"
+            ") AS batch "
+            "ON DUPLICATE KEY UPDATE "
+            "TotalUnitsSold = SaleRollupProduct.TotalUnitsSold + batch.Units, "
+            "TotalRevenue = SaleRollupProduct.TotalRevenue + batch.Amount",
+            sale_ids
+        )
+        cursor.execute(
+            "INSERT INTO SaleRollupDaily (ProductID, SaleDate, UnitsSold, Revenue) "
+            "SELECT * FROM ("
+            "SELECT ProductID, SaleDate, COALESCE(SUM(QuantitySold), 0) AS Units, COALESCE(SUM(TotalPrice), 0) AS Amount "
+            f"FROM Sale WHERE SaleID IN ({id_placeholders}) AND ProductID IS NOT NULL AND SaleDate IS NOT NULL "
+            "GROUP BY ProductID, SaleDate"
+            ") AS batch "
+            "ON DUPLICATE KEY UPDATE "
+            "UnitsSold = SaleRollupDaily.UnitsSold + batch.Units, "
+            "Revenue = SaleRollupDaily.Revenue + batch.Amount",
+            sale_ids
+        )
+
+    def remove_from_sales_rollup(self, cursor, where, params):
+        # Lock the sales about to be deleted and take them back out of the
+        # rollups, on the caller's cursor so it joins the delete's transaction
+        cursor.execute(
+            f"SELECT ProductID, SaleDate, QuantitySold, TotalPrice FROM Sale WHERE {where} FOR UPDATE", params)
+        products = {}
+        days = {}
+        for product_id, sale_date, quantity, amount in cursor.fetchall():
+            if product_id is None:
+                continue
+            quantity = quantity or 0
+            amount = amount or 0
+            units, revenue = products.get(product_id, (0, 0))
+            products[product_id] = (units - quantity, revenue - amount)
+            if sale_date is not None:
+                units, revenue = days.get((product_id, sale_date), (0, 0))
+                days[(product_id, sale_date)] = (units - quantity, revenue - amount)
+        if products:
+            cursor.executemany(SALE_ROLLUP_PRODUCT_SQL,
+                               [(product_id,) + totals for product_id, totals in sorted(products.items())])
+        if days:
+            cursor.executemany(SALE_ROLLUP_DAILY_SQL,
+                               [key + totals for key, totals in sorted(days.items())])
+
     def delete_row(self, database, table, condition_column, condition_value):
-        if self.connection:
+        if self.pool:
             try:
-                cursor = self.connection.cursor()
-                cursor.execute(f"USE {database}")
-                cursor.execute(f"DELETE FROM {table} WHERE {condition_column} = %s", (condition_value,))
-                self.connection.commit()
-                return True
+                with self.borrow() as connection:
+                    cursor = connection.cursor()
+                    self._use(connection, cursor, database)
+                    if table == "Sale":
+                        self.remove_from_sales_rollup(cursor, f"{condition_column} = %s", (condition_value,))
+                    cursor.execute(f"DELETE FROM {table} WHERE {condition_column} = %s", (condition_value,))
+                    connection.commit()
+                    self._invalidate_reference(database, table)
+                    self._inventory_rows_deleted(table, condition_column, condition_value)
+                    return True
             except Error as e:
                 print(f"Error deleting row: {e}")
                 return False
         return False
-    
-    def get_product_by_id(self, product_id):
-        if self.connection:
+
+    def _with_deadlock_retry(self, work, retries=DEADLOCK_RETRIES):
+        # InnoDB rolls back the victim of a deadlock (or a lock wait timeout);
+        # the whole transaction is safe to run again from the start
+        for attempt in range(retries + 1):
             try:
-                cursor = self.connection.cursor(dictionary=True)
-                cursor.execute("USE farmer_schema")
-                cursor.execute("SELECT * FROM Product WHERE ProductID = %s", (product_id,))
-                return cursor.fetchone()
+                return work()
+            except Error as e:
+                if e.errno not in RETRYABLE_LOCK_ERRORS or attempt == retries:
+                    raise
+                with self._use_lock:
+                    self.deadlock_retries += 1
+                time.sleep(DEADLOCK_BACKOFF * (2 ** attempt) * (1 + random.random()))
+
+    def _decrement_stock(self, connection, database, columns, rows):
+        # One relative UPDATE per (product, vendor), applied in sorted order so
+        # terminals selling overlapping products always lock rows in the same order.
+        # Raises InsufficientStockError when no Inventory row can cover a
+        # quantity; the caller's transaction then rolls the whole batch back.
+        columns = list(columns)
+        if not {"ProductID", "VendorID", "QuantitySold"} <= set(columns):
+            return
+        product_index = columns.index("ProductID")
+        vendor_index = columns.index("VendorID")
+        quantity_index = columns.index("QuantitySold")
+        quantities = {}
+        for row in rows:
+            key = (row[product_index], row[vendor_index])
+            if None in key:
+                # Not tied to any stock
+                continue
+            quantities[key] = quantities.get(key, 0) + (row[quantity_index] or 0)
+        for (product_id, vendor_id), quantity in sorted(quantities.items()):
+            if quantity:
+                cursor = self._execute_prepared(connection, database, DECREMENT_STOCK_SQL,
+                                                (quantity, product_id, vendor_id, quantity))
+                if cursor.rowcount != 1:
+                    raise InsufficientStockError(product_id, vendor_id, quantity)
+
+    def record_sale(self, database, values, columns):
+        if self.pool:
+            sale = dict(zip(columns, values))
+
+            def work():
+                with self.borrow() as connection:
+                    cursor = connection.cursor()
+                    self._use(connection, cursor, database)
+                    connection.start_transaction()
+                    try:
+                        self._decrement_stock(connection, database, columns, [values])
+                        inserted = self._execute_prepared(
+                            connection, database, insert_sql("Sale", tuple(columns)), values)
+
+                        # Keep the analytics rollups in step with Sale in the same transaction
+                        sale_id = sale.get("SaleID") or inserted.lastrowid
+                        self.add_to_sales_rollup(cursor, [sale_id])
+                        connection.commit()
+                    except Exception:
+                        connection.rollback()
+                        raise
+                    return True
+
+            try:
+                result = self._with_deadlock_retry(work)
+                self._inventory_changed(product_vendors=[(sale["ProductID"], sale["VendorID"])])
+                return result
+            except Error as e:
+                print(f"Error recording sale: {e}")
+                return False
+        return False
+
+    def record_sales(self, database, columns, rows):
+        # Group commit: the whole batch of sales, its stock decrements and its
+        # rollup updates share one transaction, so a busy till pays for one
+        # commit per batch. Raises on failure like add_rows.
+        if not self.pool:
+            raise Error(msg="Not connected")
+
+        def work():
+            with self.transaction(database) as (connection, cursor):
+                self.insert_sales(connection, cursor, database, columns, rows)
+            return len(rows)
+
+        recorded = self._with_deadlock_retry(work)
+        self._inventory_changed(product_vendors=_sale_product_vendors(columns, rows))
+        return recorded
+
+    def insert_sales(self, connection, cursor, database, columns, rows):
+        # Stock, sales and rollups on the caller's transaction, which
+        # record_sales and the replica push commit or roll back
+        self._decrement_stock(connection, database, columns, rows)
+        cursor.executemany(insert_sql("Sale", tuple(columns)), rows)
+        self.add_to_sales_rollup(cursor, [row[columns.index("SaleID")] for row in rows])
+
+    def reserve_sale_ids(self, database, count):
+        """Reserve count consecutive sale IDs for this client; returns the first.
+
+        The IdSequence row lock serializes reservations across terminals. The
+        counter is first moved past MAX(SaleID), so IDs written without it
+        (an admin entering one by hand) are never handed out again.
+        """
+        if not self.pool:
+            raise Error(msg="Not connected")
+        with self.borrow() as connection:
+            cursor = connection.cursor()
+            self._use(connection, cursor, database)
+            cursor.execute(
+                "UPDATE IdSequence SET NextValue = LAST_INSERT_ID("
+                "GREATEST(NextValue, (SELECT COALESCE(MAX(SaleID), 0) + 1 FROM Sale)) + %s) "
+                "WHERE Name = 'Sale'", (count,))
+            if cursor.rowcount != 1:
+                connection.rollback()
+                raise Error(msg="Sale ID sequence is missing; run migrate.py")
+            cursor.execute("SELECT LAST_INSERT_ID()")
+            end = cursor.fetchall()[0][0]
+            connection.commit()
+        return end - count
+
+    def next_sale_id(self, database):
+        return self.reserve_sale_ids(database, 1)
+
+    def rebuild_sales_rollup(self, database):
+        if self.pool:
+            try:
+                with self.borrow() as connection:
+                    cursor = connection.cursor()
+                    self._use(connection, cursor, database)
+                    connection.start_transaction()
+                    cursor.execute("DELETE FROM SaleRollupDaily")
+                    cursor.execute("DELETE FROM SaleRollupProduct")
+                    cursor.execute(
+                        "INSERT INTO SaleRollupProduct (ProductID, TotalUnitsSold, TotalRevenue) "
+                        "SELECT ProductID, COALESCE(SUM(QuantitySold), 0), COALESCE(SUM(TotalPrice), 0) "
+                        "FROM Sale WHERE ProductID IS NOT NULL GROUP BY ProductID"
+                    )
+                    cursor.execute(
+                        "INSERT INTO SaleRollupDaily (ProductID, SaleDate, UnitsSold, Revenue) "
+                        "SELECT ProductID, SaleDate, COALESCE(SUM(QuantitySold), 0), COALESCE(SUM(TotalPrice), 0) "
+                        "FROM Sale WHERE ProductID IS NOT NULL AND SaleDate IS NOT NULL "
+                        "GROUP BY ProductID, SaleDate"
+                    )
+                    connection.commit()
+                    return True
+            except Error as e:
+                print(f"Error rebuilding sales rollup: {e}")
+                return False
+        return False
+
+    def get_reference_row(self, database, table, row_id):
+        # Read-through: only a miss (or an expired entry) goes to the server
+        found, row = self.reference_cache.get(database, table, row_id)
+        if found:
+            return row
+        with self.borrow() as connection:
+            row = self._fetch_one_dict(connection, database, REFERENCE_BY_ID_SQL[table], (row_id,))
+        self.reference_cache.put(database, table, row_id, row)
+        return row
+
+    def get_product_by_id(self, product_id, database="farmer_schema"):
+        if self.pool:
+            try:
+                return self.get_reference_row(database, "Product", product_id)
             except Error as e:
                 print(f"Error fetching product by ID: {e}")
                 return None
         return None
 
+    def get_vendor_by_id(self, vendor_id, database="farmer_schema"):
+        if self.pool:
+            try:
+                return self.get_reference_row(database, "Vendor", vendor_id)
+            except Error as e:
+                print(f"Error fetching vendor by ID: {e}")
+                return None
+        return None
+
+    def get_customer_by_id(self, customer_id, database="farmer_schema"):
+        if self.pool:
+            try:
+                return self.get_reference_row(database, "Customer", customer_id)
+            except Error as e:
+                print(f"Error fetching customer by ID: {e}")
+                return None
+        return None
+
     def get_inventory_by_id(self, inventory_id):
-        if self.connection:
+        if self.pool:
             try:
-                cursor = self.connection.cursor(dictionary=True)
-                cursor.execute("USE farmer_schema")
-                cursor.execute("SELECT * FROM Inventory WHERE InventoryID = %s", (inventory_id,))
-                return cursor.fetchone()
+                with self.borrow() as connection:
+                    return self._fetch_one_dict(connection, "farmer_schema", INVENTORY_BY_ID_SQL, (inventory_id,))
             except Error as e:
                 print(f"Error fetching inventory by ID: {e}")
                 return None
         return None
 
+    def update_product(self, database, product_id, name, category, price, seasonal_availability):
+        if self.pool:
+            with self.borrow() as connection:
+                self._use(connection, connection.cursor(), database)
+                cursor = self._execute_prepared(connection, database, UPDATE_PRODUCT_SQL,
+                                                (name, category, price, seasonal_availability, product_id))
+                connection.commit()
+                self._invalidate_reference(database, "Product", product_id)
+                return cursor.rowcount
+        return 0
+
+    def update_inventory(self, database, inventory_id, product_id, vendor_id, quantity_delta, restock_threshold):
+        # Stock is adjusted by a delta rather than overwritten, so sales recorded
+        # between reading the row and saving the edit are not lost
+        if self.pool:
+            def work():
+                with self.borrow() as connection:
+                    self._use(connection, connection.cursor(), database)
+                    cursor = self._execute_prepared(connection, database, UPDATE_INVENTORY_SQL,
+                                                    (product_id, vendor_id, quantity_delta, restock_threshold,
+                                                     inventory_id))
+                    connection.commit()
+                    return cursor.rowcount
+            updated = self._with_deadlock_retry(work)
+            self._inventory_changed(inventory_ids=[inventory_id])
+            return updated
+        return 0
+
+    def get_restock_alerts(self, database):
+        rows, _ = self.run_query(database, RESTOCK_ALERTS_SQL)
+        return rows
+
+    def get_sales_timeseries(self, database, bucket, start=None, end=None, product_id=None, vendor_id=None):
+        """Units, revenue and sale count per daily/weekly/monthly/seasonal bucket: (rows, description).
+
+        One grouped query; start and end (inclusive, None for unbounded) limit
+        it to that SaleDate index range.
+        """
+        sql, params = timeseries_query(bucket, start, end, product_id, vendor_id)
+        return self.run_query(database, sql, params)
+
+    def get_inventory_levels(self, database, inventory_ids=(), product_vendors=()):
+        # Point lookups by primary key and by the (ProductID, VendorID) index;
+        # never a scan of Inventory
+        conditions = []
+        params = []
+        if inventory_ids:
+            conditions.append(f"i.InventoryID IN ({', '.join(['%s'] * len(inventory_ids))})")
+            params.extend(inventory_ids)
+        for product_id, vendor_id in product_vendors:
+            conditions.append("(i.ProductID = %s AND i.VendorID = %s)")
+            params.extend((product_id, vendor_id))
+        if not conditions:
+            return []
+        rows, _ = self.run_query(database, f"{INVENTORY_LEVELS_SQL} WHERE {' OR '.join(conditions)}", params)
+        return rows
+
+    def add_inventory_listener(self, callback):
+        # callback(inventory_ids, product_vendors, reload) runs after every
+        # committed write that can move stock, on whichever thread made it
+        self._inventory_listeners.append(callback)
+
+    def remove_inventory_listener(self, callback):
+        if callback in self._inventory_listeners:
+            self._inventory_listeners.remove(callback)
+
+    def _inventory_changed(self, inventory_ids=(), product_vendors=(), reload=False):
+        for callback in list(self._inventory_listeners):
+            callback(tuple(inventory_ids), tuple(product_vendors), reload)
+
+    def _inventory_rows_written(self, table, columns, rows):
+        if table == "Sale" and {"ProductID", "VendorID"} <= set(columns):
+            # The sales took stock off the shelf
+            self._inventory_changed(product_vendors=_sale_product_vendors(list(columns), rows))
+            return
+        if table != "Inventory":
+            return
+        if "InventoryID" in columns:
+            index = list(columns).index("InventoryID")
+            self._inventory_changed(inventory_ids=[row[index] for row in rows])
+        else:
+            self._inventory_changed(reload=True)
+
+    def _inventory_rows_deleted(self, table, condition_column, condition_value):
+        if table != "Inventory":
+            return
+        if condition_column == "InventoryID":
+            self._inventory_changed(inventory_ids=[condition_value])
+        else:
+            self._inventory_changed(reload=True)
+
+FARMER_DATABASE = "farmer_schema"
+
+
+def refresh_replica(db_connection, database=FARMER_DATABASE):
+    try:
+        # Pushes changes left from working offline before pulling over them
+        LocalReplica().sync(db_connection, database)
+    except Exception as e:
+        print(f"Could not refresh local replica: {e}")
+
+
+def connect_database(host, username, password, min_pool_size=1, max_pool_size=2):
+    db_connection = DatabaseConnection(min_pool_size=min_pool_size, max_pool_size=max_pool_size)
+    if db_connection.connect(host, username, password):
+        return db_connection
+    return None
+
+
+class OfflineDatabaseConnection(DatabaseConnection):
+    """DatabaseConnection stand-in that reads and writes the local replica.
+
+    Writes are journaled by the replica and replayed against MySQL by a
+    background ReplicaSyncer whenever the server can be reached.
+    """
+
+    offline = True
+
+    def __init__(self, replica, host, username, password, database=FARMER_DATABASE, sync_interval=30):
+        super().__init__()
+        self.replica = replica
+        replica.query_stats = self.query_stats
+        self.database = database
+        self.syncer = ReplicaSyncer(
+            replica, lambda: connect_database(host, username, password), database, interval=sync_interval)
+        self.syncer.start()
+
+    def close(self):
+        self.syncer.stop()
+        self.query_stats.close()
+
+    def kill_queries(self, job_key):
+        # Local queries are short; there is nothing on a server to interrupt
+        return False
+
+    def sync_status(self):
+        counts = self.replica.journal_counts()
+        return {
+            "online": self.syncer.online,
+            "pending": counts.get("pending", 0),
+            "conflicts": counts.get("conflict", 0),
+            "last_sync": self.syncer.last_sync,
+            "last_error": self.syncer.last_error,
+        }
+
+    def get_databases(self):
+        return [self.database]
+
+    def get_tables(self, database):
+        return self.replica.tables()
+
+    def get_table_contents(self, database, table):
+        return self.replica.query(f"SELECT * FROM {quote_identifier(table)}")
+
+    def get_table_chunk(self, database, table, offset, limit, where=None, where_params=()):
+        sql = f"SELECT * FROM {quote_identifier(table)}"
+        if where:
+            sql += f" WHERE {where}"
+        return self.replica.query(sql + " LIMIT %s OFFSET %s", list(where_params) + [limit, offset])
+
+    def iter_table_chunks(self, database, table, chunk_size):
+        return self.iter_query_chunks(database, f"SELECT * FROM {quote_identifier(table)}", None, chunk_size)
+
+    def iter_query_chunks(self, database, sql, params, chunk_size):
+        return self.replica.iter_query(sql, params, chunk_size)
+
+    def count_rows(self, database, table, where=None, where_params=()):
+        sql = f"SELECT COUNT(*) FROM {quote_identifier(table)}"
+        if where:
+            sql += f" WHERE {where}"
+        rows, _ = self.replica.query(sql, where_params)
+        return rows[0][0]
+
+    def get_column_info(self, database, table):
+        return self.replica.column_info(table)
+
+    def get_page(self, database, table, sort_column=None, descending=False, after=None,
+                 limit=DEFAULT_CHUNK_SIZE, from_end=False, where=None, where_params=()):
+        primary_key = self.get_primary_key(database, table)
+        if not primary_key:
+            raise ValueError(f"Table {table} has no primary key to page by.")
+        key_columns = self.get_page_key(database, table, sort_column)
+        sql, params = page_query(table, key_columns, descending != from_end, after, limit,
+                                 not_null=set(primary_key), where=where, where_params=where_params)
+        rows, description = self.replica.query(sql, params)
+        if from_end:
+            rows.reverse()
+        return rows, description
+
+    def has_rows(self, database, table):
+        rows, _ = self.replica.query(f"SELECT 1 FROM {quote_identifier(table)} LIMIT 1")
+        return bool(rows)
+
+    def run_query(self, database, sql, params=None):
+        # Analytics written for MySQL may not run on SQLite; the replica raises Error if so
+        return self.replica.query(sql, params)
+
+    def execute(self, database, sql, params=None):
+        raise Error(msg="Not available while working offline")
+
+    def add_row(self, database, table, values, columns=None):
+        try:
+            columns = columns or self.get_columns(database, table)
+            # A sale takes stock off the shelf however it is entered, here and once pushed
+            self.replica.insert(table, columns, values, op="sale" if table == "Sale" else "insert")
+            self._inventory_rows_written(table, columns, [values])
+            return True
+        except Error as e:
+            print(f"Error adding row: {e}")
+            return False
+
+    def add_rows(self, database, table, columns, rows):
+        for values in rows:
+            self.replica.insert(table, columns, values, op="sale" if table == "Sale" else "insert")
+        self._inventory_rows_written(table, columns, rows)
+        return len(rows)
+
+    def delete_row(self, database, table, condition_column, condition_value):
+        try:
+            self.replica.delete(table, condition_column, condition_value)
+            self._inventory_rows_deleted(table, condition_column, condition_value)
+            return True
+        except Error as e:
+            print(f"Error deleting row: {e}")
+            return False
+
+    def record_sale(self, database, values, columns):
+        try:
+            self.replica.insert("Sale", columns, values, op="sale")
+            self._inventory_changed(product_vendors=_sale_product_vendors(columns, [values]))
+            return True
+        except Error as e:
+            print(f"Error recording sale: {e}")
+            return False
+
+    def record_sales(self, database, columns, rows):
+        for values in rows:
+            self.replica.insert("Sale", columns, values, op="sale")
+        self._inventory_changed(product_vendors=_sale_product_vendors(columns, rows))
+        return len(rows)
+
+    def reserve_sale_ids(self, database, count):
+        # May collide with sales made on other terminals; the sync reports it as a conflict
+        rows, _ = self.replica.query("SELECT COALESCE(MAX(SaleID), 0) + 1 FROM Sale")
+        return rows[0][0]
+
+    def next_sale_id(self, database):
+        return self.reserve_sale_ids(database, 1)
+
+    def rebuild_sales_rollup(self, database):
+        print("Sales rollup can only be rebuilt while connected to the server")
+        return False
+
+    def get_reference_row(self, database, table, row_id):
+        # The replica is already local, so there is nothing to cache
+        return self.replica.row(table, [row_id])
+
+    def get_product_by_id(self, product_id, database=FARMER_DATABASE):
+        return self.replica.row("Product", [product_id])
+
+    def get_vendor_by_id(self, vendor_id, database=FARMER_DATABASE):
+        return self.replica.row("Vendor", [vendor_id])
+
+    def get_customer_by_id(self, customer_id, database=FARMER_DATABASE):
+        return self.replica.row("Customer", [customer_id])
+
+    def get_inventory_by_id(self, inventory_id):
+        return self.replica.row("Inventory", [inventory_id])
+
+    def update_product(self, database, product_id, name, category, price, seasonal_availability):
+        return self.replica.update("Product", [product_id], {
+            "Name": name, "Category": category, "Price": price, "SeasonalAvailability": seasonal_availability})
+
+    def update_inventory(self, database, inventory_id, product_id, vendor_id, quantity_delta, restock_threshold):
+        updated = self.replica.update(
+            "Inventory", [inventory_id],
+            {"ProductID": product_id, "VendorID": vendor_id, "RestockThreshold": restock_threshold},
+            deltas={"QuantityInStock": quantity_delta})
+        self._inventory_changed(inventory_ids=[inventory_id])
+        return updated
+
+    def get_sales_timeseries(self, database, bucket, start=None, end=None, product_id=None, vendor_id=None):
+        sql, params = timeseries_query(bucket, start, end, product_id, vendor_id, buckets=SQLITE_BUCKETS)
+        # SaleDate is stored as ISO text locally, which compares correctly as a string
+        params = [value.isoformat() if hasattr(value, "isoformat") else value for value in params]
+        return self.replica.query(sql, params)
+
+    def get_restock_alerts(self, database):
+        # The replica has no generated column; it is small enough to compare directly
+        rows, _ = self.replica.query(f"{INVENTORY_LEVELS_SQL} WHERE i.QuantityInStock <= i.RestockThreshold")
+        return rows
+
+
 class CreateTableDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -561,6 +1532,13 @@ class LoginDialog(QDialog):
             }
         """)
         
+        # Farmers can work from the local replica and sync in the background
+        self.offline_checkbox = QCheckBox("Work from local copy (sync in background)", self)
+        self.offline_checkbox.setStyleSheet("color: white; font-size: 14px; margin-top: 10px;")
+        self.offline_checkbox.setVisible(self.user_type_combo.currentText() == "Farmer")
+        self.user_type_combo.currentTextChanged.connect(
+            lambda text: self.offline_checkbox.setVisible(text == "Farmer"))
+
         # Login button
         self.login_button = QPushButton("Connect", self)
         self.login_button.setStyleSheet("""
@@ -588,6 +1566,7 @@ class LoginDialog(QDialog):
         layout.addWidget(self.username_input)
         layout.addWidget(self.password_label)
         layout.addWidget(self.password_input)
+        layout.addWidget(self.offline_checkbox)
         layout.addWidget(self.login_button)
         
         self.login_button.clicked.connect(self.try_login)
@@ -597,22 +1576,54 @@ class LoginDialog(QDialog):
         username = self.username_input.text()
         password = self.password_input.text()
         self.user_type = self.user_type_combo.currentText()
-        
+        offline_capable = self.user_type == "Farmer"
+
+        if offline_capable and self.offline_checkbox.isChecked():
+            self.start_offline(host, username, password)
+            return
+
         self.db_connection = DatabaseConnection()
         if self.db_connection.connect(host, username, password):
             print("Login successful")
             self.accept()
-        else:
-            QMessageBox.warning(self, 'Error', 'Failed to connect to database')
-            self.db_connection = None
+            return
+
+        self.db_connection = None
+        if offline_capable and os.path.exists(DEFAULT_REPLICA_PATH):
+            replica = LocalReplica()
+            if replica.tables():
+                answer = QMessageBox.question(
+                    self, 'Server unreachable',
+                    f"Could not connect to the database server.\n\n"
+                    f"Work offline from the local copy (last synced {replica.last_pulled() or 'never'})? "
+                    f"Changes are kept locally and synced when the server is reachable again.",
+                    QMessageBox.Yes | QMessageBox.No
+                )
+                if answer == QMessageBox.Yes:
+                    self.start_offline(host, username, password, replica)
+                return
+        QMessageBox.warning(self, 'Error', 'Failed to connect to database')
+
+    def start_offline(self, host, username, password, replica=None):
+        replica = replica or LocalReplica()
+        self.db_connection = OfflineDatabaseConnection(replica, host, username, password)
+        if not replica.tables():
+            # First use: try to take the initial copy right away
+            self.db_connection.syncer.sync_now()
+        print("Working from the local replica")
+        self.accept()
 
 class MainWindow(QMainWindow):
+    export_progress = pyqtSignal(int, float)
 
     def __init__(self, db_connection):
         super().__init__()
         self.db_connection = db_connection
         self.current_database = None
         self.current_table = None
+        self.query_executor = QueryExecutor(db_connection, parent=self)
+        self.query_stats_panel = None
+        self.table_job = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -646,7 +1657,10 @@ class MainWindow(QMainWindow):
             ("Add Column", "📊➕"),     # Emoji for add column
             ("Delete Column", "📊❌"),  # Emoji for delete column
             ("Add Row", "📝➕"),  # Emoji for add row (custom choice)
-            ("Delete Row", "📝❌")  # Emoji for delete row
+            ("Delete Row", "📝❌"),  # Emoji for delete row
+            ("Export Table", "📤"),  # Emoji for exporting the table to a file
+            ("Flush Caches", "🧹"),  # Emoji for flushing cached schema/reference data
+            ("Query Stats", "⏱️")  # Emoji for per-statement latency stats
         ]
 
         for text, emoji_text in crud_actions:
@@ -695,8 +1709,14 @@ class MainWindow(QMainWindow):
                 self.delete_column_btn = btn
             elif text == "Add Row":
                 self.add_row_btn = btn
-            else:
+            elif text == "Delete Row":
                 self.delete_row_btn = btn
+            elif text == "Export Table":
+                self.export_table_btn = btn
+            elif text == "Flush Caches":
+                self.flush_caches_btn = btn
+            else:
+                self.query_stats_btn = btn
 
         toolbar_layout.addStretch()
         main_layout.addWidget(toolbar)
@@ -795,6 +1815,9 @@ class MainWindow(QMainWindow):
         self.delete_column_btn.clicked.connect(self.delete_column)
         self.add_row_btn.clicked.connect(self.add_row)
         self.delete_row_btn.clicked.connect(self.delete_row)
+        self.export_table_btn.clicked.connect(self.export_table)
+        self.flush_caches_btn.clicked.connect(self.flush_caches)
+        self.query_stats_btn.clicked.connect(self.view_query_stats)
 
         # Set initial button states
         self.update_button_states()
@@ -812,6 +1835,7 @@ class MainWindow(QMainWindow):
         self.delete_column_btn.setEnabled(has_table)
         self.add_row_btn.setEnabled(has_table)
         self.delete_row_btn.setEnabled(has_table)
+        self.export_table_btn.setEnabled(has_table)
 
     def select_database(self, db):
         self.current_database = db
@@ -877,8 +1901,7 @@ class MainWindow(QMainWindow):
             return
 
         # Get current columns
-        _, columns = self.db_connection.get_table_contents(self.current_database, self.current_table)
-        column_names = [col[0] for col in columns]
+        column_names = self.db_connection.get_columns(self.current_database, self.current_table)
 
         column_name, ok = QInputDialog.getItem(self, "Delete Column", 
                                              "Select column to delete:", 
@@ -901,13 +1924,13 @@ class MainWindow(QMainWindow):
             return
 
         # Get current columns
-        _, columns = self.db_connection.get_table_contents(self.current_database, self.current_table)
+        columns = self.db_connection.get_columns(self.current_database, self.current_table)
         
         # Create input dialog for each column
         values = []
         for col in columns:
             value, ok = QInputDialog.getText(self, "Add Row", 
-                                           f"Enter value for {col[0]}:")
+                                           f"Enter value for {col}:")
             if ok:
                 values.append(value)
             else:
@@ -923,14 +1946,13 @@ class MainWindow(QMainWindow):
         if not self.current_table:
             return
 
-        # Get current table data
-        rows, columns = self.db_connection.get_table_contents(self.current_database, self.current_table)
-        if not rows or not columns:
+        # Check for data without reading the whole table
+        column_names = self.db_connection.get_columns(self.current_database, self.current_table)
+        if not column_names or not self.db_connection.has_rows(self.current_database, self.current_table):
             QMessageBox.warning(self, "Error", "No data to delete")
             return
 
         # Let user select which column to use as condition for deletion
-        column_names = [col[0] for col in columns]
         column, ok = QInputDialog.getItem(self, "Delete Row", 
                                         "Select column to use as condition:", 
                                         column_names, 0, False)
@@ -956,6 +1978,59 @@ class MainWindow(QMainWindow):
             else:
                 QMessageBox.warning(self, "Error", "Failed to delete row(s)")
 
+    def export_table(self):
+        if not self.current_table:
+            return
+        table = self.current_table
+        path, _ = QFileDialog.getSaveFileName(
+            self, f"Export {table}", f"{table}.csv", "CSV (*.csv);;Parquet (*.parquet)")
+        if not path:
+            return
+
+        progress = QProgressDialog(f"Exporting {table}...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Export")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+
+        # Progress is reported from the worker thread; the signal hops it back to the GUI
+        exporter = TableExporter(self.db_connection, self.current_database, table,
+                                 progress_callback=self.export_progress.emit)
+        update_label = lambda rows, rate: progress.setLabelText(
+            f"Exporting {table}...\n{rows:,} rows ({rate:,.0f} rows/sec)")
+        self.export_progress.connect(update_label)
+        progress.canceled.connect(exporter.cancel)
+
+        def finish(result=None, message=None):
+            self.export_progress.disconnect(update_label)
+            progress.reset()
+            if message is not None:
+                QMessageBox.warning(self, "Error", f"Export failed: {message}")
+                return
+            QMessageBox.information(self, "Success", describe_result(result))
+
+        self.query_executor.submit(
+            exporter.export, path,
+            on_result=lambda result: finish(result=result),
+            on_error=lambda message: finish(message=message)
+        )
+        progress.show()
+
+    def flush_caches(self):
+        stats = self.db_connection.reference_cache.stats()
+        self.db_connection.flush_caches()
+        QMessageBox.information(
+            self, 'Success',
+            f"Caches flushed ({stats['entries']} reference rows dropped; "
+            f"{stats['hits']} hits / {stats['misses']} misses so far)."
+        )
+
+    def view_query_stats(self):
+        # Modeless, so the numbers keep updating while the window is used
+        if self.query_stats_panel is None:
+            self.query_stats_panel = QueryStatsPanel(self.db_connection, self)
+        self.query_stats_panel.show()
+        self.query_stats_panel.raise_()
+
     def load_databases(self):
         # Clear existing items
         while self.db_layout.count():
@@ -1040,6 +2115,8 @@ class MainWindow(QMainWindow):
         self.load_tables()
         
         # Clear the table view when selecting a new database
+        self.query_executor.cancel(self.table_job)
+        self.table_job = None
         while self.right_layout.count():
             item = self.right_layout.takeAt(0)
             if item.widget():
@@ -1057,6 +2134,10 @@ class MainWindow(QMainWindow):
         self.display_table(table)
 
     def display_table(self, table):
+        # Navigating to another table abandons whatever is still loading
+        self.query_executor.cancel(self.table_job)
+        self.table_job = None
+
         # Clear existing content in right panel
         while self.right_layout.count():
             item = self.right_layout.takeAt(0)
@@ -1075,46 +2156,50 @@ class MainWindow(QMainWindow):
             padding: 10px;
         """)
         self.right_layout.addWidget(title_label)
-        
-        # Get table contents
-        rows, columns = self.db_connection.get_table_contents(self.current_database, table)
-        
-        # Create table widget
-        table_widget = QTableWidget()
-        table_widget.setRowCount(len(rows))
-        table_widget.setColumnCount(len(columns))
-        table_widget.setHorizontalHeaderLabels([col[0] for col in columns])
-        
-        # Populate table
-        for i, row in enumerate(rows):
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(str(value))
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Make cells read-only
-                item.setTextAlignment(Qt.AlignCenter)  # Center-align the text
-                table_widget.setItem(i, j, item)
-        
-        # Set table properties
-        table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table_widget.verticalHeader().setVisible(False)
-        table_widget.setStyleSheet("""
-            QTableWidget {
+
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.setStyleSheet("color: #d4d4d4; font-size: 14px; padding: 10px;")
+        self.right_layout.addWidget(self.loading_label)
+
+        # The first chunk is read on a worker thread; the view is built when it arrives
+        self.table_job = self.query_executor.submit(
+            LazyTableModel.fetch_first_chunk, self.db_connection, self.current_database, table,
+            on_result=lambda first_chunk, t=table: self.show_table_view(t, first_chunk),
+            on_error=lambda message: QMessageBox.warning(self, "Error", message)
+        )
+
+    def show_table_view(self, table, first_chunk):
+        self.table_job = None
+        if table != self.current_table:
+            return
+
+        self.right_layout.removeWidget(self.loading_label)
+        self.loading_label.deleteLater()
+
+        # Further rows are fetched in chunks by the model as the view scrolls
+        model = LazyTableModel(self.db_connection, self.current_database, table, first_chunk=first_chunk)
+
+        # Create table browser (paging controls + view)
+        table_widget = TableBrowser(model, self.query_executor)
+        table_widget.table_view.setStyleSheet("""
+            QTableView {
                 background-color: #2d2d2d;
                 color: white;
                 gridline-color: #3d3d3d;
                 border: none;
                 border-radius: 5px;
             }
-            QTableWidget QHeaderView::section {
+            QTableView QHeaderView::section {
                 background-color: #252525;
                 color: white;
                 padding: 8px;
                 border: 1px solid #3d3d3d;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3EB489;
                 color: #1e1e1e;
             }
@@ -1123,6 +2208,10 @@ class MainWindow(QMainWindow):
         # Add table widget to right panel
         self.right_layout.addWidget(table_widget)  
 
+    def closeEvent(self, event):
+        self.query_executor.cancel_all()
+        super().closeEvent(event)
+
 class CreateTableDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -1287,13 +2376,16 @@ class CreateTableDialog(QDialog):
         return table_name, columns
     
 if __name__ == "__main__":
+        startup_report.mark("modules imported")
         app = QApplication(sys.argv)
+        startup_report.mark("QApplication created")
         
         # Set application-wide style
         app.setStyle('Fusion')
         
         # Show login dialog
         login_dialog = LoginDialog()
+        QTimer.singleShot(0, lambda: startup_report.finish("login dialog shown"))
 
         if login_dialog.exec_() == QDialog.Accepted:
             print("Login accepted, creating main window")
@@ -1303,7 +2395,12 @@ if __name__ == "__main__":
             if user_type == "Admin":
                 main_window = MainWindow(db_connection)
             elif user_type == "Farmer":
+                # Imported on demand so Admin sessions never load the farmer UI
+                from farmer import FarmerMainWindow
                 main_window = FarmerMainWindow(db_connection)
+                if not getattr(db_connection, "offline", False):
+                    # Keep the local copy fresh so the next session can fall back to it
+                    threading.Thread(target=refresh_replica, args=(db_connection,), daemon=True).start()
             
             main_window.show()
             sys.exit(app.exec_())
@@ -0,0 +1,135 @@
+# asyncio front end for DatabaseConnection. Each call runs the blocking
+# method on a worker thread (each worker borrows its own pooled connection),
+# so coroutines can await several queries at once with asyncio.gather.
+#
+# QtAsyncBridge runs those coroutines alongside the Qt event loop. If the
+# application was started on a qasync event loop it is used directly;
+# otherwise a private asyncio loop is stepped from a QTimer while any
+# coroutine is in flight, so no extra dependency is needed.
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QTimer
+
+try:
+    import qasync
+except ImportError:
+    qasync = None
+
+STEP_INTERVAL_MS = 5
+
+
+class AsyncDatabaseConnection:
+    def __init__(self, db_connection, max_workers=None):
+        self.db_connection = db_connection
+        if max_workers is None:
+            max_workers = getattr(db_connection, "max_pool_size", 4)
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="async-db")
+
+    async def _call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get_tables(self, database):
+        return await self._call(self.db_connection.get_tables, database)
+
+    async def get_table_contents(self, database, table):
+        return await self._call(self.db_connection.get_table_contents, database, table)
+
+    async def add_row(self, database, table, values, columns=None):
+        return await self._call(self.db_connection.add_row, database, table, values, columns)
+
+    async def delete_row(self, database, table, condition_column, condition_value):
+        return await self._call(self.db_connection.delete_row, database, table, condition_column, condition_value)
+
+    async def get_product_by_id(self, product_id, database="farmer_schema"):
+        return await self._call(self.db_connection.get_product_by_id, product_id, database)
+
+    async def get_vendor_by_id(self, vendor_id, database="farmer_schema"):
+        return await self._call(self.db_connection.get_vendor_by_id, vendor_id, database)
+
+    async def get_customer_by_id(self, customer_id, database="farmer_schema"):
+        return await self._call(self.db_connection.get_customer_by_id, customer_id, database)
+
+    async def get_inventory_by_id(self, inventory_id):
+        return await self._call(self.db_connection.get_inventory_by_id, inventory_id)
+
+    async def run_query(self, database, sql, params=None):
+        return await self._call(self.db_connection.run_query, database, sql, params)
+
+    async def get_sales_timeseries(self, database, bucket, start=None, end=None, product_id=None, vendor_id=None):
+        return await self._call(self.db_connection.get_sales_timeseries, database, bucket, start, end,
+                                product_id, vendor_id)
+
+    async def timed_query(self, database, sql, params=None):
+        """run_query plus the wall-clock seconds it took: ((rows, description), seconds)."""
+        started = time.perf_counter()
+        result = await self.run_query(database, sql, params)
+        return result, time.perf_counter() - started
+
+    async def run_queries(self, database, queries):
+        """Run {name: sql} concurrently; returns {name: ((rows, description), seconds)}."""
+        names = list(queries)
+        results = await asyncio.gather(*(self.timed_query(database, queries[name]) for name in names))
+        return dict(zip(names, results))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+class QtAsyncBridge(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tasks = set()
+        running = None
+        if qasync is not None:
+            try:
+                running = asyncio.get_event_loop()
+            except RuntimeError:
+                running = None
+        if qasync is not None and isinstance(running, qasync.QEventLoop):
+            # Qt and asyncio already share one loop; nothing to step
+            self.loop = running
+            self._timer = None
+        else:
+            self.loop = asyncio.new_event_loop()
+            self._timer = QTimer(self)
+            self._timer.setInterval(STEP_INTERVAL_MS)
+            self._timer.timeout.connect(self._step)
+
+    def _step(self):
+        # Run every callback that is ready, then hand control back to Qt
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        if not self._tasks:
+            self._timer.stop()
+
+    def submit(self, coro, on_result=None, on_error=None):
+        """Schedule a coroutine; callbacks run on the GUI thread. Returns the task."""
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+
+        def done(finished):
+            self._tasks.discard(finished)
+            if finished.cancelled():
+                return
+            error = finished.exception()
+            if error is not None:
+                if on_error is not None:
+                    on_error(str(error))
+            elif on_result is not None:
+                on_result(finished.result())
+
+        task.add_done_callback(done)
+        if self._timer is not None and not self._timer.isActive():
+            self._timer.start()
+        return task
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._timer is not None and self._tasks:
+            # Let the cancellations run so the tasks are cleaned up
+            self._step()
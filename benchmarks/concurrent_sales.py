@@ -0,0 +1,115 @@
+import argparse
+import datetime
+import getpass
+import itertools
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SALE_COLUMNS = ["SaleID", "VendorID", "ProductID", "CustomerID", "SaleDate", "QuantitySold", "TotalPrice"]
+
+
+def hot_inventory_row(db_connection, database, product_id=None):
+    sql = "SELECT InventoryID, ProductID, VendorID, QuantityInStock FROM Inventory"
+    params = None
+    if product_id is not None:
+        sql += " WHERE ProductID = %s"
+        params = (product_id,)
+    rows, _ = db_connection.run_query(database, sql + " ORDER BY InventoryID LIMIT 1", params)
+    if not rows:
+        raise SystemExit("No Inventory row to sell from; run benchmarks/generate_data.py first.")
+    return rows[0]
+
+
+def stock_level(db_connection, database, inventory_id):
+    rows, _ = db_connection.run_query(
+        database, "SELECT QuantityInStock FROM Inventory WHERE InventoryID = %s", (inventory_id,))
+    return rows[0][0]
+
+
+def run_terminals(db_connection, database, terminals, seconds, batch_size, product_id, vendor_id, customer_id,
+                  sale_ids):
+    """Each terminal records sales of the same product as fast as it can for `seconds`."""
+    today = datetime.date.today()
+    stop_at = time.perf_counter() + seconds
+    sold = [0] * terminals
+    errors = [0] * terminals
+    id_lock = threading.Lock()
+
+    def terminal(index):
+        while time.perf_counter() < stop_at:
+            with id_lock:
+                ids = [next(sale_ids) for _ in range(batch_size)]
+            rows = [(sale_id, vendor_id, product_id, customer_id, today, 1, 1.00) for sale_id in ids]
+            try:
+                if batch_size == 1:
+                    if not db_connection.record_sale(database, rows[0], SALE_COLUMNS):
+                        errors[index] += 1
+                        continue
+                else:
+                    db_connection.record_sales(database, SALE_COLUMNS, rows)
+                sold[index] += len(rows)
+            except Exception as e:
+                print(f"terminal {index}: {e}")
+                errors[index] += 1
+
+    threads = [threading.Thread(target=terminal, args=(index,)) for index in range(terminals)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(sold), sum(errors), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Throughput of N terminals recording sales of one hot product at the same time")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password")
+    parser.add_argument("--database", default="farmer_schema")
+    parser.add_argument("--terminals", default="1,2,4,8", help="comma-separated terminal counts to run")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="sales per transaction (1 = record_sale, more = record_sales group commit)")
+    parser.add_argument("--product-id", type=int, help="product to sell (default: first Inventory row)")
+    args = parser.parse_args()
+
+    from app import DatabaseConnection
+
+    terminal_counts = [int(count) for count in args.terminals.split(",")]
+    db_connection = DatabaseConnection(max_pool_size=max(terminal_counts) + 1)
+    password = args.password if args.password is not None else getpass.getpass()
+    if not db_connection.connect(args.host, args.user, password):
+        raise SystemExit(1)
+
+    try:
+        inventory_id, product_id, vendor_id, _ = hot_inventory_row(db_connection, args.database, args.product_id)
+        rows, _ = db_connection.run_query(args.database, "SELECT MIN(CustomerID) FROM Customer")
+        customer_id = rows[0][0]
+        sale_ids = itertools.count(db_connection.next_sale_id(args.database))
+
+        print(f"Hot product {product_id} (vendor {vendor_id}, inventory row {inventory_id}), "
+              f"{args.batch_size} sale(s) per transaction, {args.seconds:g}s per run")
+        print(f"{'terminals':>9} {'sales':>8} {'sales/sec':>10} {'errors':>7} {'retries':>8} {'stock ok':>9}")
+        for terminals in terminal_counts:
+            stock_before = stock_level(db_connection, args.database, inventory_id)
+            retries_before = db_connection.deadlock_retries
+            sold, errors, elapsed = run_terminals(
+                db_connection, args.database, terminals, args.seconds, args.batch_size,
+                product_id, vendor_id, customer_id, sale_ids)
+            stock_after = stock_level(db_connection, args.database, inventory_id)
+            # Every committed sale must show up as exactly one unit off the shelf
+            stock_ok = stock_before - stock_after == sold
+            print(f"{terminals:>9} {sold:>8} {sold / elapsed:>10.1f} {errors:>7} "
+                  f"{db_connection.deadlock_retries - retries_before:>8} {str(stock_ok):>9}")
+    finally:
+        db_connection.close()
+
+
+if __name__ == "__main__":
+    main()
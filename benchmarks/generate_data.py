@@ -0,0 +1,177 @@
+import argparse
+import datetime
+import getpass
+import itertools
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEASONS = ("Spring", "Summer", "Fall", "Winter")
+# Day of year each season's demand peaks on
+SEASON_PEAK_DAY = {"Spring": 105, "Summer": 196, "Fall": 288, "Winter": 15}
+CATEGORIES = {
+    "Fruits": ["Apples", "Oranges", "Strawberries", "Peaches", "Pears", "Plums", "Cherries", "Blueberries"],
+    "Vegetables": ["Carrots", "Tomatoes", "Pumpkins", "Squash", "Kale", "Lettuce", "Beets", "Potatoes"],
+    "Herbs": ["Basil", "Mint", "Parsley", "Dill", "Cilantro"],
+    "Dairy": ["Goat Cheese", "Butter", "Yogurt"],
+    "Bakery": ["Sourdough", "Rye Bread", "Muffins"],
+}
+DEMAND_TRENDS = ("Low Demand", "Moderate Demand", "High Demand", "Very High Demand")
+
+
+def clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def scale_for(sales):
+    products = clamp(sales // 200, 50, 5000)
+    return {
+        "products": products,
+        "vendors": clamp(products // 10, 5, 500),
+        "customers": clamp(sales // 50, 100, 200000),
+        "sales": sales,
+    }
+
+
+def seasonal_cum_weights(days, season):
+    # Smooth yearly curve peaking in the product's season, with Saturday markets busiest
+    peak = SEASON_PEAK_DAY[season]
+    cumulative = []
+    total = 0.0
+    for day in days:
+        phase = 2 * math.pi * (day.timetuple().tm_yday - peak) / 365.25
+        weight = 1.0 + 0.8 * math.cos(phase)
+        if day.weekday() == 5:
+            weight *= 2.5
+        elif day.weekday() == 6:
+            weight *= 1.5
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def next_id(db_connection, database, table, column):
+    rows, _ = db_connection.run_query(database, f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+    return rows[0][0] + 1
+
+
+def load(db_connection, database, table, columns, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db_connection.add_rows(database, table, columns, rows[start:start + batch_size])
+
+
+def generate(db_connection, database, sales, years=3, seed=42, batch_size=5000):
+    rng = random.Random(seed)
+    scale = scale_for(sales)
+    end = datetime.date.today()
+    days = [end - datetime.timedelta(days=offset) for offset in range(int(365 * years), -1, -1)]
+    started = time.perf_counter()
+
+    product_start = next_id(db_connection, database, "Product", "ProductID")
+    vendor_start = next_id(db_connection, database, "Vendor", "VendorID")
+    customer_start = next_id(db_connection, database, "Customer", "CustomerID")
+    inventory_start = next_id(db_connection, database, "Inventory", "InventoryID")
+    sale_start = next_id(db_connection, database, "Sale", "SaleID")
+    season_start = next_id(db_connection, database, "SeasonalAnalysis", "SeasonID")
+
+    products = []
+    for index in range(scale["products"]):
+        category = rng.choice(list(CATEGORIES))
+        name = f"{rng.choice(CATEGORIES[category])} #{product_start + index}"
+        price = round(rng.uniform(0.99, 14.99), 2)
+        products.append((product_start + index, name, category, price, rng.choice(SEASONS)))
+    load(db_connection, database, "Product",
+         ["ProductID", "Name", "Category", "Price", "SeasonalAvailability"], products, batch_size)
+
+    vendors = [(vendor_start + index, f"Vendor {vendor_start + index}",
+                f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}", f"Stall {index + 1}")
+               for index in range(scale["vendors"])]
+    load(db_connection, database, "Vendor", ["VendorID", "Name", "ContactInfo", "StallLocation"], vendors, batch_size)
+
+    customers = [(customer_start + index, f"Customer {customer_start + index}",
+                  f"customer{customer_start + index}@example.com", rng.choice(list(CATEGORIES)))
+                 for index in range(scale["customers"])]
+    load(db_connection, database, "Customer", ["CustomerID", "Name", "ContactInfo", "Preferences"],
+         customers, batch_size)
+
+    # Each product is carried by one to three vendors
+    inventory = []
+    stocked_by = {}
+    for product in products:
+        for vendor in rng.sample(vendors, k=min(len(vendors), rng.randint(1, 3))):
+            stocked_by.setdefault(product[0], []).append(vendor[0])
+            inventory.append((inventory_start + len(inventory), product[0], vendor[0],
+                              rng.randint(0, 500), rng.randint(10, 50)))
+    load(db_connection, database, "Inventory",
+         ["InventoryID", "ProductID", "VendorID", "QuantityInStock", "RestockThreshold"], inventory, batch_size)
+
+    # Popularity follows a Zipf-like curve so a few products dominate, as at a real market
+    popularity = list(itertools.accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(len(products))))
+    date_weights = {season: seasonal_cum_weights(days, season) for season in SEASONS}
+    units_by_product = {product[0]: 0 for product in products}
+
+    sale_columns = ["SaleID", "VendorID", "ProductID", "CustomerID", "SaleDate", "QuantitySold", "TotalPrice"]
+    batch = []
+    for index in range(sales):
+        product = rng.choices(products, cum_weights=popularity)[0]
+        quantity = rng.randint(1, 10)
+        sale_date = rng.choices(days, cum_weights=date_weights[product[4]])[0]
+        batch.append((sale_start + index, rng.choice(stocked_by[product[0]]), product[0],
+                      customer_start + rng.randrange(len(customers)), sale_date, quantity,
+                      round(quantity * product[3], 2)))
+        units_by_product[product[0]] += quantity
+        if len(batch) >= batch_size:
+            db_connection.add_rows(database, "Sale", sale_columns, batch)
+            batch = []
+            print(f"  {index + 1:,} / {sales:,} sales", end="\r", flush=True)
+    if batch:
+        db_connection.add_rows(database, "Sale", sale_columns, batch)
+    print()
+
+    # Demand labels follow the generated volumes, by quartile
+    ranked = sorted(units_by_product, key=units_by_product.get)
+    seasonal = []
+    for rank, product_id in enumerate(ranked):
+        season = products[product_id - product_start][4]
+        seasonal.append((season_start + rank, product_id, DEMAND_TRENDS[rank * len(DEMAND_TRENDS) // len(ranked)],
+                         season))
+    load(db_connection, database, "SeasonalAnalysis",
+         ["SeasonID", "ProductID", "DemandTrend", "SeasonalPeakPeriod"], seasonal, batch_size)
+
+    scale["inventory"] = len(inventory)
+    scale["seconds"] = time.perf_counter() - started
+    return scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill farmer_schema with seeded synthetic data")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password")
+    parser.add_argument("--database", default="farmer_schema")
+    parser.add_argument("--sales", type=float, default=1e4, help="number of sales rows (1e3 to 1e7)")
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    from app import DatabaseConnection
+
+    db_connection = DatabaseConnection()
+    password = args.password if args.password is not None else getpass.getpass()
+    if not db_connection.connect(args.host, args.user, password):
+        raise SystemExit(1)
+    try:
+        scale = generate(db_connection, args.database, int(args.sales), args.years, args.seed, args.batch_size)
+    finally:
+        db_connection.close()
+    print(f"Generated {scale['products']} products, {scale['vendors']} vendors, {scale['customers']} customers, "
+          f"{scale['inventory']} inventory rows and {scale['sales']:,} sales in {scale['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import datetime
+import getpass
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from farmer_queries import FARMER_QUERIES
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+TABLES = ("Product", "Vendor", "Customer", "Inventory", "Sale", "SeasonalAnalysis")
+
+
+def bench(func, rounds, warmup=1, setup=None):
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+    timings = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.mean(timings),
+        "median": statistics.median(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def table_sizes(db_connection, database):
+    sizes = {}
+    for table in TABLES:
+        rows, _ = db_connection.run_query(database, f"SELECT COUNT(*) FROM {table}")
+        sizes[table] = rows[0][0]
+    return sizes
+
+
+def read_cases(db_connection, database):
+    sale_count = table_sizes(db_connection, database)["Sale"]
+    deep_offset = max(sale_count - 200, 0)
+    cases = {
+        "get_databases": lambda: db_connection.get_databases(),
+        "get_tables": lambda: db_connection.get_tables(database),
+        "get_column_info (cold)": (lambda: db_connection.get_column_info(database, "Sale"),
+                                   lambda: db_connection.invalidate_schema(database, "Sale")),
+        "get_column_info (cached)": lambda: db_connection.get_column_info(database, "Sale"),
+        "has_rows Sale": lambda: db_connection.has_rows(database, "Sale"),
+        "get_table_chunk Sale first": lambda: db_connection.get_table_chunk(database, "Sale", 0, 200),
+        "get_table_chunk Sale last": lambda: db_connection.get_table_chunk(database, "Sale", deep_offset, 200),
+        "get_product_by_id": lambda: db_connection.get_product_by_id(1),
+        "get_inventory_by_id": lambda: db_connection.get_inventory_by_id(1),
+    }
+    for name, (sql, params) in FARMER_QUERIES.items():
+        if sql.lstrip().upper().startswith("SELECT") and params is None:
+            cases[f"analytics: {name}"] = lambda sql=sql: db_connection.run_query(database, sql)
+    return cases
+
+
+def write_cases(db_connection, database):
+    rows, _ = db_connection.run_query(database, "SELECT COALESCE(MAX(CustomerID), 0) FROM Customer")
+    next_customer = [rows[0][0] + 1]
+    inserted = []
+
+    def add_customer():
+        customer_id = next_customer[0]
+        next_customer[0] += 1
+        inserted.append(customer_id)
+        db_connection.add_row(database, "Customer", (customer_id, "Benchmark", "bench@example.com", ""),
+                              ["CustomerID", "Name", "ContactInfo", "Preferences"])
+
+    def cleanup():
+        for customer_id in inserted:
+            db_connection.delete_row(database, "Customer", "CustomerID", customer_id)
+
+    return {"add_row Customer": add_customer}, cleanup
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def latest_result():
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+    return paths[-1] if paths else None
+
+
+def print_results(results, baseline=None):
+    baseline_cases = baseline["cases"] if baseline else {}
+    print(f"{'case':<40} {'median ms':>10} {'min ms':>10} {'stddev':>10} {'vs base':>9}")
+    for name, stats in results["cases"].items():
+        change = ""
+        if name in baseline_cases and baseline_cases[name]["median"] > 0:
+            ratio = stats["median"] / baseline_cases[name]["median"] - 1
+            change = f"{ratio:+.0%}"
+        print(f"{name:<40} {stats['median'] * 1e3:>10.2f} {stats['min'] * 1e3:>10.2f} "
+              f"{stats['stddev'] * 1e3:>10.2f} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time DatabaseConnection methods and analytics queries")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password")
+    parser.add_argument("--database", default="farmer_schema")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--include-writes", action="store_true", help="also time inserts (rows are removed afterwards)")
+    parser.add_argument("--compare", help="results file to compare against (default: latest in benchmarks/results)")
+    parser.add_argument("--label", default="", help="free-form note stored with the results")
+    args = parser.parse_args()
+
+    from app import DatabaseConnection
+
+    db_connection = DatabaseConnection()
+    password = args.password if args.password is not None else getpass.getpass()
+    if not db_connection.connect(args.host, args.user, password):
+        raise SystemExit(1)
+
+    baseline_path = args.compare or latest_result()
+    try:
+        results = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "label": args.label,
+            "table_sizes": table_sizes(db_connection, args.database),
+            "cases": {},
+        }
+        for name, case in read_cases(db_connection, args.database).items():
+            func, setup = case if isinstance(case, tuple) else (case, None)
+            results["cases"][name] = bench(func, args.rounds, setup=setup)
+
+        if args.include_writes:
+            cases, cleanup = write_cases(db_connection, args.database)
+            try:
+                for name, func in cases.items():
+                    results["cases"][name] = bench(func, args.rounds)
+            finally:
+                cleanup()
+    finally:
+        db_connection.close()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump(results, results_file, indent=2)
+
+    baseline = None
+    if baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("table_sizes") != results["table_sizes"]:
+            print(f"Note: baseline {os.path.basename(baseline_path)} was recorded at different table sizes")
+
+    print(f"Table sizes: {results['table_sizes']}")
+    print_results(results, baseline)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
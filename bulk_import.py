@@ -0,0 +1,149 @@
+import csv
+import os
+import time
+
+from mysql.connector import Error
+
+from db_pool import is_transient_error
+
+# Attempts at a batch (or row) that failed for reasons unrelated to its data
+TRANSIENT_RETRIES = 3
+TRANSIENT_BACKOFF = 0.5
+
+
+class BulkImporter:
+    def __init__(self, db_connection, database, table, batch_size=1000, progress_callback=None):
+        self.db_connection = db_connection
+        self.database = database
+        self.table = table
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+        self.cancelled = False
+        # Batches the server refused and that were then loaded row by row
+        self.batches_split = 0
+        self.retries = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _read_header(self, reader):
+        header = next(reader, None)
+        if not header:
+            raise ValueError("File is empty or has no header row.")
+        header = [name.strip() for name in header]
+        table_columns = self.db_connection.get_columns(self.database, self.table)
+        unknown = [name for name in header if name not in table_columns]
+        if unknown:
+            raise ValueError(f"Columns not in {self.table}: {', '.join(unknown)}")
+        return header
+
+    def _add_rows(self, columns, rows):
+        # A deadlock or dropped connection says nothing about the rows, so
+        # try again; after the last attempt the error stops the import
+        for attempt in range(TRANSIENT_RETRIES + 1):
+            try:
+                return self.db_connection.add_rows(self.database, self.table, columns, rows)
+            except Error as e:
+                if not is_transient_error(e) or attempt == TRANSIENT_RETRIES:
+                    raise
+                self.retries += 1
+                time.sleep(TRANSIENT_BACKOFF * (2 ** attempt))
+
+    def _load_batch(self, columns, batch, reject_writer):
+        """Load a batch; returns (rows loaded, rows rejected, error).
+
+        error is set when a transient failure outlasted its retries; rows
+        from there on were neither loaded nor rejected.
+        """
+        try:
+            self._add_rows(columns, batch)
+            return len(batch), 0, None
+        except Error as e:
+            if is_transient_error(e):
+                return 0, 0, str(e)
+        except ValueError:
+            pass
+
+        # One bad row should not take the other rows in its batch down with it
+        self.batches_split += 1
+        loaded = 0
+        rejected = 0
+        for row in batch:
+            try:
+                self._add_rows(columns, [row])
+                loaded += 1
+            except (Error, ValueError) as e:
+                if isinstance(e, Error) and is_transient_error(e):
+                    return loaded, rejected, str(e)
+                reject_writer.writerow(["" if value is None else value for value in row] + [str(e)])
+                rejected += 1
+        return loaded, rejected, None
+
+    def _report(self, loaded, rejected, started):
+        if self.progress_callback:
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            self.progress_callback(loaded, rejected, loaded / elapsed)
+
+    def import_file(self, path, delimiter=None, reject_path=None):
+        if delimiter is None:
+            delimiter = "\t" if os.path.splitext(path)[1].lower() in (".tsv", ".tab") else ","
+        if reject_path is None:
+            reject_path = f"{os.path.splitext(path)[0]}.rejects.csv"
+
+        loaded = 0
+        rejected = 0
+        error = None
+        started = time.perf_counter()
+
+        with open(path, newline="", encoding="utf-8-sig") as source, \
+                open(reject_path, "w", newline="", encoding="utf-8") as rejects:
+            reader = csv.reader(source, delimiter=delimiter)
+            columns = self._read_header(reader)
+            reject_writer = csv.writer(rejects)
+            reject_writer.writerow(columns + ["Error"])
+
+            # Stream the file: only one batch is held in memory at a time
+            batch = []
+            for line_number, record in enumerate(reader, start=2):
+                if self.cancelled:
+                    break
+                if not any(field.strip() for field in record):
+                    continue
+                if len(record) != len(columns):
+                    reject_writer.writerow(record + [f"Line {line_number}: expected {len(columns)} fields, got {len(record)}"])
+                    rejected += 1
+                    continue
+                batch.append(tuple(field if field != "" else None for field in record))
+                if len(batch) >= self.batch_size:
+                    batch_loaded, batch_rejected, error = self._load_batch(columns, batch, reject_writer)
+                    loaded += batch_loaded
+                    rejected += batch_rejected
+                    batch = []
+                    self._report(loaded, rejected, started)
+                    if error is not None:
+                        break
+
+            if batch and not self.cancelled and error is None:
+                batch_loaded, batch_rejected, error = self._load_batch(columns, batch, reject_writer)
+                loaded += batch_loaded
+                rejected += batch_rejected
+            self._report(loaded, rejected, started)
+
+        if rejected == 0:
+            os.remove(reject_path)
+            reject_path = None
+
+        elapsed = time.perf_counter() - started
+        return {
+            "table": self.table,
+            "rows_loaded": loaded,
+            "rows_rejected": rejected,
+            "seconds": elapsed,
+            "rows_per_sec": loaded / elapsed if elapsed > 0 else 0.0,
+            "reject_path": reject_path,
+            "cancelled": self.cancelled,
+            "batches_split": self.batches_split,
+            "retries": self.retries,
+            # Why the import stopped early, if the server became unreachable
+            "error": error,
+        }
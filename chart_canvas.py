@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QResizeEvent
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+
+RESIZE_REDRAW_MS = 150
+BLIT_SIZES = 3
+
+
+class ChartCanvas(FigureCanvasQTAgg):
+    """Agg canvas that blits sizes it has already rendered and debounces the rest.
+
+    The stock canvas re-renders the whole figure for every resize event, so
+    dragging a window edge queues dozens of full redraws. After each full
+    render the pixels are kept with copy_from_bbox, keyed by canvas size, so
+    returning to a size drawn since the chart last changed (maximize and
+    restore, a drag that ends where it began) is a restore_region blit.
+
+    A size not seen before can't be blitted: the axes, ticks and text have
+    to be laid out again at the new size, which is the full render. Those
+    resizes are debounced instead; the first is applied straight away and
+    any that follow within RESIZE_REDRAW_MS are folded into one, applied
+    when the drag pauses, with the last render shown until then.
+    """
+
+    def __init__(self, figure=None):
+        super().__init__(figure)
+        self._build = None
+        self.render_cache = None
+        self.render_key = None
+        # Renders of the current content, size -> copy_from_bbox region
+        self._backgrounds = OrderedDict()
+        self._resizing = False
+        self._pending_resize = None
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(RESIZE_REDRAW_MS)
+        self._resize_timer.timeout.connect(self._apply_pending_resize)
+
+    def set_chart(self, build, render_cache=None, render_key=None):
+        """Draw the figure with build(figure), or reuse a cached render of render_key.
+
+        build only runs the first time the figure really has to be drawn, so
+        reopening a cached chart at the same size never builds it at all.
+        """
+        self._build = build
+        self.render_cache = render_cache
+        self.render_key = render_key
+        self._backgrounds.clear()
+
+    def _restore(self, region):
+        self.get_renderer().restore_region(region)
+        self.update()
+
+    def draw(self):
+        size = (self.figure.bbox.width, self.figure.bbox.height, self.figure.dpi)
+        region = self._backgrounds.get(size)
+        if region is not None:
+            self._backgrounds.move_to_end(size)
+            self._restore(region)
+            return
+        cached = self.render_key is not None and self.render_cache is not None
+        if cached:
+            region = self.render_cache.get(self.render_key, size)
+            if region is not None:
+                self._restore(region)
+                return
+        if self._build is not None:
+            build, self._build = self._build, None
+            build(self.figure)
+        super().draw()
+        region = self.copy_from_bbox(self.figure.bbox)
+        self._backgrounds[size] = region
+        while len(self._backgrounds) > BLIT_SIZES:
+            self._backgrounds.popitem(last=False)
+        if cached:
+            self.render_cache.put(self.render_key, size, region, int(size[0]) * int(size[1]) * 4)
+
+    def draw_idle(self):
+        # Anything but a resize asking for a redraw means the chart itself changed
+        if not self._resizing:
+            self._backgrounds.clear()
+        super().draw_idle()
+
+    def release(self):
+        """Drop the figure's artists and the build callback once the chart is closed."""
+        self._resize_timer.stop()
+        self._pending_resize = None
+        self._build = None
+        self._backgrounds.clear()
+        self.figure.clear()
+
+    def resizeEvent(self, event):
+        if self._resize_timer.isActive():
+            self._pending_resize = QResizeEvent(event.size(), event.oldSize())
+        else:
+            self._resize(event)
+        self._resize_timer.start()
+
+    def _resize(self, event):
+        self._resizing = True
+        try:
+            super().resizeEvent(event)
+        finally:
+            self._resizing = False
+
+    def _apply_pending_resize(self):
+        event, self._pending_resize = self._pending_resize, None
+        if event is not None:
+            self._resize(event)
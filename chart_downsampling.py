@@ -0,0 +1,117 @@
+# Keeps what the analytics charts hand to matplotlib bounded, however many
+# rows the query returned: line series are reduced with LTTB, bar charts keep
+# their largest categories and fold the rest into one "Other" bar, and only
+# every k-th category gets a tick label.
+import math
+
+MAX_LINE_POINTS = 500
+MAX_BARS = 30
+MAX_TICK_LABELS = 25
+MARKER_POINT_LIMIT = 60
+OTHER_LABEL = "Other"
+
+
+def _number(value):
+    # MySQL hands back Decimals and NULLs; plotting only needs floats
+    if value is None:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def lttb_indices(values, threshold=MAX_LINE_POINTS):
+    """Indices of at most threshold points that keep the shape of the series.
+
+    Largest-Triangle-Three-Buckets: the first and last points are kept and
+    every bucket in between contributes the point forming the largest
+    triangle with the point already chosen and the average of the next
+    bucket. x is the position in the series.
+    """
+    count = len(values)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+    ys = [_number(value) for value in values]
+    every = (count - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for bucket in range(threshold - 2):
+        start = int(math.floor(bucket * every)) + 1
+        end = int(math.floor((bucket + 1) * every)) + 1
+        next_start = end
+        next_end = min(int(math.floor((bucket + 2) * every)) + 1, count)
+        if next_start >= next_end:
+            avg_x, avg_y = count - 1, ys[-1]
+        else:
+            avg_x = (next_start + next_end - 1) / 2
+            avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+        anchor_x, anchor_y = a, ys[a]
+        best, best_area = start, -1.0
+        for i in range(start, min(end, count - 1)):
+            area = abs((anchor_x - avg_x) * (ys[i] - anchor_y) - (anchor_x - i) * (avg_y - anchor_y))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+        a = best
+    selected.append(count - 1)
+    return selected
+
+
+def downsample_indices(rows, value_indexes, threshold=MAX_LINE_POINTS):
+    """Positions of the rows to draw for a line chart of the given columns.
+
+    Each series picks its own LTTB points and the union is kept, so peaks in
+    any of them survive; at most len(value_indexes) * threshold come back.
+    """
+    if len(rows) <= threshold:
+        return list(range(len(rows)))
+    keep = set()
+    for index in value_indexes:
+        keep.update(lttb_indices([row[index] for row in rows], threshold))
+    return sorted(keep)
+
+
+def top_rows(rows, value_index, limit=MAX_BARS, combine=None, other_label=OTHER_LABEL, key=None):
+    """The limit - 1 rows with the largest value, then one row folding the rest.
+
+    combine maps a column index to a function building the "Other" row's
+    value from the folded values; other numeric columns are summed and the
+    rest left blank. key overrides the ranking, e.g. to keep the lowest stock.
+    """
+    if len(rows) <= limit:
+        return list(rows)
+    key = key or (lambda row: _number(row[value_index]))
+    ranked = sorted(rows, key=key, reverse=True)
+    kept, rest = ranked[:limit - 1], ranked[limit - 1:]
+    other = [f"{other_label} ({len(rest):,})"]
+    for column in range(1, len(rest[0])):
+        values = [row[column] for row in rest]
+        if combine and column in combine:
+            other.append(combine[column](values))
+        elif all(value is None or isinstance(value, (int, float)) or hasattr(value, "as_tuple")
+                 for value in values):
+            other.append(sum(_number(value) for value in values))
+        else:
+            other.append("")
+    return kept + [tuple(other)]
+
+
+def mean_of(values):
+    # For columns where a total means nothing, e.g. a demand trend
+    numbers = [_number(value) for value in values]
+    return round(sum(numbers) / len(numbers), 2) if numbers else 0.0
+
+
+def set_category_ticks(ax, labels, max_labels=MAX_TICK_LABELS, rotation=45):
+    """Label at most max_labels evenly spaced categories at positions 0..n-1."""
+    step = max(1, math.ceil(len(labels) / max_labels))
+    positions = list(range(0, len(labels), step))
+    ax.set_xticks(positions)
+    ax.set_xticklabels([str(labels[i]) for i in positions], rotation=rotation, ha='right')
+    ax.set_xlim(-0.5, len(labels) - 0.5)
+
+
+def line_marker(point_count):
+    # Per-point markers cost a draw call each and turn dense lines into smears
+    return 'o' if point_count <= MARKER_POINT_LIMIT else None
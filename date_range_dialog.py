@@ -0,0 +1,98 @@
+from PyQt5.QtCore import QDate
+from PyQt5.QtWidgets import QComboBox, QDateEdit, QDialog, QDialogButtonBox, QFormLayout, QLineEdit, QMessageBox
+
+from sales_timeseries import ALL_TIME, BUCKETS, CUSTOM_RANGE, MONTHLY, RANGE_PRESETS, preset_range
+
+
+def _optional_int(text, label):
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"{label} must be a whole number.")
+
+
+class DateRangeDialog(QDialog):
+    """Range picker for the analytics windows; with series=True it also asks for a bucket and filters."""
+
+    def __init__(self, title, series=False, initial=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.series = series
+        self.result_selection = None
+        initial = initial or {}
+
+        layout = QFormLayout(self)
+
+        self.preset_combo = QComboBox()
+        self.preset_combo.addItems(RANGE_PRESETS)
+        self.start_input = QDateEdit()
+        self.end_input = QDateEdit()
+        for date_input in (self.start_input, self.end_input):
+            date_input.setCalendarPopup(True)
+            date_input.setDisplayFormat("yyyy-MM-dd")
+        self.start_input.setDate(QDate(initial["start"]) if initial.get("start") else QDate.currentDate().addDays(-29))
+        self.end_input.setDate(QDate(initial["end"]) if initial.get("end") else QDate.currentDate())
+        self.preset_combo.currentTextChanged.connect(self.apply_preset)
+        self.preset_combo.setCurrentText(initial.get("preset", ALL_TIME if not series else "Last 90 days"))
+        self.apply_preset(self.preset_combo.currentText())
+
+        layout.addRow("Range:", self.preset_combo)
+        layout.addRow("From:", self.start_input)
+        layout.addRow("To:", self.end_input)
+
+        if series:
+            self.bucket_combo = QComboBox()
+            self.bucket_combo.addItems([bucket.capitalize() for bucket in BUCKETS])
+            self.bucket_combo.setCurrentText(initial.get("bucket", MONTHLY).capitalize())
+            self.product_input = QLineEdit("" if initial.get("product_id") is None else str(initial["product_id"]))
+            self.product_input.setPlaceholderText("All products")
+            self.vendor_input = QLineEdit("" if initial.get("vendor_id") is None else str(initial["vendor_id"]))
+            self.vendor_input.setPlaceholderText("All vendors")
+            layout.addRow("Group by:", self.bucket_combo)
+            layout.addRow("Product ID:", self.product_input)
+            layout.addRow("Vendor ID:", self.vendor_input)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept_selection)
+        button_box.rejected.connect(self.reject)
+        layout.addRow(button_box)
+
+    def apply_preset(self, preset):
+        custom = preset == CUSTOM_RANGE
+        self.start_input.setEnabled(custom)
+        self.end_input.setEnabled(custom)
+        start, end = preset_range(preset)
+        if start is not None:
+            self.start_input.setDate(QDate(start))
+            self.end_input.setDate(QDate(end))
+
+    def accept_selection(self):
+        preset = self.preset_combo.currentText()
+        if preset == ALL_TIME:
+            start = end = None
+        else:
+            start = self.start_input.date().toPyDate()
+            end = self.end_input.date().toPyDate()
+            if start > end:
+                QMessageBox.warning(self, "Error", "The start of the range is after its end.")
+                return
+        selection = {"preset": preset, "start": start, "end": end}
+        if self.series:
+            try:
+                selection["product_id"] = _optional_int(self.product_input.text(), "Product ID")
+                selection["vendor_id"] = _optional_int(self.vendor_input.text(), "Vendor ID")
+            except ValueError as e:
+                QMessageBox.warning(self, "Error", str(e))
+                return
+            selection["bucket"] = self.bucket_combo.currentText().lower()
+        self.result_selection = selection
+        self.accept()
+
+
+def describe_range(selection):
+    if selection.get("start") is None:
+        return "all time"
+    return f"{selection['start']:%Y-%m-%d} to {selection['end']:%Y-%m-%d}"
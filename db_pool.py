@@ -0,0 +1,200 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+from query_stats import InstrumentedConnection
+from statement_cache import StatementCache
+
+
+# ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT
+RETRYABLE_LOCK_ERRORS = (1213, 1205)
+# ER_DUP_ENTRY
+DUPLICATE_KEY_ERROR = 1062
+
+
+# Idle time after which a pooled connection is pinged before reuse
+PING_AFTER_IDLE_SECONDS = 30
+
+
+class PoolExhaustedError(Error):
+    pass
+
+
+def is_transient_error(error):
+    """True when error says nothing about the statement or its rows.
+
+    Lock contention, a lost connection (client errors are 2000-2999) or an
+    exhausted pool may clear up on a later attempt; a server error such as a
+    foreign key or duplicate key violation fails the same way every time.
+    """
+    errno = getattr(error, "errno", None)
+    if errno is None or errno < 1000:
+        return True
+    return errno in RETRYABLE_LOCK_ERRORS or 2000 <= errno < 3000
+
+
+def is_server_error(error):
+    # Errors the server sent back (1000-1999) leave the connection usable
+    errno = getattr(error, "errno", None)
+    return isinstance(error, Error) and errno is not None and 1000 <= errno < 2000
+
+
+class ConnectionPool:
+    def __init__(self, connect_args, min_size=1, max_size=8, idle_timeout=300, checkout_timeout=30,
+                 statement_cache_size=64, query_stats=None, ping_after_idle=PING_AFTER_IDLE_SECONDS):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+        self.connect_args = dict(connect_args)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.statement_cache_size = statement_cache_size
+        self.query_stats = query_stats
+        # Connections idle for less than this are handed out without a ping
+        self.ping_after_idle = ping_after_idle
+
+        self._idle = []  # (connection, time returned to the pool), most recently used last
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Condition()
+
+        # Open the minimum number of connections up front so a bad host or
+        # password fails at login time instead of on the first query.
+        for _ in range(min_size):
+            self._idle.append((self._open(), time.monotonic()))
+            self._size += 1
+
+    def _open(self):
+        connection = mysql.connector.connect(**self.connect_args)
+        if self.query_stats is not None:
+            # Every cursor opened on this connection is timed into query_stats
+            connection = InstrumentedConnection(connection, self.query_stats)
+        # Schema the session starts in; DatabaseConnection updates it on USE
+        connection.active_schema = self.connect_args.get("database")
+        # Prepared statements live in the server session, so they are cached per connection
+        connection.statement_cache = StatementCache(connection, self.statement_cache_size)
+        return connection
+
+    def connect_unpooled(self):
+        # Same server and credentials, but never counted against max_size
+        return mysql.connector.connect(**self.connect_args)
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    def _is_healthy(self, connection):
+        try:
+            return connection.is_connected()
+        except Error:
+            return False
+
+    def _reap_idle(self):
+        # Caller must hold self._lock
+        now = time.monotonic()
+        keep = []
+        for connection, returned_at in self._idle:
+            if (self._size > self.min_size and self.idle_timeout is not None
+                    and now - returned_at > self.idle_timeout):
+                self._discard(connection)
+                self._size -= 1
+            else:
+                keep.append((connection, returned_at))
+        self._idle = keep
+
+    def acquire(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            connection = None
+            with self._lock:
+                while True:
+                    if self._closed:
+                        raise PoolExhaustedError(msg="Connection pool is closed")
+                    self._reap_idle()
+                    if self._idle:
+                        connection, returned_at = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(msg=f"No connection available after {self.checkout_timeout}s")
+                    self._lock.wait(remaining)
+
+            # Health check and handshake happen outside the lock so other
+            # borrowers are not held up by a slow server.
+            if connection is not None:
+                # A connection that was just in use is trusted without a round trip
+                if (time.monotonic() - returned_at < self.ping_after_idle
+                        or self._is_healthy(connection)):
+                    return connection
+                # Dead connection (server restart, network drop): drop it and retry
+                self._discard(connection)
+                with self._lock:
+                    self._size -= 1
+                continue
+
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    self._lock.notify()
+                raise
+
+    def release(self, connection, discard=False):
+        # Never hand the next borrower a connection with unread rows or an
+        # open transaction; one that can't be cleaned up is dropped
+        if not discard:
+            try:
+                connection.handle_unread_result()
+                if connection.in_transaction:
+                    connection.rollback()
+            except Error:
+                discard = True
+
+        with self._lock:
+            if self._closed or discard:
+                self._discard(connection)
+                self._size -= 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException as e:
+            # The server answering with an error shows the session is fine;
+            # anything else may have left it mid-result or disconnected
+            self.release(connection, discard=not is_server_error(e))
+            raise
+        self.release(connection)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for connection, _ in self._idle:
+                self._discard(connection)
+            self._size -= len(self._idle)
+            self._idle = []
+            self._lock.notify_all()
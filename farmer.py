@@ -1,21 +1,50 @@
 import sys
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QScrollArea,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMenu, QMessageBox, QInputDialog, QLineEdit,
-    QDialog, QFormLayout, QDialogButtonBox
+    QHeaderView, QMenu, QMessageBox, QInputDialog, QLineEdit,
+    QDialog, QFormLayout, QDialogButtonBox, QTableView, QFileDialog, QProgressDialog
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 import mysql.connector
 from mysql.connector import Error
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+
+from async_db import AsyncDatabaseConnection, QtAsyncBridge
+from bulk_import import BulkImporter
+from chart_downsampling import MAX_BARS, downsample_indices, line_marker, set_category_ticks, top_rows
+from index_advisor import FINDING_COLUMNS, run_index_advisor
+from migrate import pending_migrations
+from pos_entry import RapidSaleEntry
+from date_range_dialog import DateRangeDialog, describe_range
+from farmer_queries import (FORECAST_DEMAND_SQL, INVENTORY_ANALYTICS_SQL, SALES_ANALYTICS_RANGE_SQL,
+                            SALES_ANALYTICS_SQL, SEASONAL_PATTERNS_SQL)
+from query_executor import QueryExecutor
+from query_stats_panel import QueryStatsPanel
+from render_cache import RenderCache, data_hash
+from restock_monitor import ALERT_COLUMNS, RestockMonitor
+from sales_timeseries import TIMESERIES_COLUMNS, period_label
+from table_browser import TableBrowser
+from table_export import TableExporter, describe_result
+from table_model import LazyTableModel, RowsTableModel
 
 import datetime
+import time
+
+SYNC_STATUS_INTERVAL_MS = 5000
+FORECAST_CHART_PRODUCTS = 15
+
+def load_plotting():
+    # matplotlib is imported on first use of a chart rather than at module
+    # import, so logins that never plot don't pay its startup cost. Figures
+    # are built directly rather than through pyplot, whose global registry
+    # would keep every chart ever opened alive
+    from matplotlib.figure import Figure
+    from chart_canvas import ChartCanvas
+    return Figure, ChartCanvas
 
 class GraphWindow(QDialog):
-    def __init__(self, title, rows, columns, graph_func):
+    def __init__(self, title, rows, columns, graph_func, query=None, render_cache=None):
         super().__init__()
+        self.setAttribute(Qt.WA_DeleteOnClose)
         self.setWindowTitle(title)
         self.setGeometry(100, 100, 1200, 600)
         
@@ -23,29 +52,19 @@ class GraphWindow(QDialog):
         main_layout.setContentsMargins(10, 10, 10, 10)  # Add padding around the widgets
         self.setLayout(main_layout)
         
-        # Table
-        table_widget = QTableWidget()
-        table_widget.setRowCount(len(rows))
-        table_widget.setColumnCount(len(columns))
-        table_widget.setHorizontalHeaderLabels([col[0] for col in columns])
-        
-        for i, row in enumerate(rows):
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(str(value))
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                item.setTextAlignment(Qt.AlignCenter)
-                table_widget.setItem(i, j, item)
-        
-        table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table_widget.verticalHeader().setVisible(False)
-        table_widget.setStyleSheet("""
-            QTableWidget {
+        # Table; a model over the rows so only the visible cells are built
+        table_view = QTableView()
+        table_view.setModel(RowsTableModel(rows, [col[0] for col in columns], table_view))
+        table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table_view.verticalHeader().setVisible(False)
+        table_view.setStyleSheet("""
+            QTableView {
                 background-color: #2d2d2d;
                 color: white;
                 gridline-color: #3d3d3d;
                 border: none;
             }
-            QTableWidget QHeaderView::section {
+            QTableView QHeaderView::section {
                 background-color: #252525;
                 color: white;
                 padding: 20px;
@@ -53,21 +72,156 @@ class GraphWindow(QDialog):
                 font-weight: bold;
             }
         """)
-        main_layout.addWidget(table_widget)
+        main_layout.addWidget(table_view)
         
-        # Graph
-        fig, ax = plt.subplots()
+        # Graph; graph_func keeps what it draws bounded (see chart_downsampling).
+        # Reopening the same query over unchanged rows reuses the last render
+        Figure, ChartCanvas = load_plotting()
+        self.canvas = ChartCanvas(Figure())
+        render_key = None
+        if query is not None and render_cache is not None:
+            render_key = (graph_func.__name__, query, data_hash(rows))
+        self.canvas.set_chart(lambda fig: graph_func(fig.add_subplot(), rows), render_cache, render_key)
+        main_layout.addWidget(self.canvas)
+        self.finished.connect(self.canvas.release)
+
+class AnalyticsDashboard(QDialog):
+    """Runs the analytics queries concurrently and draws each chart as its query returns."""
+
+    def __init__(self, async_db, bridge, database, panels, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle("Analytics Dashboard")
+        self.setGeometry(100, 100, 1400, 900)
+        self.panels = panels
+        self.tasks = []
+        self.elapsed = []
+
+        main_layout = QVBoxLayout()
+        main_layout.setContentsMargins(10, 10, 10, 10)
+        self.setLayout(main_layout)
+
+        self.status_label = QLabel(f"Running {len(panels)} queries...")
+        main_layout.addWidget(self.status_label)
+
+        Figure, ChartCanvas = load_plotting()
+        self.fig = Figure()
+        self.axes = list(self.fig.subplots(2, 2).flat)
+        for ax, (title, _, _) in zip(self.axes, panels):
+            ax.set_title(f"{title} (loading...)")
+        self.canvas = ChartCanvas(self.fig)
+        main_layout.addWidget(self.canvas)
+        self.finished.connect(self.release)
+
+        # One task per chart, all in flight at once
+        self.started = time.perf_counter()
+        for index, (title, sql, _) in enumerate(panels):
+            self.tasks.append(bridge.submit(
+                async_db.timed_query(database, sql),
+                on_result=lambda result, index=index: self.show_panel(index, result),
+                on_error=lambda message, index=index: self.show_panel_error(index, message)
+            ))
+
+    def show_panel(self, index, result):
+        (rows, _), seconds = result
+        title, _, graph_func = self.panels[index]
+        ax = self.axes[index]
+        ax.clear()
         graph_func(ax, rows)
-        canvas = FigureCanvas(fig)
-        main_layout.addWidget(canvas)
+        ax.set_title(f"{title} ({seconds * 1000:.0f} ms)")
+        self.fig.tight_layout()
+        self.canvas.draw_idle()
+        self.panel_done(seconds)
+
+    def show_panel_error(self, index, message):
+        title = self.panels[index][0]
+        self.axes[index].set_title(f"{title} failed: {message}")
+        self.canvas.draw_idle()
+        self.panel_done(None)
+
+    def panel_done(self, seconds):
+        self.elapsed.append(seconds)
+        if len(self.elapsed) < len(self.panels):
+            return
+        wall = time.perf_counter() - self.started
+        serial = sum(seconds for seconds in self.elapsed if seconds is not None)
+        self.status_label.setText(
+            f"{len(self.panels)} queries in {wall * 1000:.0f} ms "
+            f"({serial * 1000:.0f} ms if run one after another)")
+
+    def release(self):
+        # finished fires however the dialog ends: close button, Escape or accept
+        for task in self.tasks:
+            task.cancel()
+        self.canvas.release()
+
+class ReportWindow(QDialog):
+    def __init__(self, title, rows, column_names):
+        super().__init__()
+        self.setWindowTitle(title)
+        self.setGeometry(100, 100, 1200, 500)
+
+        main_layout = QVBoxLayout()
+        main_layout.setContentsMargins(10, 10, 10, 10)
+        self.setLayout(main_layout)
+
+        table_view = QTableView()
+        table_view.setModel(RowsTableModel(rows, column_names, table_view))
+        table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table_view.verticalHeader().setVisible(False)
+        table_view.setStyleSheet("""
+            QTableView {
+                background-color: #2d2d2d;
+                color: white;
+                gridline-color: #3d3d3d;
+                border: none;
+            }
+            QTableView QHeaderView::section {
+                background-color: #252525;
+                color: white;
+                padding: 8px;
+                border: None;
+                font-weight: bold;
+            }
+        """)
+        main_layout.addWidget(table_view)
 
 class FarmerMainWindow(QMainWindow):
+    import_progress = pyqtSignal(int, int, float)
+    export_progress = pyqtSignal(int, float)
+
     def __init__(self, db_connection):
         super().__init__()
         self.db_connection = db_connection
         self.current_database = "farmer_schema"
         self.current_table = None
+        self.query_executor = QueryExecutor(db_connection, parent=self)
+        self.query_stats_panel = None
+        self.render_cache = RenderCache()
+        self.table_job = None
+        self.analytics_job = None
+        # Last ranges picked, offered again next time
+        self.sales_range = None
+        self.timeseries_range = None
+        self.async_db = None
+        self.async_bridge = None
+        # Working from the local replica; see OfflineDatabaseConnection in app.py
+        self.offline = getattr(db_connection, "offline", False)
         self.setup_ui()
+        if not self.offline:
+            # Migrations need DDL privileges and are applied with migrate.py;
+            # here we only look, off the GUI thread, and say if any are missing
+            self.query_executor.submit(
+                pending_migrations, self.db_connection, self.current_database,
+                on_result=self.warn_pending_migrations,
+                on_error=lambda message: print(f"Error checking migrations: {message}"))
+        self.restock_monitor = RestockMonitor(self.db_connection, self.current_database, self.query_executor, self)
+        self.restock_monitor.alerts_changed.connect(self.update_restock_badge)
+        if self.offline:
+            self.sync_timer = QTimer(self)
+            self.sync_timer.timeout.connect(self.update_sync_status)
+            self.sync_timer.start(SYNC_STATUS_INTERVAL_MS)
+            self.update_sync_status()
 
     def setup_ui(self):
         self.setWindowTitle("Farmer Database Manager")
@@ -158,6 +312,14 @@ class FarmerMainWindow(QMainWindow):
                 self.seasonal_btn.setMenu(self.create_seasonal_menu())
 
         toolbar_layout.addStretch()
+        self.restock_badge = QPushButton()
+        self.restock_badge.setFixedSize(140, 120)
+        self.restock_badge.setToolTip("Stock at or below its restock threshold")
+        self.restock_badge.clicked.connect(self.view_restock_alerts)
+        self.update_restock_badge(0)
+        toolbar_layout.addWidget(self.restock_badge)
+        if self.offline:
+            toolbar_layout.addWidget(self.create_sync_panel())
         main_layout.addWidget(toolbar)
 
         # Content area
@@ -209,6 +371,8 @@ class FarmerMainWindow(QMainWindow):
         menu.addAction("View Products", self.view_products)
         menu.addAction("Update Product", self.update_product_dialog)
         menu.addAction("Remove Product", self.delete_product_dialog)
+        menu.addAction("Import from File...", lambda: self.import_table_file("Product"))
+        menu.addAction("Export to File...", lambda: self.export_table_file("Product"))
         return menu
 
     def create_inventory_menu(self):
@@ -218,13 +382,19 @@ class FarmerMainWindow(QMainWindow):
         menu.addAction("Check Stock Levels", self.view_inventory)
         menu.addAction("Update Stock", self.update_inventory_dialog)
         menu.addAction("Remove Stock Entry", self.delete_inventory_dialog)
+        menu.addAction("Restock Alerts", self.view_restock_alerts)
+        menu.addAction("Import from File...", lambda: self.import_table_file("Inventory"))
+        menu.addAction("Export to File...", lambda: self.export_table_file("Inventory"))
         return menu
 
     def create_sales_menu(self):
         menu = QMenu(self)
         menu.setStyleSheet(self._get_menu_style())
         menu.addAction("New Sale", self.create_sale)
+        menu.addAction("Rapid Entry (POS)", self.open_rapid_entry)
         menu.addAction("View Sales", self.view_sales)
+        menu.addAction("Import from File...", lambda: self.import_table_file("Sale"))
+        menu.addAction("Export to File...", lambda: self.export_table_file("Sale"))
         return menu
 
     def create_customer_menu(self):
@@ -232,13 +402,20 @@ class FarmerMainWindow(QMainWindow):
         menu.setStyleSheet(self._get_menu_style())
         menu.addAction("Add Customer", self.add_customer)
         menu.addAction("View Customers", self.view_customers)
+        menu.addAction("Export to File...", lambda: self.export_table_file("Customer"))
         return menu
 
     def create_analytics_menu(self):
         menu = QMenu(self)
         menu.setStyleSheet(self._get_menu_style())
         menu.addAction("Sales Analytics", self.view_sales_analytics)
+        menu.addAction("Sales Over Time", self.view_sales_over_time)
         menu.addAction("Inventory Analytics", self.view_inventory_analytics)
+        menu.addAction("Dashboard", self.view_analytics_dashboard)
+        menu.addSeparator()
+        menu.addAction("Rebuild Sales Rollup", self.rebuild_sales_rollup)
+        menu.addAction("Index Advisor", self.view_index_advisor)
+        menu.addAction("Query Stats", self.view_query_stats)
         return menu
 
     def create_seasonal_menu(self):
@@ -296,6 +473,10 @@ class FarmerMainWindow(QMainWindow):
         self.display_table(table)
 
     def display_table(self, table):
+        # Navigating to another table abandons whatever is still loading
+        self.query_executor.cancel(self.table_job)
+        self.table_job = None
+
         while self.right_layout.count():
             item = self.right_layout.takeAt(0)
             if item.widget():
@@ -312,31 +493,37 @@ class FarmerMainWindow(QMainWindow):
             padding: 10px;
         """)
         self.right_layout.addWidget(title_label)
+
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.setStyleSheet("color: #d4d4d4; font-size: 14px; padding: 10px;")
+        self.right_layout.addWidget(self.loading_label)
+
+        # The first chunk is read on a worker thread; the view is built when it arrives
+        self.table_job = self.query_executor.submit(
+            LazyTableModel.fetch_first_chunk, self.db_connection, self.current_database, table,
+            on_result=lambda first_chunk, t=table: self.show_table_view(t, first_chunk),
+            on_error=self.show_error
+        )
+
+    def show_table_view(self, table, first_chunk):
+        self.table_job = None
+        if table != self.current_table:
+            return
+
+        self.right_layout.removeWidget(self.loading_label)
+        self.loading_label.deleteLater()
+
+        model = LazyTableModel(self.db_connection, self.current_database, table, first_chunk=first_chunk)
         
-        rows, columns = self.db_connection.get_table_contents(self.current_database, table)
-        
-        table_widget = QTableWidget()
-        table_widget.setRowCount(len(rows))
-        table_widget.setColumnCount(len(columns))
-        table_widget.setHorizontalHeaderLabels([col[0] for col in columns])
-        
-        for i, row in enumerate(rows):
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(str(value))
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                item.setTextAlignment(Qt.AlignCenter)
-                table_widget.setItem(i, j, item)
-        
-        table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table_widget.verticalHeader().setVisible(False)
-        table_widget.setStyleSheet("""
-            QTableWidget {
+        table_widget = TableBrowser(model, self.query_executor)
+        table_widget.table_view.setStyleSheet("""
+            QTableView {
                 background-color: #2d2d2d;
                 color: white;
                 gridline-color: #3d3d3d;
                 border: none;
             }
-            QTableWidget QHeaderView::section {
+            QTableView QHeaderView::section {
                 background-color: #252525;
                 color: white;
                 padding: 8px;
@@ -347,6 +534,109 @@ class FarmerMainWindow(QMainWindow):
         
         self.right_layout.addWidget(table_widget)
 
+    def create_sync_panel(self):
+        panel = QWidget()
+        panel_layout = QVBoxLayout(panel)
+        panel_layout.setContentsMargins(0, 0, 0, 0)
+        panel_layout.setSpacing(6)
+
+        self.sync_label = QLabel("")
+        self.sync_label.setStyleSheet("color: #d4d4d4; font-size: 12px; border: none;")
+        self.sync_label.setWordWrap(True)
+        self.sync_label.setFixedWidth(220)
+
+        button_style = """
+            QPushButton {
+                border: 2px solid #3EB489;
+                color: #d4d4d4;
+                font-size: 12px;
+                padding: 4px;
+                border-radius: 5px;
+                background-color: #2d2d2d;
+            }
+            QPushButton:hover {
+                background-color: #3EB489;
+                color: #1e1e1e;
+            }
+        """
+        sync_btn = QPushButton("Sync Now")
+        sync_btn.setStyleSheet(button_style)
+        sync_btn.clicked.connect(self.db_connection.syncer.sync_now)
+        conflicts_btn = QPushButton("View Conflicts")
+        conflicts_btn.setStyleSheet(button_style)
+        conflicts_btn.clicked.connect(self.view_sync_conflicts)
+
+        panel_layout.addWidget(self.sync_label)
+        panel_layout.addWidget(sync_btn)
+        panel_layout.addWidget(conflicts_btn)
+        return panel
+
+    def update_sync_status(self):
+        status = self.db_connection.sync_status()
+        state = "Online" if status["online"] else "Offline"
+        text = f"{state} (local copy)\n{status['pending']} change(s) waiting to sync"
+        if status["conflicts"]:
+            text += f"\n{status['conflicts']} conflict(s) need review"
+        if status["last_sync"]:
+            text += f"\nLast sync {status['last_sync']:%H:%M:%S}"
+        self.sync_label.setText(text)
+
+    def warn_pending_migrations(self, pending):
+        if pending:
+            QMessageBox.warning(
+                self, "Schema Out of Date",
+                f"{len(pending)} schema migration(s) have not been applied: {', '.join(pending)}.\n"
+                "Some analytics may fail until an administrator runs migrate.py.")
+
+    def update_restock_badge(self, count):
+        border = "#e06c75" if count else "#666666"
+        self.restock_badge.setText(f"⚠️ {count}\nLow Stock")
+        self.restock_badge.setStyleSheet(f"""
+            QPushButton {{
+                font-size: 16px;
+                background-color: #2d2d2d;
+                border: 2px solid {border};
+                border-radius: 8px;
+                color: {"white" if count else "#888888"};
+                padding: 10px;
+            }}
+            QPushButton:hover {{
+                background-color: {border};
+                color: #1e1e1e;
+            }}
+        """)
+
+    def view_restock_alerts(self):
+        rows = self.restock_monitor.rows()
+        if not rows:
+            self.show_success("Nothing is below its restock threshold.")
+            return
+        ReportWindow("Restock Alerts", rows, ALERT_COLUMNS).exec_()
+
+    def view_sync_conflicts(self):
+        rows = self.db_connection.replica.conflicts()
+        if not rows:
+            self.show_success("No sync conflicts.")
+            return
+        report = ReportWindow("Sync Conflicts", rows,
+                              ["Entry", "Change", "Table", "Key", "Local Values", "Problem", "Made At"])
+        report.exec_()
+        if self.confirm_action("Discard these local changes and keep the server's version?"):
+            for row in rows:
+                self.db_connection.replica.resolve_conflict(row[0])
+            self.db_connection.syncer.sync_now()
+            self.update_sync_status()
+
+    def closeEvent(self, event):
+        self.restock_monitor.stop()
+        self.query_executor.cancel_all()
+        if self.async_db is not None:
+            self.async_bridge.cancel_all()
+            self.async_db.shutdown()
+        if self.offline:
+            self.db_connection.close()
+        super().closeEvent(event)
+
 
     # Implement all the necessary methods to handle menu actions
     def create_product_dialog(self):
@@ -397,7 +687,7 @@ class FarmerMainWindow(QMainWindow):
     def update_product_dialog(self):
         product_id, ok = QInputDialog.getInt(self, "Update Product", "Enter Product ID:")
         if ok:
-            product = self.db_connection.get_product_by_id(product_id)
+            product = self.db_connection.get_product_by_id(product_id, self.current_database)
             if product:
                 dialog = QDialog(self)
                 dialog.setWindowTitle("Update Product")
@@ -427,11 +717,8 @@ class FarmerMainWindow(QMainWindow):
 
     def update_product(self, product_id, name, category, price, seasonal_availability, dialog):
         try:
-            values = (name, category, float(price), seasonal_availability, product_id)
-            sql = f"UPDATE Product SET Name = %s, Category = %s, Price = %s, SeasonalAvailability = %s WHERE ProductID = %s"
-            cursor = self.db_connection.connection.cursor()
-            cursor.execute(sql, values)
-            self.db_connection.connection.commit()
+            self.db_connection.update_product(self.current_database, product_id, name, category, float(price),
+                                              seasonal_availability)
             self.show_success("Product updated successfully!")
             dialog.accept()
         except Exception as e:
@@ -516,7 +803,7 @@ class FarmerMainWindow(QMainWindow):
                 layout.addRow("Restock Threshold:", restock_threshold_input)
                 
                 button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-                button_box.accepted.connect(lambda: self.update_inventory(inventory_id, product_id_input.text(), vendor_id_input.text(), quantity_input.text(), restock_threshold_input.text(), dialog))
+                button_box.accepted.connect(lambda: self.update_inventory(inventory_id, product_id_input.text(), vendor_id_input.text(), quantity_input.text(), restock_threshold_input.text(), dialog, inventory['QuantityInStock']))
                 button_box.rejected.connect(dialog.reject)
                 
                 layout.addRow(button_box)
@@ -525,13 +812,13 @@ class FarmerMainWindow(QMainWindow):
             else:
                 self.show_error("Inventory not found!")
 
-    def update_inventory(self, inventory_id, product_id, vendor_id, quantity, restock_threshold, dialog):
+    def update_inventory(self, inventory_id, product_id, vendor_id, quantity, restock_threshold, dialog, quantity_read):
         try:
-            values = (int(product_id), int(vendor_id), int(quantity), int(restock_threshold), inventory_id)
-            sql = f"UPDATE Inventory SET ProductID = %s, VendorID = %s, QuantityInStock = %s, RestockThreshold = %s WHERE InventoryID = %s"
-            cursor = self.db_connection.connection.cursor()
-            cursor.execute(sql, values)
-            self.db_connection.connection.commit()
+            # Apply the change the user made to the quantity they were shown, so
+            # sales recorded while the dialog was open still count
+            quantity_delta = int(quantity) - (quantity_read or 0)
+            self.db_connection.update_inventory(self.current_database, inventory_id, int(product_id), int(vendor_id),
+                                                quantity_delta, int(restock_threshold))
             self.show_success("Inventory updated successfully!")
             dialog.accept()
         except Exception as e:
@@ -572,6 +859,7 @@ class FarmerMainWindow(QMainWindow):
         layout.addRow("Sale Date (YYYY-MM-DD):", sale_date_input)
         layout.addRow("Quantity Sold:", quantity_sold_input)
         layout.addRow("Total Price:", total_price_input)
+        total_price_input.setPlaceholderText("Leave blank to use the product price")
         
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         button_box.accepted.connect(lambda: self.add_sale(sale_id_input.text(), vendor_id_input.text(), product_id_input.text(), customer_id_input.text(), sale_date_input.text(), quantity_sold_input.text(), total_price_input.text(), dialog))
@@ -592,9 +880,24 @@ class FarmerMainWindow(QMainWindow):
                 self.show_error(f"Invalid date format: {e}. Please use YYYY-MM-DD.")
                 return
 
+            # Reference rows come from the in-process cache, so repeat sales of
+            # the same products don't query Product/Vendor/Customer at all
+            product = self.db_connection.get_product_by_id(int(product_id), self.current_database)
+            if product is None:
+                self.show_error(f"Product {product_id} does not exist.")
+                return
+            if self.db_connection.get_vendor_by_id(int(vendor_id), self.current_database) is None:
+                self.show_error(f"Vendor {vendor_id} does not exist.")
+                return
+            if self.db_connection.get_customer_by_id(int(customer_id), self.current_database) is None:
+                self.show_error(f"Customer {customer_id} does not exist.")
+                return
+            if not total_price.strip() and product.get("Price") is not None:
+                total_price = float(product["Price"]) * int(quantity_sold)
+
             values = (int(sale_id), int(vendor_id), int(product_id), int(customer_id), sale_date, int(quantity_sold), float(total_price))
             columns = ["SaleID", "VendorID", "ProductID", "CustomerID", "SaleDate", "QuantitySold", "TotalPrice"]
-            success = self.db_connection.add_row(self.current_database, "Sale", values, columns)
+            success = self.db_connection.record_sale(self.current_database, values, columns)
             if success:
                 self.show_success("Sale recorded successfully!")
                 dialog.accept()
@@ -603,6 +906,89 @@ class FarmerMainWindow(QMainWindow):
         except Exception as e:
             self.show_error(str(e))
 
+    def open_rapid_entry(self):
+        dialog = RapidSaleEntry(self.db_connection, self.current_database, self.query_executor, self)
+        dialog.exec_()
+        if self.current_table == "Sale":
+            self.display_table("Sale")
+
+    def import_table_file(self, table):
+        path, _ = QFileDialog.getOpenFileName(
+            self, f"Import into {table}", "", "Delimited files (*.csv *.tsv *.txt);;All files (*)")
+        if not path:
+            return
+
+        progress = QProgressDialog(f"Importing into {table}...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Bulk Import")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+
+        # Progress is reported from the worker thread; the signal hops it back to the GUI
+        importer = BulkImporter(self.db_connection, self.current_database, table,
+                                progress_callback=self.import_progress.emit)
+        update_label = lambda loaded, rejected, rate: progress.setLabelText(
+            f"Importing into {table}...\n{loaded} rows loaded, {rejected} rejected ({rate:,.0f} rows/sec)")
+        self.import_progress.connect(update_label)
+        progress.canceled.connect(importer.cancel)
+
+        def finish(result=None, message=None):
+            self.import_progress.disconnect(update_label)
+            progress.reset()
+            if message is not None:
+                self.show_error(message)
+                return
+            summary = (f"{result['rows_loaded']} rows loaded in {result['seconds']:.1f}s "
+                       f"({result['rows_per_sec']:,.0f} rows/sec).")
+            if result["rows_rejected"]:
+                summary += f"\n{result['rows_rejected']} rows rejected, see {result['reject_path']}"
+            if result["cancelled"]:
+                summary += "\nImport was cancelled before the end of the file."
+            if result["error"]:
+                summary += f"\nImport stopped early, the rest of the file was not loaded: {result['error']}"
+            self.show_success(summary)
+            if self.current_table == table:
+                self.display_table(table)
+
+        self.query_executor.submit(
+            importer.import_file, path,
+            on_result=lambda result: finish(result=result),
+            on_error=lambda message: finish(message=message)
+        )
+        progress.show()
+
+    def export_table_file(self, table):
+        path, _ = QFileDialog.getSaveFileName(
+            self, f"Export {table}", f"{table}.csv", "CSV (*.csv);;Parquet (*.parquet)")
+        if not path:
+            return
+
+        progress = QProgressDialog(f"Exporting {table}...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Export")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+
+        exporter = TableExporter(self.db_connection, self.current_database, table,
+                                 progress_callback=self.export_progress.emit)
+        update_label = lambda rows, rate: progress.setLabelText(
+            f"Exporting {table}...\n{rows:,} rows ({rate:,.0f} rows/sec)")
+        self.export_progress.connect(update_label)
+        progress.canceled.connect(exporter.cancel)
+
+        def finish(result=None, message=None):
+            self.export_progress.disconnect(update_label)
+            progress.reset()
+            if message is not None:
+                self.show_error(message)
+                return
+            self.show_success(describe_result(result))
+
+        self.query_executor.submit(
+            exporter.export, path,
+            on_result=lambda result: finish(result=result),
+            on_error=lambda message: finish(message=message)
+        )
+        progress.show()
+
     def view_sales(self):
         self.current_table = "Sale"
         self.display_table("Sale")
@@ -650,133 +1036,233 @@ class FarmerMainWindow(QMainWindow):
         self.current_table = "Customer"
         self.display_table("Customer")
 
+    def view_analytics_dashboard(self):
+        if self.async_db is None:
+            self.async_db = AsyncDatabaseConnection(self.db_connection)
+            self.async_bridge = QtAsyncBridge(self)
+        panels = [
+            ("Sales Analytics", SALES_ANALYTICS_SQL, self.display_sales_analytics_graph),
+            ("Inventory Analytics", INVENTORY_ANALYTICS_SQL, self.display_inventory_analytics_graph),
+            ("Seasonal Patterns", SEASONAL_PATTERNS_SQL, self.display_seasonal_patterns_graph),
+            ("Demand Trends", FORECAST_DEMAND_SQL, self.display_demand_trends_graph),
+        ]
+        dashboard = AnalyticsDashboard(self.async_db, self.async_bridge, self.current_database, panels, self)
+        dashboard.exec_()
+
     def view_sales_analytics(self):
-        try:
-            sql = """
-            SELECT p.Name, SUM(s.QuantitySold) AS TotalUnitsSold, SUM(s.TotalPrice) AS TotalRevenue
-            FROM Sale s
-            JOIN Product p ON s.ProductID = p.ProductID
-            GROUP BY p.ProductID;
-            """
-            cursor = self.db_connection.connection.cursor()
-            cursor.execute(sql)
-            rows = cursor.fetchall()
-            columns = cursor.description
-            self.open_graph_window("Sales Analytics", rows, columns, self.display_sales_analytics_graph)
-        except Exception as e:
-            self.show_error(str(e))
+        dialog = DateRangeDialog("Sales Analytics", initial=self.sales_range, parent=self)
+        if not dialog.exec_():
+            return
+        self.sales_range = dialog.result_selection
+        if self.sales_range["start"] is None:
+            # All history comes straight from the per-product rollup
+            self.run_analytics("Sales Analytics", SALES_ANALYTICS_SQL, self.display_sales_analytics_graph)
+        else:
+            self.run_analytics(f"Sales Analytics ({describe_range(self.sales_range)})", SALES_ANALYTICS_RANGE_SQL,
+                               self.display_sales_analytics_graph,
+                               (self.sales_range["start"], self.sales_range["end"]))
+
+    def view_sales_over_time(self):
+        dialog = DateRangeDialog("Sales Over Time", series=True, initial=self.timeseries_range, parent=self)
+        if not dialog.exec_():
+            return
+        selection = self.timeseries_range = dialog.result_selection
+        title = f"Sales Over Time: {selection['bucket']}, {describe_range(selection)}"
+        if selection["product_id"] is not None:
+            title += f", product {selection['product_id']}"
+        if selection["vendor_id"] is not None:
+            title += f", vendor {selection['vendor_id']}"
+        self.query_executor.cancel(self.analytics_job)
+        self.analytics_job = self.query_executor.submit(
+            self.db_connection.get_sales_timeseries, self.current_database, selection["bucket"],
+            selection["start"], selection["end"], selection["product_id"], selection["vendor_id"],
+            on_result=lambda result: self.show_sales_over_time(title, selection, result),
+            on_error=self.show_error
+        )
+
+    def show_sales_over_time(self, title, selection, result):
+        self.analytics_job = None
+        rows, _ = result
+        if not rows:
+            self.show_success("No sales in that range.")
+            return
+        bucket = selection["bucket"]
+        rows = [(period_label(bucket, row[0]),) + tuple(row[1:]) for row in rows]
+        query = ("get_sales_timeseries", bucket, selection["start"], selection["end"],
+                 selection["product_id"], selection["vendor_id"])
+        self.open_graph_window(title, rows, [(name,) for name in TIMESERIES_COLUMNS],
+                               self.display_sales_over_time_graph, query)
+
+    def display_sales_over_time_graph(self, ax, rows):
+        # Years of daily buckets are reduced to the points that shape the lines
+        periods = [row[0] for row in rows]
+        positions = downsample_indices(rows, (1, 2))
+        units_sold = [rows[i][1] for i in positions]
+        revenue = [rows[i][2] for i in positions]
+        marker = line_marker(len(positions))
+
+        ax.set_xlabel('Period')
+        ax.set_ylabel('Units Sold', color='tab:blue')
+        ax.plot(positions, units_sold, color='tab:blue', marker=marker)
+        ax.tick_params(axis='y', labelcolor='tab:blue')
+
+        ax2 = ax.twinx()
+        ax2.set_ylabel('Revenue', color='tab:red')
+        ax2.plot(positions, revenue, color='tab:red', marker=marker)
+        ax2.tick_params(axis='y', labelcolor='tab:red')
+
+        set_category_ticks(ax, periods)
+
+    def rebuild_sales_rollup(self):
+        if not self.confirm_action("Recompute the sales rollup from the full Sale history?"):
+            return
+        self.query_executor.submit(
+            self.db_connection.rebuild_sales_rollup, self.current_database,
+            on_result=lambda success: self.show_success("Sales rollup rebuilt.") if success
+            else self.show_error("Failed to rebuild sales rollup."),
+            on_error=self.show_error
+        )
+
+    def view_index_advisor(self):
+        self.query_executor.submit(
+            run_index_advisor, self.db_connection, self.current_database,
+            on_result=lambda findings: ReportWindow("Index Advisor", findings, FINDING_COLUMNS).exec_(),
+            on_error=self.show_error
+        )
+
+    def view_query_stats(self):
+        if self.query_stats_panel is None:
+            self.query_stats_panel = QueryStatsPanel(self.db_connection, self)
+        self.query_stats_panel.show()
+        self.query_stats_panel.raise_()
 
     def display_sales_analytics_graph(self, ax, rows):
+        rows = top_rows(rows, 1)
         products = [row[0] for row in rows]
         total_units_sold = [row[1] for row in rows]
         total_revenue = [row[2] for row in rows]
+        positions = range(len(products))
 
         ax.set_xlabel('Products')
         ax.set_ylabel('Total Units Sold', color='tab:blue')
-        ax.bar(products, total_units_sold, color='tab:blue')
+        ax.bar(positions, total_units_sold, color='tab:blue')
         ax.tick_params(axis='y', labelcolor='tab:blue')
 
         ax2 = ax.twinx()
         ax2.set_ylabel('Total Revenue', color='tab:red')
-        ax2.plot(products, total_revenue, color='tab:red', marker='o')
+        ax2.plot(positions, total_revenue, color='tab:red', marker='o')
         ax2.tick_params(axis='y', labelcolor='tab:red')
 
-        ax.set_xticks(range(len(products)))
-        ax.set_xticklabels(products, rotation=45, ha='right')
+        set_category_ticks(ax, products)
 
     def view_inventory_analytics(self):
-        try:
-            sql = """
-            SELECT p.Name, i.QuantityInStock, i.RestockThreshold
-            FROM Inventory i
-            JOIN Product p ON i.ProductID = p.ProductID;
-            """
-            cursor = self.db_connection.connection.cursor()
-            cursor.execute(sql)
-            rows = cursor.fetchall()
-            columns = cursor.description
-            self.open_graph_window("Inventory Analytics", rows, columns, self.display_inventory_analytics_graph)
-        except Exception as e:
-            self.show_error(str(e))
+        self.run_analytics("Inventory Analytics", INVENTORY_ANALYTICS_SQL, self.display_inventory_analytics_graph)
 
     def display_inventory_analytics_graph(self, ax, rows):
+        # The rows furthest below their threshold are the ones worth a bar
+        rows = top_rows(rows, 1, key=lambda row: float(row[2] or 0) - float(row[1] or 0))
         products = [row[0] for row in rows]
         quantity_in_stock = [row[1] for row in rows]
         restock_threshold = [row[2] for row in rows]
+        positions = range(len(products))
 
         ax.set_xlabel('Products')
         ax.set_ylabel('Quantity')
-        ax.bar(products, quantity_in_stock, color='tab:blue', label='Quantity In Stock')
-        ax.plot(products, restock_threshold, color='tab:red', marker='o', label='Restock Threshold')
+        ax.bar(positions, quantity_in_stock, color='tab:blue', label='Quantity In Stock')
+        ax.plot(positions, restock_threshold, color='tab:red', marker='o', label='Restock Threshold')
         ax.legend()
 
-        ax.set_xticks(range(len(products)))
-        ax.set_xticklabels(products, rotation=45, ha='right')
+        set_category_ticks(ax, products)
 
     def view_seasonal_patterns(self):
-        try:
-            sql = """
-            SELECT p.Name, sa.DemandTrend, sa.SeasonalPeakPeriod
-            FROM SeasonalAnalysis sa
-            JOIN Product p ON sa.ProductID = p.ProductID;
-            """
-            cursor = self.db_connection.connection.cursor()
-            cursor.execute(sql)
-            rows = cursor.fetchall()
-            columns = cursor.description
-            self.open_graph_window("Seasonal Patterns", rows, columns, self.display_seasonal_patterns_graph)
-        except Exception as e:
-            self.show_error(str(e))
+        self.run_analytics("Seasonal Patterns", SEASONAL_PATTERNS_SQL, self.display_seasonal_patterns_graph)
 
     def display_seasonal_patterns_graph(self, ax, rows):
+        # DemandTrend is a label, not a number, so there is nothing to rank
+        # or fold by; every product is drawn and only the labels are thinned
         products = [row[0] for row in rows]
         demand_trends = [row[1] for row in rows]
         seasonal_peak_periods = [row[2] for row in rows]
 
         ax.set_xlabel('Products')
         ax.set_ylabel('Demand Trend')
-        ax.bar(products, demand_trends, color='tab:blue')
+        ax.bar(range(len(products)), demand_trends, color='tab:blue')
 
-        for i, txt in enumerate(seasonal_peak_periods):
-            ax.annotate(txt, (products[i], demand_trends[i]), textcoords="offset points", xytext=(0,10), ha='center')
+        # With more bars than that, one annotation each piles up into a smear
+        if len(rows) <= MAX_BARS:
+            for i, txt in enumerate(seasonal_peak_periods):
+                ax.annotate(txt, (i, demand_trends[i]), textcoords="offset points", xytext=(0,10), ha='center')
 
-        ax.set_xticks(range(len(products)))
-        ax.set_xticklabels(products, rotation=45, ha='right')
+        set_category_ticks(ax, products)
 
     def forecast_demand(self):
-        try:
-            sql = """
-            SELECT p.Name, SUM(s.QuantitySold) AS TotalUnitsSold, sa.DemandTrend
-            FROM Sale s
-            JOIN Product p ON s.ProductID = p.ProductID
-            JOIN SeasonalAnalysis sa ON p.ProductID = sa.ProductID
-            GROUP BY p.ProductID, sa.DemandTrend;
-            """
-            cursor = self.db_connection.connection.cursor()
-            cursor.execute(sql)
-            rows = cursor.fetchall()
-            columns = cursor.description
-            self.open_graph_window("Demand Forecast", rows, columns, self.display_forecast_demand_graph)
-        except Exception as e:
-            self.show_error(str(e))
+        # numpy is only imported once a forecast is actually asked for
+        from forecasting import forecast_report
+        self.query_executor.cancel(self.analytics_job)
+        self.analytics_job = self.query_executor.submit(
+            forecast_report, self.db_connection, self.current_database,
+            on_result=self.show_forecast,
+            on_error=self.show_error
+        )
+
+    def show_forecast(self, report):
+        from forecasting import FORECAST_COLUMNS
+        self.analytics_job = None
+        rows, result = report
+        title = (f"Demand Forecast: {len(rows):,} products, fitted in {result['fit_seconds']:.1f}s "
+                 f"({result['refitted']:,} refitted)")
+        self.open_graph_window(title, rows, [(name,) for name in FORECAST_COLUMNS],
+                               self.display_forecast_demand_graph, "forecast_report")
 
     def display_forecast_demand_graph(self, ax, rows):
+        # Rows arrive largest forecast first; chart the top products only
+        rows = rows[:FORECAST_CHART_PRODUCTS]
+        products = [str(row[0]) for row in rows]
+        positions = range(len(products))
+        width = 0.4
+
+        ax.set_xlabel('Products')
+        ax.set_ylabel('Units')
+        ax.bar([i - width / 2 for i in positions], [row[1] for row in rows], width, color='tab:blue',
+               label='Recent')
+        ax.bar([i + width / 2 for i in positions], [row[2] for row in rows], width, color='tab:orange',
+               label='Forecast')
+        ax.legend()
+
+        set_category_ticks(ax, products)
+
+    def display_demand_trends_graph(self, ax, rows):
+        # The folded row's DemandTrend is left blank; a text label has no average
+        rows = top_rows(rows, 1)
         products = [row[0] for row in rows]
         total_units_sold = [row[1] for row in rows]
         demand_trends = [row[2] for row in rows]
 
         ax.set_xlabel('Products')
         ax.set_ylabel('Total Units Sold')
-        ax.bar(products, total_units_sold, color='tab:blue')
+        ax.bar(range(len(products)), total_units_sold, color='tab:blue')
 
         for i, txt in enumerate(demand_trends):
-            ax.annotate(txt, (products[i], total_units_sold[i]), textcoords="offset points", xytext=(0,10), ha='center')
-
-        ax.set_xticks(range(len(products)))
-        ax.set_xticklabels(products, rotation=45, ha='right')
-
-    def open_graph_window(self, title, rows, columns, graph_func):
-        graph_window = GraphWindow(title, rows, columns, graph_func)
+            ax.annotate(txt, (i, total_units_sold[i]), textcoords="offset points", xytext=(0,10), ha='center')
+
+        set_category_ticks(ax, products)
+
+    def run_analytics(self, title, sql, graph_func, params=None):
+        # Only the most recent analytics request is worth finishing
+        self.query_executor.cancel(self.analytics_job)
+        self.analytics_job = self.query_executor.submit(
+            self.db_connection.run_query, self.current_database, sql, params,
+            on_result=lambda result: self.show_analytics_result(title, result, graph_func, (sql, params)),
+            on_error=self.show_error
+        )
+
+    def show_analytics_result(self, title, result, graph_func, query=None):
+        self.analytics_job = None
+        rows, columns = result
+        self.open_graph_window(title, rows, columns, graph_func, query)
+
+    def open_graph_window(self, title, rows, columns, graph_func, query=None):
+        graph_window = GraphWindow(title, rows, columns, graph_func, query, self.render_cache)
         graph_window.exec_()
 
     def show_error(self, message):
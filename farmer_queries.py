@@ -0,0 +1,91 @@
+# SQL issued by FarmerMainWindow. Kept in one place so tools such as the
+# index advisor can EXPLAIN exactly what the window runs.
+from sales_timeseries import MONTHLY, timeseries_query
+
+# Reads the per-product rollup maintained by record_sale, so the cost
+# follows the number of products rather than the number of sales
+SALES_ANALYTICS_SQL = """
+SELECT p.Name, r.TotalUnitsSold, r.TotalRevenue
+FROM SaleRollupProduct r
+JOIN Product p ON r.ProductID = p.ProductID
+"""
+
+# Sales Analytics restricted to a date range. The rollup has no date-leading
+# key, so this reads the matching range of idx_sale_date on Sale instead
+SALES_ANALYTICS_RANGE_SQL = """
+SELECT p.Name, SUM(s.QuantitySold) AS TotalUnitsSold, SUM(s.TotalPrice) AS TotalRevenue
+FROM Sale s
+JOIN Product p ON s.ProductID = p.ProductID
+WHERE s.SaleDate BETWEEN %s AND %s
+GROUP BY s.ProductID, p.Name
+"""
+
+INVENTORY_ANALYTICS_SQL = """
+SELECT p.Name, i.QuantityInStock, i.RestockThreshold
+FROM Inventory i
+JOIN Product p ON i.ProductID = p.ProductID
+"""
+
+SEASONAL_PATTERNS_SQL = """
+SELECT p.Name, sa.DemandTrend, sa.SeasonalPeakPeriod
+FROM SeasonalAnalysis sa
+JOIN Product p ON sa.ProductID = p.ProductID
+"""
+
+FORECAST_DEMAND_SQL = """
+SELECT p.Name, SUM(s.QuantitySold) AS TotalUnitsSold, sa.DemandTrend
+FROM Sale s
+JOIN Product p ON s.ProductID = p.ProductID
+JOIN SeasonalAnalysis sa ON p.ProductID = sa.ProductID
+GROUP BY p.ProductID, sa.DemandTrend
+"""
+
+# Daily units per product for the forecasting engine, read from the rollup
+# rather than Sale so the row count is product-days, not individual sales
+FORECAST_DAILY_SALES_SQL = """
+SELECT ProductID, SaleDate, UnitsSold
+FROM SaleRollupDaily
+WHERE SaleDate BETWEEN %s AND %s
+"""
+
+# Served by the NeedsRestock generated column and its index (migration 003)
+RESTOCK_ALERTS_SQL = """
+SELECT i.InventoryID, i.ProductID, p.Name, i.VendorID, i.QuantityInStock, i.RestockThreshold
+FROM Inventory i
+LEFT JOIN Product p ON i.ProductID = p.ProductID
+WHERE i.NeedsRestock = 1
+"""
+
+# Same columns for just the rows a write touched; DatabaseConnection.get_inventory_levels
+# appends the WHERE clause
+INVENTORY_LEVELS_SQL = """
+SELECT i.InventoryID, i.ProductID, p.Name, i.VendorID, i.QuantityInStock, i.RestockThreshold
+FROM Inventory i
+LEFT JOIN Product p ON i.ProductID = p.ProductID
+"""
+
+PRODUCT_BY_ID_SQL = "SELECT * FROM Product WHERE ProductID = %s"
+
+INVENTORY_BY_ID_SQL = "SELECT * FROM Inventory WHERE InventoryID = %s"
+
+UPDATE_PRODUCT_SQL = "UPDATE Product SET Name = %s, Category = %s, Price = %s, SeasonalAvailability = %s WHERE ProductID = %s"
+
+# QuantityInStock takes a delta: stock is only ever adjusted relative to its current value
+UPDATE_INVENTORY_SQL = "UPDATE Inventory SET ProductID = %s, VendorID = %s, QuantityInStock = QuantityInStock + %s, RestockThreshold = %s WHERE InventoryID = %s"
+
+# name -> (sql, sample parameters used when the statement is EXPLAINed)
+FARMER_QUERIES = {
+    "Sales Analytics": (SALES_ANALYTICS_SQL, None),
+    "Sales Analytics (date range)": (SALES_ANALYTICS_RANGE_SQL, ("2000-01-01", "2000-01-31")),
+    "Sales Over Time": timeseries_query(MONTHLY, "2000-01-01", "2000-12-31"),
+    "Sales Over Time (vendor)": timeseries_query(MONTHLY, "2000-01-01", "2000-12-31", vendor_id=1),
+    "Inventory Analytics": (INVENTORY_ANALYTICS_SQL, None),
+    "Seasonal Patterns": (SEASONAL_PATTERNS_SQL, None),
+    "Demand Forecast": (FORECAST_DEMAND_SQL, None),
+    "Restock Alerts": (RESTOCK_ALERTS_SQL, None),
+    "Forecast Daily Sales": (FORECAST_DAILY_SALES_SQL, ("2000-01-01", "2000-12-31")),
+    "Product by ID": (PRODUCT_BY_ID_SQL, (1,)),
+    "Inventory by ID": (INVENTORY_BY_ID_SQL, (1,)),
+    "Update Product": (UPDATE_PRODUCT_SQL, ("", "", 0, "", 1)),
+    "Update Inventory": (UPDATE_INVENTORY_SQL, (1, 1, 0, 0, 1)),
+}
@@ -0,0 +1,323 @@
+# Demand forecasting with additive Holt-Winters (level, trend and a weekly
+# season) fitted to every product at once. The daily series of all products
+# form one (products x days) matrix, and each smoothing step is a handful of
+# array operations over that matrix and the whole parameter grid, so the
+# only Python loop is over days, never over products or parameter choices.
+import argparse
+import datetime
+import getpass
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+from farmer_queries import FORECAST_DAILY_SALES_SQL
+
+DEFAULT_PARAMS_PATH = os.environ.get(
+    "FARMER_FORECAST_PARAMS",
+    os.path.join(os.path.expanduser("~"), ".farmer_inventory", "forecast_params.json")
+)
+SEASON_LENGTH = 7  # market days repeat weekly
+HISTORY_DAYS = 3 * 365
+HORIZON_DAYS = 28
+REFIT_AFTER_DAYS = 7
+FETCH_CHUNK_SIZE = 50000
+
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5)
+BETAS = (0.0, 0.01, 0.05, 0.1)
+GAMMAS = (0.05, 0.1, 0.2, 0.3)
+PARAMETER_GRID = np.array(list(itertools.product(ALPHAS, BETAS, GAMMAS)))
+
+FORECAST_COLUMNS = ("Product", f"Last {HORIZON_DAYS} Days", f"Next {HORIZON_DAYS} Days", "Change %",
+                    "Alpha", "Beta", "Gamma")
+
+
+def _as_date(value):
+    # MySQL returns dates; the offline replica stores them as ISO text
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def load_daily_sales(db_connection, database, end=None, history_days=HISTORY_DAYS):
+    """Return (product_ids, start_date, units) with units a (products x days) array, zero on days without sales."""
+    end = end or datetime.date.today()
+    start = end - datetime.timedelta(days=history_days - 1)
+    product_ids = []
+    day_offsets = []
+    units = []
+    # Streamed in chunks so only the compact arrays, not millions of row tuples, stay in memory
+    for _, rows in db_connection.iter_query_chunks(database, FORECAST_DAILY_SALES_SQL, (start, end),
+                                                   FETCH_CHUNK_SIZE):
+        product_ids.append(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)))
+        day_offsets.append(np.fromiter(((_as_date(row[1]) - start).days for row in rows), dtype=np.int64,
+                                       count=len(rows)))
+        units.append(np.fromiter((float(row[2] or 0) for row in rows), dtype=np.float64, count=len(rows)))
+    if not product_ids:
+        return np.empty(0, dtype=np.int64), start, np.zeros((0, history_days))
+
+    product_ids = np.concatenate(product_ids)
+    day_offsets = np.concatenate(day_offsets)
+    units = np.concatenate(units)
+    unique_ids, rows = np.unique(product_ids, return_inverse=True)
+    matrix = np.zeros((len(unique_ids), history_days))
+    np.add.at(matrix, (rows, day_offsets), units)
+    return unique_ids, start, matrix
+
+
+def holt_winters(series, alpha, beta, gamma, season_length=SEASON_LENGTH):
+    """Run additive Holt-Winters over every series for every parameter set.
+
+    series is (products, days); alpha, beta and gamma broadcast to
+    (parameter sets, products), e.g. (G, 1) for a shared grid or (1, N) for
+    one set per product. Returns (sse, level, trend, season) where sse is the
+    sum of squared one-step-ahead errors and the rest is the final state,
+    season being (..., products, season_length).
+    """
+    products, days = series.shape
+    first = series[:, :season_length]
+    level = first.mean(axis=1)
+    trend = (series[:, season_length:2 * season_length].mean(axis=1) - level) / season_length
+    season = first - level[:, None]
+
+    shape = np.broadcast_shapes(np.shape(alpha), np.shape(beta), np.shape(gamma), (1, products))
+    level = np.broadcast_to(level, shape).copy()
+    trend = np.broadcast_to(trend, shape).copy()
+    # Season slot first, so each step updates one contiguous block
+    season = np.ascontiguousarray(np.broadcast_to(season.T[:, None, :], (season_length,) + shape))
+    sse = np.zeros(shape)
+    # Error-correction form of the same recursions: every update is a multiple of
+    # the one-step error, so a step is a few in-place array operations
+    alpha = np.broadcast_to(alpha, shape)
+    trend_gain = np.broadcast_to(alpha * beta, shape)
+    season_gain = np.broadcast_to(gamma * (1 - alpha), shape)
+    observations = np.ascontiguousarray(series.T)
+    error = np.empty(shape)
+    step = np.empty(shape)
+
+    for t in range(season_length, days):
+        seasonal = season[t % season_length]
+        level += trend
+        np.subtract(observations[t], level, out=error)
+        error -= seasonal
+        np.multiply(error, error, out=step)
+        sse += step
+        np.multiply(alpha, error, out=step)
+        level += step
+        np.multiply(trend_gain, error, out=step)
+        trend += step
+        np.multiply(season_gain, error, out=step)
+        seasonal += step
+    return sse, level, trend, np.moveaxis(season, 0, -1)
+
+
+def project(level, trend, season, days, horizon=HORIZON_DAYS):
+    """(products, horizon) forecast from the final Holt-Winters state; demand is never negative."""
+    steps = np.arange(1, horizon + 1)
+    slots = (days - 1 + steps) % season.shape[-1]
+    return np.maximum(level[:, None] + trend[:, None] * steps + season[:, slots], 0.0)
+
+
+class ForecastParameterCache:
+    """Fitted (alpha, beta, gamma) per product, kept on disk between runs."""
+
+    def __init__(self, path=DEFAULT_PARAMS_PATH):
+        self.path = path
+        self._params = {}
+        try:
+            with open(path, encoding="utf-8") as params_file:
+                self._params = json.load(params_file)
+        except (OSError, ValueError):
+            self._params = {}
+
+    def lookup(self, database, product_ids, as_of):
+        """Return (params, fresh) for product_ids: a (3, N) array and a boolean mask of usable entries."""
+        stored = self._params.get(database, {})
+        params = np.zeros((3, len(product_ids)))
+        fresh = np.zeros(len(product_ids), dtype=bool)
+        for i, product_id in enumerate(product_ids.tolist()):
+            entry = stored.get(str(product_id))
+            if entry is None:
+                continue
+            fitted_on = datetime.date.fromisoformat(entry["fitted_on"])
+            if (as_of - fitted_on).days < REFIT_AFTER_DAYS:
+                params[:, i] = entry["alpha"], entry["beta"], entry["gamma"]
+                fresh[i] = True
+        return params, fresh
+
+    def store(self, database, product_ids, params, as_of):
+        stored = self._params.setdefault(database, {})
+        fitted_on = as_of.isoformat()
+        for product_id, (alpha, beta, gamma) in zip(product_ids.tolist(), params.T.tolist()):
+            stored[str(product_id)] = {"alpha": alpha, "beta": beta, "gamma": gamma, "fitted_on": fitted_on}
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as params_file:
+                json.dump(self._params, params_file)
+        except OSError as e:
+            print(f"Error saving forecast parameters: {e}")
+
+    def clear(self, database=None):
+        if database is None:
+            self._params = {}
+        else:
+            self._params.pop(database, None)
+
+
+def fit_and_forecast(series, params=None, fresh=None, horizon=HORIZON_DAYS):
+    """Forecast every series, grid-searching parameters for those without fresh cached ones.
+
+    Returns (forecast, params, refitted) with params a (3, N) array of the
+    parameters used and refitted the number of products that were searched.
+    """
+    products, days = series.shape
+    if params is None:
+        params = np.zeros((3, products))
+    if fresh is None:
+        fresh = np.zeros(products, dtype=bool)
+    params = params.copy()
+    level = np.zeros(products)
+    trend = np.zeros(products)
+    season = np.zeros((products, SEASON_LENGTH))
+
+    stale = ~fresh
+    if stale.any():
+        # Every grid point for every stale product in one pass, then keep each product's best
+        grid = PARAMETER_GRID[:, :, None]
+        sse, grid_level, grid_trend, grid_season = holt_winters(series[stale], grid[:, 0], grid[:, 1], grid[:, 2])
+        best = sse.argmin(axis=0)
+        columns = np.arange(len(best))
+        params[:, stale] = PARAMETER_GRID[best].T
+        level[stale] = grid_level[best, columns]
+        trend[stale] = grid_trend[best, columns]
+        season[stale] = grid_season[best, columns]
+    if fresh.any():
+        _, cached_level, cached_trend, cached_season = holt_winters(
+            series[fresh], params[0, fresh][None, :], params[1, fresh][None, :], params[2, fresh][None, :])
+        level[fresh] = cached_level[0]
+        trend[fresh] = cached_trend[0]
+        season[fresh] = cached_season[0]
+
+    return project(level, trend, season, days, horizon), params, int(stale.sum())
+
+
+class DemandForecaster:
+    def __init__(self, db_connection, database, cache=None, history_days=HISTORY_DAYS, horizon=HORIZON_DAYS):
+        self.db_connection = db_connection
+        self.database = database
+        self.cache = cache if cache is not None else ForecastParameterCache()
+        self.history_days = history_days
+        self.horizon = horizon
+
+    def run(self, end=None):
+        """Forecast every product with sales history; returns a dict of arrays plus timings."""
+        end = end or datetime.date.today()
+        started = time.perf_counter()
+        product_ids, start, series = load_daily_sales(self.db_connection, self.database, end, self.history_days)
+        loaded = time.perf_counter()
+        if len(product_ids) == 0:
+            raise ValueError("No sales in SaleRollupDaily to forecast from.")
+        if series.shape[1] < 2 * SEASON_LENGTH:
+            raise ValueError(f"Forecasting needs at least {2 * SEASON_LENGTH} days of history.")
+
+        params, fresh = self.cache.lookup(self.database, product_ids, end)
+        forecast, params, refitted = fit_and_forecast(series, params, fresh, self.horizon)
+        if refitted:
+            self.cache.store(self.database, product_ids[~fresh], params[:, ~fresh], end)
+            self.cache.save()
+        fitted = time.perf_counter()
+
+        return {
+            "product_ids": product_ids,
+            "start": start,
+            "history": series,
+            "forecast": forecast,
+            "params": params,
+            "refitted": refitted,
+            "load_seconds": loaded - started,
+            "fit_seconds": fitted - loaded,
+        }
+
+
+def forecast_rows(result, names):
+    """Rows for FORECAST_COLUMNS, largest forecast first."""
+    horizon = result["forecast"].shape[1]
+    recent = result["history"][:, -horizon:].sum(axis=1)
+    upcoming = result["forecast"].sum(axis=1)
+    order = np.argsort(-upcoming)
+    rows = []
+    for i in order.tolist():
+        product_id = int(result["product_ids"][i])
+        change = (upcoming[i] - recent[i]) / recent[i] * 100 if recent[i] else float("nan")
+        alpha, beta, gamma = result["params"][:, i].tolist()
+        rows.append((names.get(product_id, product_id), round(float(recent[i]), 1), round(float(upcoming[i]), 1),
+                     "" if np.isnan(change) else f"{change:+.0f}%", alpha, beta, gamma))
+    return rows
+
+
+def forecast_report(db_connection, database):
+    """Run the forecast and return (rows, result) for display; meant for a worker thread."""
+    result = DemandForecaster(db_connection, database).run()
+    names, _ = db_connection.run_query(database, "SELECT ProductID, Name FROM Product")
+    return forecast_rows(result, dict(names)), result
+
+
+def synthetic_sales(products, days, seed=0):
+    """Weekly-seasonal demand with trend and noise, for timing the fit without a database."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    base = rng.uniform(5, 50, (products, 1))
+    weekly = rng.uniform(0, 1, (products, SEASON_LENGTH))[:, t % SEASON_LENGTH] * base
+    trend = rng.normal(0, 0.01, (products, 1)) * t
+    return np.maximum(base + weekly + trend + rng.normal(0, 3, (products, days)), 0).round()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit Holt-Winters demand forecasts for every product")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    parser.add_argument("--database", default="farmer_schema")
+    parser.add_argument("--refit", action="store_true", help="ignore cached parameters")
+    parser.add_argument("--synthetic", type=int, metavar="PRODUCTS",
+                        help="time the fit on generated data for this many products instead of a database")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        series = synthetic_sales(args.synthetic, HISTORY_DAYS)
+        started = time.perf_counter()
+        _, params, _ = fit_and_forecast(series)
+        searched = time.perf_counter()
+        fit_and_forecast(series, params, np.ones(len(series), dtype=bool))
+        cached = time.perf_counter()
+        print(f"{args.synthetic:,} products x {HISTORY_DAYS} days: grid search over {len(PARAMETER_GRID)} "
+              f"parameter sets {searched - started:.2f}s, with cached parameters {cached - searched:.2f}s")
+        return
+
+    if not args.user:
+        parser.error("--user is required unless --synthetic is given")
+    from app import DatabaseConnection
+
+    db_connection = DatabaseConnection()
+    password = args.password if args.password is not None else getpass.getpass()
+    if not db_connection.connect(args.host, args.user, password):
+        raise SystemExit(1)
+    try:
+        cache = ForecastParameterCache()
+        if args.refit:
+            cache.clear(args.database)
+        result = DemandForecaster(db_connection, args.database, cache).run()
+    finally:
+        db_connection.close()
+    print(f"{len(result['product_ids']):,} products: loaded in {result['load_seconds']:.2f}s, "
+          f"fitted in {result['fit_seconds']:.2f}s ({result['refitted']} refitted)")
+
+
+if __name__ == "__main__":
+    main()
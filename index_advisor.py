@@ -0,0 +1,67 @@
+import argparse
+import getpass
+
+from farmer_queries import FARMER_QUERIES
+
+def explain_query(db_connection, database, sql, params=None):
+    rows, description = db_connection.run_query(database, f"EXPLAIN {sql.strip()}", params)
+    names = [col[0] for col in description]
+    return [dict(zip(names, row)) for row in rows]
+
+
+def run_index_advisor(db_connection, database, queries=FARMER_QUERIES):
+    findings = []
+    for name, (sql, params) in queries.items():
+        try:
+            plan = explain_query(db_connection, database, sql, params)
+        except Exception as e:
+            findings.append((name, "", "", "", "", str(e), "EXPLAIN failed"))
+            continue
+        for step in plan:
+            access_type = step.get("type") or ""
+            extra = step.get("Extra") or ""
+            if access_type == "ALL":
+                flag = "FULL TABLE SCAN"
+            elif access_type == "index":
+                flag = "FULL INDEX SCAN"
+            elif "Using filesort" in extra or "Using temporary" in extra:
+                flag = "sort/temp table"
+            else:
+                flag = ""
+            findings.append((name, step.get("table") or "", access_type, step.get("key") or "",
+                             step.get("rows") or "", extra, flag))
+    return findings
+
+
+FINDING_COLUMNS = ("Query", "Table", "Access Type", "Key", "Rows", "Extra", "Flag")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN every FarmerMainWindow query and flag full scans")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password")
+    parser.add_argument("--database", default="farmer_schema")
+    args = parser.parse_args()
+
+    from app import DatabaseConnection
+
+    db_connection = DatabaseConnection()
+    password = args.password if args.password is not None else getpass.getpass()
+    if not db_connection.connect(args.host, args.user, password):
+        raise SystemExit(1)
+    try:
+        findings = run_index_advisor(db_connection, args.database)
+    finally:
+        db_connection.close()
+
+    print(" | ".join(FINDING_COLUMNS))
+    for finding in findings:
+        print(" | ".join(str(value) for value in finding))
+    flagged = [finding for finding in findings if finding[-1] in ("FULL TABLE SCAN", "EXPLAIN failed")]
+    if flagged:
+        print(f"\n{len(flagged)} plan step(s) need attention")
+
+
+if __name__ == "__main__":
+    main()
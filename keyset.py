@@ -0,0 +1,99 @@
+# SQL builders for keyset (seek) pagination. Each page continues from the sort
+# key of the last row already shown instead of using OFFSET, so page N costs
+# the same index range scan as page 1.
+#
+# MySQL sorts NULLs first ascending and last descending; the predicates below
+# follow that so no row is skipped or repeated across page boundaries.
+
+
+def quote_identifier(name):
+    return "`" + str(name).replace("`", "``") + "`"
+
+
+def order_by_clause(columns, descending=False):
+    direction = " DESC" if descending else ""
+    return ", ".join(f"{quote_identifier(column)}{direction}" for column in columns)
+
+
+def _after(column, value, descending, not_null=()):
+    quoted = quote_identifier(column)
+    if value is None:
+        # Nothing sorts after NULL when NULLs are last
+        return (None, []) if descending else (f"{quoted} IS NOT NULL", [])
+    if descending:
+        if column in not_null:
+            return f"{quoted} < %s", [value]
+        return f"({quoted} < %s OR {quoted} IS NULL)", [value]
+    return f"{quoted} > %s", [value]
+
+
+def _equal(column, value):
+    quoted = quote_identifier(column)
+    if value is None:
+        return f"{quoted} IS NULL", []
+    return f"{quoted} = %s", [value]
+
+
+def keyset_predicate(columns, values, descending=False, not_null=()):
+    """Return (sql, params) matching rows that sort strictly after `values`."""
+    if len(columns) != len(values):
+        raise ValueError("Keyset columns and values must have the same length.")
+
+    if len(columns) == 1:
+        after_sql, after_params = _after(columns[0], values[0], descending, not_null)
+        return (after_sql, after_params) if after_sql is not None else ("FALSE", [])
+
+    if all(value is not None for value in values) and (
+            not descending or all(column in not_null for column in columns[1:])):
+        # Row constructor comparison lets MySQL use a single index range. A
+        # NULL past the first column makes the comparison NULL, which only
+        # gives the right answer when NULLs sort first (ascending)
+        quoted = ", ".join(quote_identifier(column) for column in columns)
+        placeholders = ", ".join(["%s"] * len(values))
+        operator = "<" if descending else ">"
+        sql = f"({quoted}) {operator} ({placeholders})"
+        params = list(values)
+        if descending and columns[0] not in not_null:
+            sql = f"({sql} OR {quote_identifier(columns[0])} IS NULL)"
+        return sql, params
+
+    terms = []
+    params = []
+    for index, (column, value) in enumerate(zip(columns, values)):
+        after_sql, after_params = _after(column, value, descending, not_null)
+        if after_sql is not None:
+            parts = []
+            term_params = []
+            for previous_column, previous_value in zip(columns[:index], values[:index]):
+                equal_sql, equal_params = _equal(previous_column, previous_value)
+                parts.append(equal_sql)
+                term_params.extend(equal_params)
+            parts.append(after_sql)
+            terms.append("(" + " AND ".join(parts) + ")")
+            params.extend(term_params + after_params)
+    if not terms:
+        return "FALSE", []
+    return "(" + " OR ".join(terms) + ")", params
+
+
+def page_query(table, order_columns, descending=False, after=None, limit=200, not_null=(), where=None,
+               where_params=()):
+    """Build a SELECT for one page ordered by `order_columns`, continuing after `after`."""
+    conditions = []
+    params = []
+    if where:
+        conditions.append(f"({where})")
+        params.extend(where_params)
+    if after is not None:
+        predicate, predicate_params = keyset_predicate(order_columns, after, descending, not_null)
+        conditions.append(predicate)
+        params.extend(predicate_params)
+
+    sql = f"SELECT * FROM {quote_identifier(table)}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if order_columns:
+        sql += " ORDER BY " + order_by_clause(order_columns, descending)
+    sql += " LIMIT %s"
+    params.append(limit)
+    return sql, params
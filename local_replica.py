@@ -0,0 +1,662 @@
+# Local SQLite copy of the farmer_schema tables for working through a flaky
+# connection. Reads are served from the local file; writes are applied locally
+# and recorded in a journal, which is replayed against MySQL in batches once
+# the server is reachable. Replayed changes are checked against the row the
+# change was based on, so an edit made on the server in the meantime is
+# reported as a conflict instead of being silently overwritten.
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+
+from mysql.connector import Error
+
+from db_pool import is_transient_error
+
+DEFAULT_REPLICA_PATH = os.environ.get(
+    "FARMER_REPLICA_PATH", os.path.join(os.path.expanduser("~"), ".farmer_inventory", "replica.sqlite3"))
+
+# table -> how it is pulled from MySQL: "full" tables are small and re-read
+# whole, "append" tables are read whole once and after that only fetch rows
+# past the highest local key less APPEND_OVERLAP. Sale IDs are reserved in
+# blocks, so sales can commit out of key order; the overlap picks up any
+# committed within that many IDs of the newest one. Appending never sees
+# deletes on the server.
+REPLICATED_TABLES = {
+    "Product": "full",
+    "Vendor": "full",
+    "Customer": "full",
+    "Inventory": "full",
+    "SeasonalAnalysis": "full",
+    "SaleRollupProduct": "full",
+    "SaleRollupDaily": "full",
+    "Sale": "append",
+}
+
+APPEND_OVERLAP = 1000
+SYNC_BATCH_SIZE = 200
+PULL_CHUNK_SIZE = 5000
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(sep=" "))
+
+
+def _sqlite_type(column_type):
+    column_type = column_type.lower()
+    if "int" in column_type:
+        return "INTEGER"
+    if column_type.startswith(("decimal", "numeric", "float", "double", "real")):
+        return "NUMERIC"
+    if column_type.startswith(("blob", "binary", "varbinary")):
+        return "BLOB"
+    return "TEXT"
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _to_json(values):
+    return json.dumps(values, default=str)
+
+
+def _same(local, server):
+    # Values round-trip through SQLite and JSON as text or float, so compare
+    # numerically where both sides are numbers and as text otherwise
+    if local is None or server is None:
+        return local is None and server is None
+    try:
+        return float(local) == float(server)
+    except (TypeError, ValueError):
+        return str(local) == str(server)
+
+
+class LocalReplica:
+    def __init__(self, path=DEFAULT_REPLICA_PATH):
+        self.path = path
+        # Set by OfflineDatabaseConnection so local reads show up in Query Stats
+        self.query_stats = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One SQLite connection per thread; WAL lets the UI keep reading while
+        # the sync thread writes a refresh
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            connection = self._connection()
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS _journal (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    op TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    pk TEXT NOT NULL,
+                    new_values TEXT,
+                    base_values TEXT,
+                    deltas TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    message TEXT,
+                    created_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS _replica_tables (
+                    table_name TEXT PRIMARY KEY,
+                    columns TEXT NOT NULL,
+                    primary_key TEXT NOT NULL,
+                    pulled_at TEXT
+                );
+            """)
+            connection.commit()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            self._local.connection = connection
+        return connection
+
+    # -- reads -----------------------------------------------------------
+
+    def query(self, sql, params=()):
+        """Run a query written for MySQL (%s placeholders, backticks) against the replica."""
+        rows = []
+        started = time.perf_counter()
+        try:
+            cursor = self._connection().execute(sql.replace("%s", "?"), list(params or ()))
+            rows = cursor.fetchall()
+            description = cursor.description or []
+        except sqlite3.Error as e:
+            raise Error(msg=f"Local replica: {e}")
+        finally:
+            if self.query_stats is not None:
+                self.query_stats.record(sql, params or None, time.perf_counter() - started, len(rows), 0)
+        return rows, description
+
+    def iter_query(self, sql, params=(), chunk_size=PULL_CHUNK_SIZE):
+        """Like query, but yields (description, rows) chunk_size rows at a time."""
+        try:
+            cursor = self._connection().execute(sql.replace("%s", "?"), list(params or ()))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield cursor.description, rows
+        except sqlite3.Error as e:
+            raise Error(msg=f"Local replica: {e}")
+
+    def tables(self):
+        rows, _ = self.query("SELECT table_name FROM _replica_tables ORDER BY table_name")
+        return [row[0] for row in rows]
+
+    def column_info(self, table):
+        """(name, type, key) tuples, shaped like DatabaseConnection.get_column_info."""
+        rows, _ = self.query("SELECT columns, primary_key FROM _replica_tables WHERE table_name = %s", (table,))
+        if not rows:
+            return []
+        columns = json.loads(rows[0][0])
+        primary_key = json.loads(rows[0][1])
+        return [(name, column_type, "PRI" if name in primary_key else "") for name, column_type in columns]
+
+    def primary_key(self, table):
+        return [column[0] for column in self.column_info(table) if column[2] == "PRI"]
+
+    def row(self, table, pk_values):
+        primary_key = self.primary_key(table)
+        where = " AND ".join(f"{_quote(column)} = ?" for column in primary_key)
+        cursor = self._connection().execute(f"SELECT * FROM {_quote(table)} WHERE {where}", list(pk_values))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([column[0] for column in cursor.description], row))
+
+    def last_pulled(self):
+        rows, _ = self.query("SELECT MIN(pulled_at) FROM _replica_tables")
+        return rows[0][0] if rows else None
+
+    def journal_counts(self):
+        rows, _ = self.query("SELECT status, COUNT(*) FROM _journal GROUP BY status")
+        return dict(rows)
+
+    def conflicts(self):
+        rows, _ = self.query(
+            "SELECT id, op, table_name, pk, new_values, message, created_at FROM _journal "
+            "WHERE status = 'conflict' ORDER BY id")
+        return rows
+
+    # -- local writes ----------------------------------------------------
+
+    def _journal(self, connection, op, table, pk_values, new_values=None, base_values=None, deltas=None):
+        connection.execute(
+            "INSERT INTO _journal (op, table_name, pk, new_values, base_values, deltas, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (op, table, _to_json(list(pk_values)),
+             _to_json(new_values) if new_values is not None else None,
+             _to_json(base_values) if base_values is not None else None,
+             _to_json(deltas) if deltas is not None else None,
+             datetime.datetime.now().isoformat(timespec="seconds"))
+        )
+
+    def insert(self, table, columns, values, op="insert"):
+        primary_key = self.primary_key(table)
+        row = dict(zip(columns, values))
+        placeholders = ", ".join(["?"] * len(columns))
+        with self._write_lock:
+            connection = self._connection()
+            try:
+                with connection:
+                    connection.execute(
+                        f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) VALUES ({placeholders})",
+                        list(values))
+                    self._journal(connection, op, table, [row.get(column) for column in primary_key], row)
+                    if op == "sale":
+                        self._apply_sale_locally(connection, row)
+                    elif table == "Sale":
+                        self._apply_sale_locally(connection, row, restock=False)
+            except sqlite3.Error as e:
+                raise Error(msg=f"Local replica: {e}")
+
+    def _apply_sale_locally(self, connection, sale, sign=1, restock=True):
+        # Mirror what DatabaseConnection does on the server for a recorded
+        # sale (stock and rollups) or a plain insert or delete of a Sale row
+        # (rollups only), so local stock and analytics stay plausible until
+        # the next pull
+        quantity = sign * float(sale.get("QuantitySold") or 0)
+        amount = sign * float(sale.get("TotalPrice") or 0)
+        if restock:
+            connection.execute(
+                "UPDATE Inventory SET QuantityInStock = QuantityInStock - ? WHERE InventoryID = ("
+                "SELECT InventoryID FROM Inventory WHERE ProductID = ? AND VendorID = ? ORDER BY InventoryID LIMIT 1)",
+                (quantity, sale.get("ProductID"), sale.get("VendorID")))
+        if sale.get("ProductID") is None:
+            # The server rollups skip sales without a product too
+            return
+        if "SaleRollupProduct" in self.tables():
+            connection.execute(
+                "INSERT INTO SaleRollupProduct (ProductID, TotalUnitsSold, TotalRevenue) VALUES (?, ?, ?) "
+                "ON CONFLICT(ProductID) DO UPDATE SET "
+                "TotalUnitsSold = TotalUnitsSold + excluded.TotalUnitsSold, "
+                "TotalRevenue = TotalRevenue + excluded.TotalRevenue",
+                (sale.get("ProductID"), quantity, amount))
+        if "SaleRollupDaily" in self.tables() and sale.get("SaleDate"):
+            connection.execute(
+                "INSERT INTO SaleRollupDaily (ProductID, SaleDate, UnitsSold, Revenue) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(ProductID, SaleDate) DO UPDATE SET "
+                "UnitsSold = UnitsSold + excluded.UnitsSold, Revenue = Revenue + excluded.Revenue",
+                (sale.get("ProductID"), str(sale.get("SaleDate")), quantity, amount))
+
+    def update(self, table, pk_values, new_values, deltas=None):
+        """Set new_values and add deltas ({column: amount}) on one row."""
+        primary_key = self.primary_key(table)
+        deltas = deltas or {}
+        with self._write_lock:
+            connection = self._connection()
+            try:
+                with connection:
+                    base = self.row(table, pk_values)
+                    if base is None:
+                        return 0
+                    assignments = [f"{_quote(column)} = ?" for column in new_values]
+                    assignments += [f"{_quote(column)} = {_quote(column)} + ?" for column in deltas]
+                    where = " AND ".join(f"{_quote(column)} = ?" for column in primary_key)
+                    cursor = connection.execute(
+                        f"UPDATE {_quote(table)} SET {', '.join(assignments)} WHERE {where}",
+                        list(new_values.values()) + list(deltas.values()) + list(pk_values))
+                    self._journal(connection, "update", table, pk_values, new_values,
+                                  {column: base.get(column) for column in new_values}, deltas)
+                    return cursor.rowcount
+            except sqlite3.Error as e:
+                raise Error(msg=f"Local replica: {e}")
+
+    def delete(self, table, condition_column, condition_value):
+        primary_key = self.primary_key(table)
+        with self._write_lock:
+            connection = self._connection()
+            try:
+                with connection:
+                    cursor = connection.execute(
+                        f"SELECT * FROM {_quote(table)} WHERE {_quote(condition_column)} = ?", (condition_value,))
+                    names = [column[0] for column in cursor.description]
+                    rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+                    for row in rows:
+                        self._journal(connection, "delete", table, [row[column] for column in primary_key],
+                                      base_values=row)
+                        if table == "Sale":
+                            self._apply_sale_locally(connection, row, sign=-1, restock=False)
+                    connection.execute(
+                        f"DELETE FROM {_quote(table)} WHERE {_quote(condition_column)} = ?", (condition_value,))
+                    return len(rows)
+            except sqlite3.Error as e:
+                raise Error(msg=f"Local replica: {e}")
+
+    def resolve_conflict(self, journal_id):
+        # The user has looked at it; the server copy wins on the next pull
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                connection.execute("DELETE FROM _journal WHERE id = ? AND status = 'conflict'", (journal_id,))
+
+    # -- pulling from MySQL ----------------------------------------------
+
+    def _create_table(self, connection, table, column_info, temporary=False):
+        columns = [(column[0], column[1]) for column in column_info]
+        primary_key = [column[0] for column in column_info if column[2] == "PRI"]
+        definitions = [f"{_quote(name)} {_sqlite_type(column_type)}" for name, column_type in columns]
+        if primary_key:
+            definitions.append(f"PRIMARY KEY ({', '.join(_quote(column) for column in primary_key)})")
+        if temporary:
+            connection.execute(f"CREATE TEMP TABLE {_quote(table)} ({', '.join(definitions)})")
+            return
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({', '.join(definitions)})")
+        connection.execute(
+            "INSERT INTO _replica_tables (table_name, columns, primary_key) VALUES (?, ?, ?) "
+            "ON CONFLICT(table_name) DO UPDATE SET columns = excluded.columns, primary_key = excluded.primary_key",
+            (table, _to_json(columns), _to_json(primary_key)))
+
+    def pull_table(self, db_connection, database, table, mode="full"):
+        """Copy a table from MySQL, paging by primary key so only one chunk is held at a time.
+
+        Rows are fetched into a temporary staging table without the write
+        lock, so offline writes from the UI never wait on the network; the
+        lock is only held to move the staged rows into place. Returns the
+        rows pulled, or None if a local write was journaled meanwhile: the
+        staged rows would overwrite it, so they are dropped and the next sync
+        pulls again once the write is pushed.
+        """
+        column_info = db_connection.get_column_info(database, table)
+        if not column_info:
+            return 0
+        column_names = [column[0] for column in column_info]
+        column_list = ", ".join(_quote(column) for column in column_names)
+        primary_key = [column[0] for column in column_info if column[2] == "PRI"]
+        staging = _quote(f"_staging_{table}")
+        insert = f"INSERT OR REPLACE INTO temp.{staging} ({column_list}) VALUES ({', '.join(['?'] * len(column_names))})"
+
+        connection = self._connection()
+        pulled = 0
+        try:
+            after = None
+            if mode == "append" and len(primary_key) == 1 and table in self.tables():
+                row = connection.execute(f"SELECT MAX({_quote(primary_key[0])}) FROM {_quote(table)}").fetchone()
+                if isinstance(row[0], int):
+                    # Re-read a margin below the highest local key for sales
+                    # committed out of key order
+                    after = (row[0] - APPEND_OVERLAP,)
+                elif row[0] is not None:
+                    after = (row[0],)
+
+            connection.execute(f"DROP TABLE IF EXISTS temp.{staging}")
+            self._create_table(connection, f"_staging_{table}", column_info, temporary=True)
+            while True:
+                if primary_key:
+                    rows, description = db_connection.get_page(database, table, after=after, limit=PULL_CHUNK_SIZE)
+                else:
+                    rows, description = db_connection.get_table_chunk(database, table, pulled, PULL_CHUNK_SIZE)
+                if not rows:
+                    break
+                names = [column[0] for column in description]
+                order = [names.index(column) for column in column_names]
+                with connection:
+                    connection.executemany(insert, [[row[i] for i in order] for row in rows])
+                pulled += len(rows)
+                if len(rows) < PULL_CHUNK_SIZE:
+                    break
+                if primary_key:
+                    after = tuple(rows[-1][names.index(column)] for column in primary_key)
+
+            with self._write_lock:
+                if self.journal_counts().get("pending"):
+                    return None
+                with connection:
+                    self._create_table(connection, table, column_info)
+                    if mode != "append":
+                        connection.execute(f"DELETE FROM {_quote(table)}")
+                    connection.execute(f"INSERT OR REPLACE INTO {_quote(table)} ({column_list}) "
+                                       f"SELECT {column_list} FROM temp.{staging}")
+                    connection.execute("UPDATE _replica_tables SET pulled_at = ? WHERE table_name = ?",
+                                       (datetime.datetime.now().isoformat(timespec="seconds"), table))
+            return pulled
+        except sqlite3.Error as e:
+            raise Error(msg=f"Local replica: {e}")
+        finally:
+            try:
+                connection.execute(f"DROP TABLE IF EXISTS temp.{staging}")
+            except sqlite3.Error:
+                pass
+
+    def pull(self, db_connection, database, full=True):
+        """Pull every replicated table; returns {table: rows pulled}, or None if a local write interrupted it.
+
+        Append tables always pull incrementally; full only decides whether
+        the small tables are re-read when they already exist locally.
+        """
+        pulled = {}
+        for table, mode in REPLICATED_TABLES.items():
+            if mode == "full" and not full and table in self.tables():
+                continue
+            pulled[table] = self.pull_table(db_connection, database, table, mode)
+            if pulled[table] is None:
+                return None
+        return pulled
+
+    def sync(self, db_connection, database, full=True):
+        """Push the journal, then pull unless changes are still pending.
+
+        Returns (applied, conflicts, pulled); pulled is None when the pull was skipped.
+        """
+        applied, conflicts = self.push(db_connection, database)
+        pulled = None
+        # Only pull once local changes are on the server, so they are not overwritten
+        if not self.journal_counts().get("pending"):
+            pulled = self.pull(db_connection, database, full=full)
+        return applied, conflicts, pulled
+
+    # -- pushing the journal to MySQL ------------------------------------
+
+    def _pending(self, limit):
+        rows, _ = self.query(
+            "SELECT id, op, table_name, pk, new_values, base_values, deltas FROM _journal "
+            "WHERE status = 'pending' ORDER BY id LIMIT %s", (limit,))
+        return [
+            {
+                "id": row[0], "op": row[1], "table": row[2], "pk": json.loads(row[3]),
+                "new": json.loads(row[4]) if row[4] else {},
+                "base": json.loads(row[5]) if row[5] else {},
+                "deltas": json.loads(row[6]) if row[6] else {},
+            }
+            for row in rows
+        ]
+
+    def _finish(self, applied, conflicts):
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                connection.executemany("DELETE FROM _journal WHERE id = ?", [(entry_id,) for entry_id in applied])
+                connection.executemany("UPDATE _journal SET status = 'conflict', message = ? WHERE id = ?",
+                                       [(message, entry_id) for entry_id, message in conflicts])
+
+    def _server_row(self, cursor, table, primary_key, pk_values):
+        where = " AND ".join(f"`{column}` = %s" for column in primary_key)
+        cursor.execute(f"SELECT * FROM `{table}` WHERE {where} FOR UPDATE", list(pk_values))
+        rows = cursor.fetchall()
+        if not rows:
+            return None
+        return dict(zip([column[0] for column in cursor.description], rows[0]))
+
+    def _check(self, entry, server_row):
+        """Return a conflict message, or None if the change still applies cleanly."""
+        op = entry["op"]
+        if op in ("insert", "sale"):
+            if server_row is None:
+                return None
+            if all(_same(value, server_row.get(column)) for column, value in entry["new"].items()):
+                return None
+            return f"{entry['table']} {entry['pk']} already exists on the server with different values"
+        if server_row is None:
+            return None if op == "delete" else f"{entry['table']} {entry['pk']} was deleted on the server"
+        changed = [
+            column for column, base in entry["base"].items()
+            if not _same(base, server_row.get(column))
+            and not (op == "update" and _same(entry["new"].get(column), server_row.get(column)))
+        ]
+        if changed:
+            return f"{entry['table']} {entry['pk']} was changed on the server ({', '.join(changed)})"
+        return None
+
+    def _attempt(self, cursor, work):
+        """Run work under a savepoint; returns None, or why the server refused it for good.
+
+        A refused change (a foreign key, a duplicate key, no stock) is undone
+        on its own and reported as a conflict, rather than failing the whole
+        batch on every sync. Lock timeouts and lost connections still raise,
+        and the batch is retried as a whole on the next sync.
+        """
+        cursor.execute("SAVEPOINT journal_entry")
+        try:
+            work()
+        except Error as e:
+            if is_transient_error(e):
+                raise
+            cursor.execute("ROLLBACK TO SAVEPOINT journal_entry")
+            return f"Refused by the server: {e}"
+        return None
+
+    def _push_sales(self, db_connection, database, entries, applied, conflicts):
+        # Sales go through insert_sales so the server also decrements stock and
+        # updates the rollups, exactly as an online sale would. The check and the
+        # insert share one transaction, with the sale IDs locked by the check,
+        # so no other terminal can take an ID in between.
+        primary_key = self.primary_key("Sale")
+        clean = []
+        with db_connection.transaction(database) as (connection, cursor):
+            for entry in entries:
+                server_row = self._server_row(cursor, "Sale", primary_key, entry["pk"])
+                message = self._check(entry, server_row)
+                if message is not None:
+                    conflicts.append((entry["id"], message))
+                elif server_row is None:
+                    clean.append(entry)
+                else:
+                    # Already on the server (an earlier sync got this far before failing)
+                    applied.append(entry["id"])
+            if not clean:
+                return
+            columns = list(clean[0]["new"].keys())
+
+            def insert(group):
+                db_connection.insert_sales(connection, cursor, database, columns,
+                                           [tuple(entry["new"][c] for c in columns) for entry in group])
+
+            if self._attempt(cursor, lambda: insert(clean)) is None:
+                applied.extend(entry["id"] for entry in clean)
+                return
+            # Something in the batch was refused; find out which sales, one at a time
+            for entry in clean:
+                message = self._attempt(cursor, lambda entry=entry: insert([entry]))
+                if message is None:
+                    applied.append(entry["id"])
+                else:
+                    conflicts.append((entry["id"], message))
+
+    def _apply_change(self, db_connection, cursor, entry, primary_key, server_row):
+        table = entry["table"]
+        where = " AND ".join(f"`{column}` = %s" for column in primary_key)
+        if entry["op"] == "insert" and server_row is None:
+            columns = list(entry["new"].keys())
+            cursor.execute(
+                f"INSERT INTO `{table}` ({', '.join(f'`{c}`' for c in columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))})",
+                [entry["new"][column] for column in columns])
+            if table == "Sale":
+                db_connection.add_to_sales_rollup(cursor, list(entry["pk"]))
+        elif entry["op"] == "update":
+            # Deltas are applied relative to the server value, so they merge
+            # with changes other terminals made in the meantime
+            assignments = [f"`{column}` = %s" for column in entry["new"]]
+            assignments += [f"`{column}` = `{column}` + %s" for column in entry["deltas"]]
+            if assignments:
+                if table == "Sale":
+                    # Take the old figures out and fold the new ones back in
+                    db_connection.remove_from_sales_rollup(cursor, where, list(entry["pk"]))
+                cursor.execute(
+                    f"UPDATE `{table}` SET {', '.join(assignments)} WHERE {where}",
+                    list(entry["new"].values()) + list(entry["deltas"].values()) + list(entry["pk"]))
+                if table == "Sale":
+                    db_connection.add_to_sales_rollup(cursor, list(entry["pk"]))
+        elif entry["op"] == "delete" and server_row is not None:
+            if table == "Sale":
+                db_connection.remove_from_sales_rollup(cursor, where, list(entry["pk"]))
+            cursor.execute(f"DELETE FROM `{table}` WHERE {where}", list(entry["pk"]))
+
+    def _push_changes(self, db_connection, database, entries, applied, conflicts):
+        with db_connection.transaction(database) as (_, cursor):
+            for entry in entries:
+                primary_key = self.primary_key(entry["table"])
+                server_row = self._server_row(cursor, entry["table"], primary_key, entry["pk"])
+                message = self._check(entry, server_row)
+                if message is None:
+                    message = self._attempt(
+                        cursor, lambda: self._apply_change(db_connection, cursor, entry, primary_key, server_row))
+                if message is None:
+                    applied.append(entry["id"])
+                else:
+                    conflicts.append((entry["id"], message))
+
+    def push(self, db_connection, database, batch_size=SYNC_BATCH_SIZE):
+        """Replay pending journal entries in order; returns (applied, conflicts)."""
+        total_applied = 0
+        total_conflicts = 0
+        while True:
+            entries = self._pending(batch_size)
+            if not entries:
+                break
+            # Consecutive entries of the same kind are sent together
+            groups = []
+            for entry in entries:
+                is_sale = entry["op"] == "sale"
+                if groups and groups[-1][0] == is_sale:
+                    groups[-1][1].append(entry)
+                else:
+                    groups.append((is_sale, [entry]))
+            for is_sale, group in groups:
+                applied, conflicts = [], []
+                if is_sale:
+                    self._push_sales(db_connection, database, group, applied, conflicts)
+                else:
+                    self._push_changes(db_connection, database, group, applied, conflicts)
+                self._finish(applied, conflicts)
+                total_applied += len(applied)
+                total_conflicts += len(conflicts)
+        if total_applied:
+            db_connection.invalidate_schema(database)
+        return total_applied, total_conflicts
+
+
+class ReplicaSyncer:
+    """Background thread that pushes the journal and refreshes the replica when MySQL is reachable."""
+
+    def __init__(self, replica, connect, database, interval=30, full_pull_interval=300):
+        self.replica = replica
+        self.connect = connect  # returns a connected DatabaseConnection, or None
+        self.database = database
+        self.interval = interval
+        self.full_pull_interval = full_pull_interval
+        self.online = False
+        self.last_sync = None
+        self.last_error = None
+        self._last_full_pull = 0
+        # Kept between syncs rather than opening a new pool every interval
+        self._db_connection = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="replica-sync", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def sync_now(self):
+        self._wake.set()
+
+    def sync_once(self):
+        if self._db_connection is None:
+            self._db_connection = self.connect()
+        if self._db_connection is None:
+            self.online = False
+            return None
+        self.online = True
+        full = time.monotonic() - self._last_full_pull >= self.full_pull_interval
+        try:
+            applied, conflicts, pulled = self.replica.sync(self._db_connection, self.database, full=full)
+        except Exception:
+            # Start from a fresh connection next time in case this one is broken
+            self._disconnect()
+            raise
+        if full and pulled is not None:
+            self._last_full_pull = time.monotonic()
+        self.last_sync = datetime.datetime.now()
+        self.last_error = None
+        return applied, conflicts
+
+    def _disconnect(self):
+        db_connection, self._db_connection = self._db_connection, None
+        if db_connection is not None:
+            db_connection.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                self.online = False
+                self.last_error = str(e)
+                print(f"Replica sync failed: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+        self._disconnect()
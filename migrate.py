@@ -0,0 +1,147 @@
+import argparse
+import getpass
+import os
+import re
+from contextlib import contextmanager
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+LOCK_TIMEOUT_SECONDS = 30
+
+CREATE_INDEX_RE = re.compile(r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+`?(\w+)`?\s+ON\s+`?(\w+)`?", re.IGNORECASE)
+ADD_COLUMN_RE = re.compile(r"^ALTER\s+TABLE\s+`?(\w+)`?\s+ADD\s+COLUMN\s+`?(\w+)`?", re.IGNORECASE)
+
+
+def list_migrations(migrations_dir=MIGRATIONS_DIR):
+    migrations = []
+    for name in sorted(os.listdir(migrations_dir)):
+        match = re.match(r"^(\d+)_(.+)\.sql$", name)
+        if match:
+            migrations.append((int(match.group(1)), name, os.path.join(migrations_dir, name)))
+    return migrations
+
+
+def split_statements(sql):
+    # Migrations are plain DDL/DML, so stripping line comments and splitting
+    # on semicolons is enough
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def statement_needed(db_connection, database, statement):
+    # MySQL has no IF NOT EXISTS for CREATE INDEX or ADD COLUMN, so look the
+    # object up first; a run that died half way can then simply be repeated.
+    # CREATE TABLE IF NOT EXISTS and INSERT IGNORE already guard themselves.
+    match = CREATE_INDEX_RE.match(statement)
+    if match:
+        rows, _ = db_connection.run_query(database, """
+            SELECT 1 FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = %s
+            LIMIT 1
+        """, (database, match.group(2), match.group(1)))
+        return not rows
+    match = ADD_COLUMN_RE.match(statement)
+    if match:
+        rows, _ = db_connection.run_query(database, """
+            SELECT 1 FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s
+            LIMIT 1
+        """, (database, match.group(1), match.group(2)))
+        return not rows
+    return True
+
+
+@contextmanager
+def migration_lock(db_connection, database, timeout=LOCK_TIMEOUT_SECONDS):
+    # GET_LOCK belongs to the session that took it, so hold one connection
+    # for the whole run; the migrations themselves go over other connections
+    lock_name = f"migrations:{database}"
+    with db_connection.borrow() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (lock_name, timeout))
+        (acquired,) = cursor.fetchone()
+        if acquired != 1:
+            raise RuntimeError(f"Another migration run on {database} is still holding the lock")
+        try:
+            yield
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (lock_name,))
+            cursor.fetchall()
+
+
+def pending_migrations(db_connection, database, migrations_dir=MIGRATIONS_DIR):
+    """Names of the migrations not yet applied to database, without changing anything."""
+    rows, _ = db_connection.run_query(database, """
+        SELECT 1 FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'SchemaMigrations'
+    """, (database,))
+    applied = set()
+    if rows:
+        rows, _ = db_connection.run_query(database, "SELECT Version FROM SchemaMigrations")
+        applied = {row[0] for row in rows}
+    return [name for version, name, _ in list_migrations(migrations_dir) if version not in applied]
+
+
+def applied_versions(db_connection, database):
+    db_connection.execute(database, """
+        CREATE TABLE IF NOT EXISTS SchemaMigrations (
+            Version INT PRIMARY KEY,
+            Name VARCHAR(255) NOT NULL,
+            AppliedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    rows, _ = db_connection.run_query(database, "SELECT Version FROM SchemaMigrations")
+    return {row[0] for row in rows}
+
+
+def apply_migrations(db_connection, database, migrations_dir=MIGRATIONS_DIR):
+    # Needs DDL privileges, so it is run by an administrator through main()
+    # rather than at every login
+    newly_applied = []
+    with migration_lock(db_connection, database):
+        # Read under the lock, so a concurrent run's work is not repeated
+        applied = applied_versions(db_connection, database)
+        for version, name, path in list_migrations(migrations_dir):
+            if version in applied:
+                continue
+            with open(path, encoding="utf-8") as migration_file:
+                statements = split_statements(migration_file.read())
+            # MySQL commits DDL implicitly, so a failure part way through leaves the
+            # earlier statements applied; the version is only recorded on success,
+            # and the next run skips whatever already exists.
+            for statement in statements:
+                if statement_needed(db_connection, database, statement):
+                    db_connection.execute(database, statement)
+            db_connection.execute(database, "INSERT INTO SchemaMigrations (Version, Name) VALUES (%s, %s)",
+                                  (version, name))
+            print(f"Applied migration {name}")
+            newly_applied.append(name)
+    # Indexes or columns may have changed under the cached column metadata
+    if newly_applied:
+        db_connection.invalidate_schema(database)
+    return newly_applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password")
+    parser.add_argument("--database", default="farmer_schema")
+    args = parser.parse_args()
+
+    from app import DatabaseConnection
+
+    db_connection = DatabaseConnection()
+    password = args.password if args.password is not None else getpass.getpass()
+    if not db_connection.connect(args.host, args.user, password):
+        raise SystemExit(1)
+    try:
+        applied = apply_migrations(db_connection, args.database)
+        if not applied:
+            print("Schema is up to date")
+    finally:
+        db_connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+-- Sales rollups read by Sales Analytics and kept current by record_sale.
+-- Safe to run against a schema created from a Queries.sql that already has them.
+CREATE TABLE IF NOT EXISTS SaleRollupProduct (
+    ProductID INT PRIMARY KEY,
+    TotalUnitsSold BIGINT NOT NULL DEFAULT 0,
+    TotalRevenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    FOREIGN KEY (ProductID) REFERENCES Product(ProductID)
+);
+
+CREATE TABLE IF NOT EXISTS SaleRollupDaily (
+    ProductID INT,
+    SaleDate DATE,
+    UnitsSold BIGINT NOT NULL DEFAULT 0,
+    Revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (ProductID, SaleDate),
+    FOREIGN KEY (ProductID) REFERENCES Product(ProductID)
+);
+
+INSERT IGNORE INTO SaleRollupProduct (ProductID, TotalUnitsSold, TotalRevenue)
+SELECT ProductID, COALESCE(SUM(QuantitySold), 0), COALESCE(SUM(TotalPrice), 0)
+FROM Sale
+WHERE ProductID IS NOT NULL
+GROUP BY ProductID;
+
+INSERT IGNORE INTO SaleRollupDaily (ProductID, SaleDate, UnitsSold, Revenue)
+SELECT ProductID, SaleDate, COALESCE(SUM(QuantitySold), 0), COALESCE(SUM(TotalPrice), 0)
+FROM Sale
+WHERE ProductID IS NOT NULL AND SaleDate IS NOT NULL
+GROUP BY ProductID, SaleDate;
@@ -0,0 +1,13 @@
+-- Covering indexes for the FarmerMainWindow analytics joins and lookups.
+
+-- Per-product aggregation (Demand Forecast, rollup rebuilds) reads only the index
+CREATE INDEX idx_sale_product_date ON Sale (ProductID, SaleDate, QuantitySold, TotalPrice);
+
+-- Date-range scans over Sale
+CREATE INDEX idx_sale_date ON Sale (SaleDate, ProductID, QuantitySold, TotalPrice);
+
+-- Inventory Analytics join and product/vendor stock lookups
+CREATE INDEX idx_inventory_product_vendor ON Inventory (ProductID, VendorID, QuantityInStock, RestockThreshold);
+
+-- Seasonal Patterns and Demand Forecast join
+CREATE INDEX idx_seasonal_product ON SeasonalAnalysis (ProductID, DemandTrend, SeasonalPeakPeriod);
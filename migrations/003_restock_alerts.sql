@@ -0,0 +1,7 @@
+-- Restock alerts. MySQL keeps NeedsRestock current on every Inventory write,
+-- and the index lets the alert list be read without scanning Inventory, so
+-- the cost follows the number of alerts rather than the vendor/product matrix.
+ALTER TABLE Inventory
+    ADD COLUMN NeedsRestock TINYINT(1) AS (QuantityInStock <= RestockThreshold) STORED;
+
+CREATE INDEX idx_inventory_needs_restock ON Inventory (NeedsRestock);
@@ -0,0 +1,3 @@
+-- Vendor-filtered sales over a date range (get_sales_timeseries with a vendor)
+-- reads only that vendor's slice of the date range, straight from the index.
+CREATE INDEX idx_sale_vendor_date ON Sale (VendorID, SaleDate, QuantitySold, TotalPrice);
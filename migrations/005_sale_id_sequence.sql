@@ -0,0 +1,9 @@
+-- Sale IDs are handed out from this counter, in blocks for the rapid entry
+-- screen, so terminals no longer race each other for MAX(SaleID) + 1.
+CREATE TABLE IF NOT EXISTS IdSequence (
+    Name VARCHAR(64) PRIMARY KEY,
+    NextValue BIGINT NOT NULL
+);
+
+INSERT IGNORE INTO IdSequence (Name, NextValue)
+SELECT 'Sale', COALESCE(MAX(SaleID), 0) + 1 FROM Sale;
@@ -0,0 +1,449 @@
+import csv
+import datetime
+import time
+
+from mysql.connector import Error
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QColor, QKeySequence
+from PyQt5.QtWidgets import (QDialog, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QLineEdit, QMessageBox,
+                             QPushButton, QShortcut, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget)
+
+from db_pool import DUPLICATE_KEY_ERROR, is_transient_error
+
+SALE_COLUMNS = ["SaleID", "VendorID", "ProductID", "CustomerID", "SaleDate", "QuantitySold", "TotalPrice"]
+
+FLUSH_INTERVAL_MS = 2000
+FLUSH_BATCH_SIZE = 25
+# Sale IDs reserved from the server at a time
+SALE_ID_BLOCK = 100
+
+PENDING_COLOR = QColor("#E0B84A")
+FLUSHED_COLOR = QColor("#3EB489")
+FAILED_COLOR = QColor("#E05A4A")
+
+
+class RapidSaleEntry(QDialog):
+    """Keyboard-driven sale entry that queues sales locally and group-commits them.
+
+    Sales are committed in batches, one transaction per batch, either every
+    FLUSH_INTERVAL_MS or as soon as FLUSH_BATCH_SIZE sales are waiting, so the
+    cashier never waits on a commit. Sales the server refuses are marked
+    Rejected and left out of later batches; on close they can be exported.
+    """
+
+    def __init__(self, db_connection, database, query_executor, parent=None):
+        super().__init__(parent)
+        self.db_connection = db_connection
+        self.database = database
+        self.query_executor = query_executor
+        self.setWindowTitle("Rapid Sale Entry")
+        self.setGeometry(100, 100, 1000, 600)
+
+        self.pending = []  # (grid row, sale values) waiting for the next flush
+        self.in_flight = []
+        self.rejected = []  # (sale values, reason) the server refused
+        self.checking = 0  # sales whose product, vendor and customer are being looked up
+        self.flush_job = None
+        self.flush_error = None  # transient failure of the last flush, if any
+        self.sale_ids = None  # (next, end) of the block of sale IDs reserved for this dialog
+        self.flushed_count = 0
+        self.flush_count = 0
+        self.commit_seconds = 0.0
+        self.first_queued_at = None
+        self.close_when_flushed = False
+
+        self.setup_ui()
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start()
+
+    def setup_ui(self):
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #1e1e1e;
+            }
+            QLabel {
+                color: white;
+                font-size: 13px;
+            }
+            QLineEdit {
+                background-color: #2d2d2d;
+                color: white;
+                border: 1px solid #3d3d3d;
+                padding: 6px;
+                border-radius: 5px;
+                font-size: 14px;
+            }
+            QLineEdit:focus {
+                border: 1px solid #3EB489;
+            }
+            QPushButton {
+                background-color: #2d2d2d;
+                color: white;
+                border: 2px solid #3EB489;
+                padding: 6px 12px;
+                border-radius: 5px;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background-color: #3EB489;
+                color: #1e1e1e;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        # Entry row: Enter moves to the next field, Enter on the last one queues the sale
+        entry = QWidget()
+        entry_layout = QHBoxLayout(entry)
+        entry_layout.setContentsMargins(0, 0, 0, 0)
+        self.vendor_input = QLineEdit()
+        self.product_input = QLineEdit()
+        self.customer_input = QLineEdit()
+        self.quantity_input = QLineEdit("1")
+        self.price_input = QLineEdit()
+        self.date_input = QLineEdit(datetime.date.today().isoformat())
+        self.vendor_input.setPlaceholderText("Vendor ID")
+        self.product_input.setPlaceholderText("Product ID")
+        self.customer_input.setPlaceholderText("Customer ID")
+        self.quantity_input.setPlaceholderText("Qty")
+        self.price_input.setPlaceholderText("Total (blank = list price)")
+        self.date_input.setPlaceholderText("YYYY-MM-DD")
+
+        self.entry_fields = [self.vendor_input, self.product_input, self.customer_input,
+                             self.quantity_input, self.price_input, self.date_input]
+        for index, field in enumerate(self.entry_fields):
+            entry_layout.addWidget(field)
+            if index + 1 < len(self.entry_fields):
+                field.returnPressed.connect(self.entry_fields[index + 1].setFocus)
+            else:
+                field.returnPressed.connect(self.queue_sale)
+        # Vendor, customer and date usually stay the same for a run of sales,
+        # so Enter in the quantity field queues straight away
+        self.quantity_input.returnPressed.disconnect()
+        self.quantity_input.returnPressed.connect(self.queue_sale)
+
+        add_btn = QPushButton("Queue Sale")
+        add_btn.clicked.connect(self.queue_sale)
+        flush_btn = QPushButton("Flush Now (F5)")
+        flush_btn.clicked.connect(self.flush)
+        # Enter belongs to the entry fields; a default button would also fire on it
+        for button in (add_btn, flush_btn):
+            button.setAutoDefault(False)
+            button.setDefault(False)
+        QShortcut(QKeySequence("F5"), self, activated=self.flush)
+        entry_layout.addWidget(add_btn)
+        entry_layout.addWidget(flush_btn)
+        layout.addWidget(entry)
+
+        self.message_label = QLabel("")
+        self.message_label.setStyleSheet("color: #E05A4A; font-size: 13px;")
+        layout.addWidget(self.message_label)
+
+        self.grid = QTableWidget(0, len(SALE_COLUMNS) + 1)
+        self.grid.setHorizontalHeaderLabels(SALE_COLUMNS + ["Status"])
+        self.grid.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.grid.verticalHeader().setVisible(False)
+        self.grid.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.grid.setFocusPolicy(Qt.NoFocus)
+        self.grid.setStyleSheet("""
+            QTableWidget {
+                background-color: #2d2d2d;
+                color: white;
+                gridline-color: #3d3d3d;
+                border: none;
+            }
+            QTableWidget QHeaderView::section {
+                background-color: #252525;
+                color: white;
+                padding: 8px;
+                border: None;
+                font-weight: bold;
+            }
+        """)
+        layout.addWidget(self.grid)
+
+        # Pending/flushed indicator and throughput
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #d4d4d4; font-size: 13px;")
+        layout.addWidget(self.status_label)
+        self.update_status()
+
+        self.product_input.setFocus()
+
+    def _take_sale_ids(self, count):
+        # Only the one flush job in flight calls this, so the block needs no lock
+        if self.sale_ids is None or self.sale_ids[1] - self.sale_ids[0] < count:
+            size = max(count, SALE_ID_BLOCK)
+            first = self.db_connection.reserve_sale_ids(self.database, size)
+            self.sale_ids = (first, first + size)
+        first = self.sale_ids[0]
+        self.sale_ids = (first + count, self.sale_ids[1])
+        return list(range(first, first + count))
+
+    def queue_sale(self):
+        try:
+            vendor_id = int(self.vendor_input.text())
+            product_id = int(self.product_input.text())
+            customer_id = int(self.customer_input.text())
+            quantity = int(self.quantity_input.text())
+            sale_date = datetime.datetime.strptime(self.date_input.text(), "%Y-%m-%d").date()
+            price_text = self.price_input.text().strip()
+            total_price = float(price_text) if price_text else None
+        except ValueError as e:
+            self.message_label.setText(f"Invalid entry: {e}")
+            return
+
+        # The sale ID is given out when the sale is flushed, and the lookups run
+        # on a worker thread, so the cashier can carry on typing straight away
+        values = [None, vendor_id, product_id, customer_id, sale_date, quantity, total_price]
+        row = self.grid.rowCount()
+        self.grid.insertRow(row)
+        for column, value in enumerate(values):
+            item = QTableWidgetItem("" if value is None else str(value))
+            item.setTextAlignment(Qt.AlignCenter)
+            self.grid.setItem(row, column, item)
+        self._set_status(row, "Checking", PENDING_COLOR)
+        self.grid.scrollToBottom()
+
+        self.checking += 1
+        self.query_executor.submit(
+            self._check_sale, values,
+            on_result=lambda checked, r=row: self.sale_checked(r, checked),
+            on_error=lambda message, r=row: self.sale_check_failed(r, message)
+        )
+        if self.first_queued_at is None:
+            self.first_queued_at = time.perf_counter()
+        self.message_label.setText("")
+        self.product_input.clear()
+        self.price_input.clear()
+        self.quantity_input.setText("1")
+        self.product_input.setFocus()
+        self.update_status()
+
+    def _check_sale(self, values):
+        # Runs on a worker thread. Reference rows are cached after the first
+        # lookup, so a run of sales for the same products costs no queries.
+        _, vendor_id, product_id, customer_id, _, quantity, total_price = values
+        product = self.db_connection.get_product_by_id(product_id, self.database)
+        vendor = self.db_connection.get_vendor_by_id(vendor_id, self.database)
+        customer = self.db_connection.get_customer_by_id(customer_id, self.database)
+        for name, row, row_id in (("Product", product, product_id), ("Vendor", vendor, vendor_id),
+                                  ("Customer", customer, customer_id)):
+            if row is None:
+                raise ValueError(f"{name} {row_id} does not exist.")
+        if total_price is None:
+            total_price = float(product["Price"]) * quantity
+        values = list(values)
+        values[SALE_COLUMNS.index("TotalPrice")] = round(total_price, 2)
+        return values
+
+    def sale_checked(self, row, values):
+        self.checking -= 1
+        self.grid.item(row, SALE_COLUMNS.index("TotalPrice")).setText(
+            str(values[SALE_COLUMNS.index("TotalPrice")]))
+        self._set_status(row, "Pending", PENDING_COLOR)
+        self.pending.append((row, values))
+        if len(self.pending) >= FLUSH_BATCH_SIZE:
+            self.flush()
+        self.update_status()
+        if self.close_when_flushed:
+            self.close()
+
+    def sale_check_failed(self, row, message):
+        self.checking -= 1
+        values = [self.grid.item(row, column).text() for column in range(len(SALE_COLUMNS))]
+        self._reject(row, values, message)
+        self.message_label.setText(f"Sale on row {row + 1} not queued: {message}")
+        self.update_status()
+        if self.close_when_flushed:
+            self.close()
+
+    def _set_status(self, row, text, color):
+        item = QTableWidgetItem(text)
+        item.setTextAlignment(Qt.AlignCenter)
+        item.setForeground(color)
+        self.grid.setItem(row, len(SALE_COLUMNS), item)
+
+    def _reject(self, row, values, reason):
+        self._set_status(row, "Rejected", FAILED_COLOR)
+        self.grid.item(row, len(SALE_COLUMNS)).setToolTip(reason)
+        self.rejected.append((values, reason))
+
+    def _commit_batch(self, rows):
+        """Commit rows in one transaction, or one sale at a time if the server refuses the batch.
+
+        Runs on a worker thread; sales still without an ID get one here.
+        Returns (rows, outcomes, error, seconds). Each outcome is True once the
+        sale is committed, the server's reason if it refused the sale, or None
+        if the sale was never tried: error, a lost connection or lock timeout
+        part way through, stopped the run and a later flush should retry it.
+        Raises only when nothing has been committed.
+        """
+        started = time.perf_counter()
+        rows = [list(values) for values in rows]
+        unnumbered = [values for values in rows if values[0] is None]
+        if unnumbered:
+            for values, sale_id in zip(unnumbered, self._take_sale_ids(len(unnumbered))):
+                values[0] = sale_id
+        try:
+            self.db_connection.record_sales(self.database, SALE_COLUMNS, [tuple(values) for values in rows])
+            outcomes, error = [True] * len(rows), None
+        except Error as e:
+            if is_transient_error(e):
+                raise
+            # Retrying the batch would fail the same way; find the sales at fault
+            outcomes, error = self._commit_each(rows)
+        return rows, outcomes, error, time.perf_counter() - started
+
+    def _commit_each(self, rows):
+        outcomes = [None] * len(rows)
+        for index, values in enumerate(rows):
+            for attempt in range(2):
+                try:
+                    self.db_connection.record_sales(self.database, SALE_COLUMNS, [tuple(values)])
+                    outcomes[index] = True
+                    break
+                except Error as e:
+                    if is_transient_error(e):
+                        # Leave this sale and the rest for the next flush
+                        return outcomes, str(e)
+                    if e.errno != DUPLICATE_KEY_ERROR or attempt:
+                        outcomes[index] = str(e)
+                        break
+                try:
+                    # Someone entered a sale with this ID by hand; take a fresh one
+                    values[0] = self._take_sale_ids(1)[0]
+                except Error as e:
+                    return outcomes, str(e)
+        return outcomes, None
+
+    def flush(self):
+        # One batch in flight at a time; anything queued meanwhile goes in the next one
+        if self.flush_job is not None or not self.pending:
+            return
+        self.in_flight, self.pending = self.pending, []
+        rows = [values for _, values in self.in_flight]
+        self.flush_job = self.query_executor.submit(
+            self._commit_batch, rows,
+            on_result=self.flush_done,
+            on_error=self.flush_failed
+        )
+        self.update_status()
+
+    def flush_done(self, result):
+        self.flush_job = None
+        rows, outcomes, error, seconds = result
+        self.flush_error = error
+        retry = []
+        rejected = []
+        for (row, _), values, outcome in zip(self.in_flight, rows, outcomes):
+            # The sale keeps the ID it was given, even if it has to be retried
+            self.grid.item(row, 0).setText(str(values[0]))
+            if outcome is True:
+                self._set_status(row, "Flushed", FLUSHED_COLOR)
+                self.flushed_count += 1
+            elif outcome is None:
+                self._set_status(row, "Retrying", FAILED_COLOR)
+                retry.append((row, values))
+            else:
+                self._reject(row, values, outcome)
+                rejected.append(outcome)
+        self.pending = retry + self.pending
+        self.in_flight = []
+        self.flush_count += 1
+        self.commit_seconds += seconds
+        if rejected:
+            self.message_label.setText(f"{len(rejected)} sale(s) rejected: {rejected[0]}")
+        elif error is not None:
+            self.message_label.setText(f"Flush stopped part way, will retry: {error}")
+        self.update_status()
+        if self.close_when_flushed:
+            self.close()
+        elif len(self.pending) >= FLUSH_BATCH_SIZE and error is None:
+            self.flush()
+
+    def flush_failed(self, message):
+        self.flush_job = None
+        self.flush_error = message
+        # Nothing was committed; the batch goes back in the queue for the next tick
+        for row, _ in self.in_flight:
+            self._set_status(row, "Retrying", FAILED_COLOR)
+        self.pending = self.in_flight + self.pending
+        self.in_flight = []
+        self.message_label.setText(f"Flush failed, will retry: {message}")
+        self.update_status()
+        if self.close_when_flushed:
+            self.close()
+
+    def update_status(self):
+        pending = len(self.pending) + len(self.in_flight) + self.checking
+        text = f"Pending: {pending}    Flushed: {self.flushed_count}"
+        if self.rejected:
+            text += f"    Rejected: {len(self.rejected)}"
+        if self.flushed_count and self.first_queued_at is not None:
+            elapsed = max(time.perf_counter() - self.first_queued_at, 1e-9)
+            text += f"    {self.flushed_count / elapsed:.2f} sales/sec"
+        if self.flush_count:
+            text += (f"    {self.flush_count} commits, "
+                     f"avg {self.commit_seconds / self.flush_count * 1000:.1f} ms/commit, "
+                     f"{self.flushed_count / self.flush_count:.1f} sales/commit")
+        self.status_label.setText(text)
+
+    def export_sales(self, sales):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Unsaved Sales", "unsaved_sales.csv",
+                                              "CSV Files (*.csv)")
+        if not path:
+            return False
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as export_file:
+                writer = csv.writer(export_file)
+                writer.writerow(SALE_COLUMNS + ["Reason"])
+                for values, reason in sales:
+                    writer.writerow(list(values) + [reason])
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not export sales: {e}")
+            return False
+        return True
+
+    def confirm_unsaved(self, sales):
+        """Let the cashier export or discard sales that were not saved; False keeps the dialog open."""
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Warning)
+        box.setWindowTitle("Unsaved Sales")
+        box.setText(f"{len(sales)} sale(s) could not be saved.")
+        box.setInformativeText("Export them to a CSV file to enter later, or discard them.")
+        export_btn = box.addButton("Export...", QMessageBox.AcceptRole)
+        discard_btn = box.addButton("Discard", QMessageBox.DestructiveRole)
+        box.addButton(QMessageBox.Cancel)
+        box.exec_()
+        if box.clickedButton() is export_btn:
+            return self.export_sales(sales)
+        return box.clickedButton() is discard_btn
+
+    def closeEvent(self, event):
+        if self.flush_job is not None or self.checking:
+            # Let the sales being checked or committed land first; their callbacks close the dialog
+            self.close_when_flushed = True
+            self.message_label.setText("Waiting for the last sales to commit...")
+            event.ignore()
+            return
+        if self.pending and self.flush_error is None:
+            # Don't lose queued sales when the cashier closes the window
+            self.close_when_flushed = True
+            self.message_label.setText("Waiting for the last sales to commit...")
+            self.flush()
+            event.ignore()
+            return
+        self.close_when_flushed = False
+        # Whatever is left the server refused, or could not be reached for
+        unsaved = list(self.rejected)
+        unsaved += [(values, f"Not saved: {self.flush_error}") for _, values in self.pending]
+        if unsaved and not self.confirm_unsaved(unsaved):
+            event.ignore()
+            return
+        self.flush_timer.stop()
+        super().closeEvent(event)
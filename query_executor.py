@@ -0,0 +1,113 @@
+import itertools
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class _QueryJob(QRunnable):
+    def __init__(self, executor, job_id, func, args, kwargs):
+        super().__init__()
+        self.executor = executor
+        self.job_id = job_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.running = False
+        self.cancelled = False
+
+    def run(self):
+        with self.executor._lock:
+            if self.cancelled:
+                return
+            self.running = True
+        try:
+            # Connections borrowed from here on are recorded against this job,
+            # not the worker thread, which may have moved on by the time a
+            # cancel arrives
+            with self.executor.db_connection.job(self):
+                result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelled:
+                self.executor.failed.emit(self.job_id, str(e))
+        else:
+            if not self.cancelled:
+                self.executor.finished.emit(self.job_id, result)
+        finally:
+            self.running = False
+            self.executor._job_done(self.job_id)
+
+
+class QueryExecutor(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, db_connection, max_threads=None, parent=None):
+        super().__init__(parent)
+        self.db_connection = db_connection
+        self.thread_pool = QThreadPool(self)
+        if max_threads is None:
+            # No point running more queries at once than the pool has connections
+            max_threads = getattr(db_connection, "max_pool_size", 4)
+        self.thread_pool.setMaxThreadCount(max(max_threads, 1))
+
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._callbacks = {}
+        self._lock = threading.Lock()
+
+        self.finished.connect(self._on_finished)
+        self.failed.connect(self._on_failed)
+
+    def submit(self, func, *args, on_result=None, on_error=None, **kwargs):
+        job_id = next(self._ids)
+        job = _QueryJob(self, job_id, func, args, kwargs)
+        job.setAutoDelete(False)
+        with self._lock:
+            self._jobs[job_id] = job
+        self._callbacks[job_id] = (on_result, on_error)
+        self.thread_pool.start(job)
+        return job_id
+
+    def is_pending(self, job_id):
+        with self._lock:
+            return job_id in self._jobs
+
+    def cancel(self, job_id):
+        if job_id is None:
+            return
+        self._callbacks.pop(job_id, None)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.cancelled = True
+            running = job.running
+        if not running:
+            # Not started yet; run() will return immediately if it still gets picked up
+            if self.thread_pool.tryTake(job):
+                self._job_done(job_id)
+            return
+        # Already running on the server: interrupt the statement, not the connection
+        self.db_connection.kill_queries(job)
+
+    def cancel_all(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        for job_id in job_ids:
+            self.cancel(job_id)
+
+    def _job_done(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    @pyqtSlot(int, object)
+    def _on_finished(self, job_id, result):
+        on_result, _ = self._callbacks.pop(job_id, (None, None))
+        if on_result is not None:
+            on_result(result)
+
+    @pyqtSlot(int, str)
+    def _on_failed(self, job_id, message):
+        _, on_error = self._callbacks.pop(job_id, (None, None))
+        if on_error is not None:
+            on_error(message)
@@ -0,0 +1,264 @@
+# Per-statement instrumentation for every pooled connection. ConnectionPool
+# wraps each connection in InstrumentedConnection, so every cursor any
+# DatabaseConnection method (or anything else borrowing from the pool)
+# opens is timed without the call sites changing.
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+DEFAULT_SLOW_QUERY_LOG = os.environ.get(
+    "FARMER_SLOW_QUERY_LOG",
+    os.path.join(os.path.expanduser("~"), ".farmer_inventory", "slow_queries.log")
+)
+DEFAULT_SLOW_QUERY_THRESHOLD = 0.2  # seconds
+RING_BUFFER_SIZE = 2000
+SAMPLES_PER_STATEMENT = 1024
+SLOW_LOG_MAX_BYTES = 1024 * 1024
+SLOW_LOG_BACKUPS = 3
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def statement_shape(sql):
+    """SQL with literals and placeholders folded to ?, so calls that differ only in values group together."""
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = shape.replace("%s", "?")
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def params_hash(params):
+    if params is None:
+        return ""
+    return hashlib.sha1(repr(params).encode("utf-8", "replace")).hexdigest()[:12]
+
+
+def _row_bytes(row):
+    # Approximate wire size: text/binary by length, everything else as 8 bytes
+    if isinstance(row, dict):
+        row = row.values()
+    size = 0
+    for value in row:
+        if value is None:
+            continue
+        if isinstance(value, (str, bytes, bytearray)):
+            size += len(value)
+        else:
+            size += 8
+    return size
+
+
+def _percentile(ordered, fraction):
+    # Nearest-rank percentile of an already sorted list
+    if not ordered:
+        return 0.0
+    index = min(len(ordered), max(1, math.ceil(fraction * len(ordered))))
+    return ordered[index - 1]
+
+
+class QueryStats:
+    def __init__(self, buffer_size=RING_BUFFER_SIZE, slow_threshold=DEFAULT_SLOW_QUERY_THRESHOLD,
+                 slow_log_path=DEFAULT_SLOW_QUERY_LOG):
+        self.slow_threshold = slow_threshold
+        self.slow_log_path = slow_log_path
+        self._recent = deque(maxlen=buffer_size)
+        self._statements = {}  # shape -> {"latencies": deque, "calls", "rows", "bytes", "total"}
+        # Re-entrant: a cursor dropped by the garbage collector records from __del__
+        self._lock = threading.RLock()
+        self._slow_log = None
+
+    def record(self, sql, params, seconds, rows, bytes_fetched):
+        shape = statement_shape(sql)
+        entry = {
+            "at": time.time(),
+            "shape": shape,
+            "params_hash": params_hash(params),
+            "seconds": seconds,
+            "rows": rows,
+            "bytes": bytes_fetched,
+        }
+        with self._lock:
+            self._recent.append(entry)
+            statement = self._statements.get(shape)
+            if statement is None:
+                statement = {"latencies": deque(maxlen=SAMPLES_PER_STATEMENT), "calls": 0, "rows": 0,
+                             "bytes": 0, "total": 0.0}
+                self._statements[shape] = statement
+            statement["latencies"].append(seconds)
+            statement["calls"] += 1
+            statement["rows"] += rows
+            statement["bytes"] += bytes_fetched
+            statement["total"] += seconds
+        if self.slow_threshold is not None and seconds >= self.slow_threshold:
+            self._log_slow(entry)
+
+    def _log_slow(self, entry):
+        if self._slow_log is None:
+            with self._lock:
+                if self._slow_log is None:
+                    self._slow_log = self._open_slow_log()
+        self._slow_log.warning("%.1f ms rows=%d bytes=%d params=%s %s", entry["seconds"] * 1000,
+                               entry["rows"], entry["bytes"], entry["params_hash"] or "-", entry["shape"])
+
+    def _open_slow_log(self):
+        logger = logging.getLogger(f"farmer.slow_queries.{id(self)}")
+        logger.propagate = False
+        logger.setLevel(logging.WARNING)
+        try:
+            os.makedirs(os.path.dirname(self.slow_log_path) or ".", exist_ok=True)
+            handler = RotatingFileHandler(self.slow_log_path, maxBytes=SLOW_LOG_MAX_BYTES,
+                                          backupCount=SLOW_LOG_BACKUPS, encoding="utf-8")
+        except OSError as e:
+            print(f"Error opening slow query log: {e}")
+            handler = logging.NullHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+        logger.addHandler(handler)
+        return logger
+
+    def recent(self, limit=None):
+        with self._lock:
+            entries = list(self._recent)
+        return entries[-limit:] if limit else entries
+
+    def summary(self):
+        """Per statement shape: calls, p50/p95/p99/max latency (seconds), rows and bytes; slowest total first."""
+        with self._lock:
+            snapshot = [(shape, sorted(statement["latencies"]), statement["calls"], statement["rows"],
+                         statement["bytes"], statement["total"])
+                        for shape, statement in self._statements.items()]
+        summary = []
+        for shape, ordered, calls, rows, bytes_fetched, total in snapshot:
+            summary.append({
+                "shape": shape,
+                "calls": calls,
+                "p50": _percentile(ordered, 0.50),
+                "p95": _percentile(ordered, 0.95),
+                "p99": _percentile(ordered, 0.99),
+                "max": ordered[-1] if ordered else 0.0,
+                "total": total,
+                "rows": rows,
+                "bytes": bytes_fetched,
+            })
+        summary.sort(key=lambda statement: statement["total"], reverse=True)
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._statements.clear()
+
+    def close(self):
+        if self._slow_log is not None:
+            for handler in list(self._slow_log.handlers):
+                handler.close()
+                self._slow_log.removeHandler(handler)
+            self._slow_log = None
+
+
+class InstrumentedCursor:
+    """Times execute plus every fetch until the result is drained, then records one entry."""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._pending = None  # [sql, params, seconds, rows, bytes] for the statement being read
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        row = self.fetchone()
+        while row is not None:
+            yield row
+            row = self.fetchone()
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self._stats.record(*pending)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            result = self._cursor.execute(operation, params, *args, **kwargs)
+        except Exception:
+            self._stats.record(operation, params, time.perf_counter() - started, 0, 0)
+            raise
+        self._pending = [operation, params, time.perf_counter() - started, 0, 0]
+        if not getattr(self._cursor, "with_rows", False):
+            self._finish()
+        return result
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            # A batch is logged as one entry; hashing every row's values would cost more than the insert
+            self._stats.record(operation, None, time.perf_counter() - started, 0, 0)
+
+    def _fetched(self, started, rows, done):
+        if self._pending is None:
+            return
+        self._pending[2] += time.perf_counter() - started
+        self._pending[3] += len(rows)
+        self._pending[4] += sum(_row_bytes(row) for row in rows)
+        if done:
+            self._finish()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(started, [] if row is None else [row], row is None)
+        return row
+
+    def fetchmany(self, size=1):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        self._fetched(started, rows, len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(started, rows, True)
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __del__(self):
+        # Cursors that are read with a single fetchone and never closed
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class InstrumentedConnection:
+    """Hands out InstrumentedCursors; everything else goes straight to the real connection."""
+
+    def __init__(self, connection, stats):
+        self._connection = connection
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._stats)
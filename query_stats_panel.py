@@ -0,0 +1,121 @@
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (QDialog, QHBoxLayout, QHeaderView, QLabel, QPushButton, QTableWidget,
+                             QTableWidgetItem, QVBoxLayout, QWidget)
+
+REFRESH_INTERVAL_MS = 2000
+STATS_COLUMNS = ("Statement", "Calls", "p50 ms", "p95 ms", "p99 ms", "Max ms", "Total ms", "Rows", "KB Fetched")
+
+
+class QueryStatsPanel(QDialog):
+    """Live p50/p95/p99 latency per statement shape, refreshed while the dialog is open."""
+
+    def __init__(self, db_connection, parent=None):
+        super().__init__(parent)
+        self.db_connection = db_connection
+        self.stats = db_connection.query_stats
+        self.setWindowTitle("Query Stats")
+        self.setGeometry(100, 100, 1400, 600)
+        self.setStyleSheet("background-color: #1e1e1e;")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("color: #d4d4d4; font-size: 13px;")
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(STATS_COLUMNS))
+        self.table.setHorizontalHeaderLabels(list(STATS_COLUMNS))
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setStyleSheet("""
+            QTableWidget {
+                background-color: #2d2d2d;
+                color: white;
+                gridline-color: #3d3d3d;
+                border: none;
+            }
+            QTableWidget QHeaderView::section {
+                background-color: #252525;
+                color: white;
+                padding: 8px;
+                border: None;
+                font-weight: bold;
+            }
+        """)
+        layout.addWidget(self.table)
+
+        buttons = QWidget()
+        buttons_layout = QHBoxLayout(buttons)
+        buttons_layout.setContentsMargins(0, 0, 0, 0)
+        self.slow_log_label = QLabel(f"Slow queries (≥ {self.stats.slow_threshold * 1000:.0f} ms) "
+                                     f"are logged to {self.stats.slow_log_path}"
+                                     if self.stats.slow_threshold is not None else "Slow query log disabled")
+        self.slow_log_label.setStyleSheet("color: #888888; font-size: 12px;")
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        buttons.setStyleSheet("""
+            QPushButton {
+                background-color: #2d2d2d;
+                color: white;
+                border: 2px solid #3EB489;
+                padding: 4px 10px;
+                border-radius: 5px;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background-color: #3EB489;
+                color: #1e1e1e;
+            }
+        """)
+        buttons_layout.addWidget(self.slow_log_label)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(reset_btn)
+        layout.addWidget(buttons)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+        self.refresh()
+
+    def refresh(self):
+        summary = self.stats.summary()
+        self.table.setRowCount(len(summary))
+        for i, statement in enumerate(summary):
+            values = (
+                statement["shape"],
+                f"{statement['calls']:,}",
+                f"{statement['p50'] * 1000:.1f}",
+                f"{statement['p95'] * 1000:.1f}",
+                f"{statement['p99'] * 1000:.1f}",
+                f"{statement['max'] * 1000:.1f}",
+                f"{statement['total'] * 1000:,.0f}",
+                f"{statement['rows']:,}",
+                f"{statement['bytes'] / 1024:,.1f}",
+            )
+            for j, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+                item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter if j == 0 else Qt.AlignRight | Qt.AlignVCenter)
+                if j == 0:
+                    item.setToolTip(value)
+                self.table.setItem(i, j, item)
+
+        calls = sum(statement["calls"] for statement in summary)
+        total = sum(statement["total"] for statement in summary)
+        text = f"{calls:,} statements, {len(summary)} distinct, {total:,.2f}s in the database"
+        round_trips = self.db_connection.round_trip_stats()
+        text += (f" · USE sent {round_trips['use_statements_sent']}, saved {round_trips['round_trips_saved']}"
+                 f" · prepared {round_trips['prepared_hits']} hits / {round_trips['prepared_misses']} misses")
+        self.summary_label.setText(text)
+
+    def reset(self):
+        self.stats.reset()
+        self.refresh()
+
+    def closeEvent(self, event):
+        self.refresh_timer.stop()
+        super().closeEvent(event)
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReferenceCache:
+    """In-process LRU cache with a TTL for rarely-changing reference rows.
+
+    Entries are keyed by (database, table, row id). Writers invalidate what
+    they touch; the TTL only bounds staleness from writes made by other clients.
+    """
+
+    def __init__(self, max_entries=2048, ttl=300):
+        self.max_entries = max(max_entries, 1)
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (row, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, database, table, row_id):
+        """Return (found, row); row may be None for an id that does not exist."""
+        key = (database, table, row_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                row, expires_at = entry
+                if self.ttl is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, row
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, database, table, row_id, row):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[(database, table, row_id)] = (row, expires_at)
+            self._entries.move_to_end((database, table, row_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, database, table, row_id=None):
+        with self._lock:
+            if row_id is not None:
+                self._entries.pop((database, table, row_id), None)
+                return
+            for key in [key for key in self._entries if key[0] == database and key[1] == table]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,72 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def data_hash(rows):
+    """Digest of a result set; any changed value gives a different render key."""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update(repr(row).encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Rendered chart pixels, least recently used evicted first once over a byte budget.
+
+    Entries are keyed by (chart, query, data hash). Only the latest render
+    of each is kept, together with the canvas size it was drawn at; a render
+    at any other size is a miss, so resizing a window never piles up copies
+    of the same chart.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max(max_bytes, 0)
+        self._entries = OrderedDict()  # key -> (size, render, nbytes)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, size):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != size:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, size, render, nbytes):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[2]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (size, render, nbytes)
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes:
+                _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,127 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+REFRESH_INTERVAL_MS = 250
+RELOAD_INTERVAL_MS = 60000
+ALERT_COLUMNS = ("Inventory ID", "Product ID", "Product", "Vendor ID", "In Stock", "Restock Threshold")
+
+
+def needs_restock(quantity, threshold):
+    # Same rule as the Inventory.NeedsRestock generated column
+    return quantity is not None and threshold is not None and quantity <= threshold
+
+
+class RestockMonitor(QObject):
+    """Keeps the set of Inventory rows at or below their restock threshold.
+
+    The full set is read once through the NeedsRestock index. After that,
+    every stock write DatabaseConnection commits reports the rows it touched,
+    and only those rows are re-read, a few point lookups per refresh however
+    large Inventory grows. Changes made by other terminals are picked up by
+    an occasional reload, which also reads the index and never scans.
+    """
+
+    alerts_changed = pyqtSignal(int)
+    _changed = pyqtSignal(object, object, bool)
+
+    def __init__(self, db_connection, database, query_executor, parent=None):
+        super().__init__(parent)
+        self.db_connection = db_connection
+        self.database = database
+        self.query_executor = query_executor
+        self.alerts = {}  # InventoryID -> (InventoryID, ProductID, Name, VendorID, QuantityInStock, RestockThreshold)
+        self._inventory_ids = set()
+        self._product_vendors = set()
+        self._reload = False
+        self._job = None
+
+        # Bursts of writes (a POS batch, an import) are coalesced into one refresh
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self._refresh_timer.timeout.connect(self._refresh)
+
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setInterval(RELOAD_INTERVAL_MS)
+        self._reload_timer.timeout.connect(self.reload)
+        self._reload_timer.start()
+
+        # Writes can come from worker threads; the signal queues them onto this one
+        self._changed.connect(self._mark_changed)
+        self._listener = self._changed.emit
+        db_connection.add_inventory_listener(self._listener)
+        self.reload()
+
+    def rows(self):
+        """Current alerts, furthest below threshold first."""
+        return sorted(self.alerts.values(), key=lambda row: row[4] - row[5])
+
+    def reload(self):
+        self._reload = True
+        self._schedule()
+
+    def stop(self):
+        self.db_connection.remove_inventory_listener(self._listener)
+        self._refresh_timer.stop()
+        self._reload_timer.stop()
+        self.query_executor.cancel(self._job)
+
+    def _mark_changed(self, inventory_ids, product_vendors, reload):
+        self._inventory_ids.update(inventory_ids)
+        self._product_vendors.update(product_vendors)
+        self._reload = self._reload or reload
+        self._schedule()
+
+    def _schedule(self):
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+    def _refresh(self):
+        if self._job is not None and self.query_executor.is_pending(self._job):
+            # One refresh at a time; changes that arrive meanwhile go in the next one
+            self._refresh_timer.start()
+            return
+        if self._reload:
+            self._reload = False
+            self._inventory_ids.clear()
+            self._product_vendors.clear()
+            self._job = self.query_executor.submit(
+                self.db_connection.get_restock_alerts, self.database,
+                on_result=self._replace,
+                on_error=self._refresh_failed
+            )
+            return
+        if not self._inventory_ids and not self._product_vendors:
+            return
+        inventory_ids = tuple(self._inventory_ids)
+        product_vendors = tuple(self._product_vendors)
+        self._inventory_ids.clear()
+        self._product_vendors.clear()
+        self._job = self.query_executor.submit(
+            self.db_connection.get_inventory_levels, self.database, inventory_ids, product_vendors,
+            on_result=lambda rows: self._merge(inventory_ids, product_vendors, rows),
+            on_error=self._refresh_failed
+        )
+
+    def _replace(self, rows):
+        self.alerts = {row[0]: tuple(row) for row in rows}
+        self.alerts_changed.emit(len(self.alerts))
+
+    def _merge(self, inventory_ids, product_vendors, rows):
+        seen = set()
+        for row in rows:
+            seen.add(row[0])
+            if needs_restock(row[4], row[5]):
+                self.alerts[row[0]] = tuple(row)
+            else:
+                self.alerts.pop(row[0], None)
+        # Rows that were asked for but not returned have been deleted
+        product_vendors = set(product_vendors)
+        for inventory_id, alert in list(self.alerts.items()):
+            if inventory_id in seen:
+                continue
+            if inventory_id in inventory_ids or (alert[1], alert[3]) in product_vendors:
+                del self.alerts[inventory_id]
+        self.alerts_changed.emit(len(self.alerts))
+
+    def _refresh_failed(self, message):
+        print(f"Error refreshing restock alerts: {message}")
@@ -0,0 +1,103 @@
+# Builds the grouped query behind DatabaseConnection.get_sales_timeseries.
+# The date range is applied to the raw SaleDate column so MySQL reads only
+# that range of idx_sale_date (or of idx_sale_product_date /
+# idx_sale_vendor_date when a product or vendor is given), and the bucket is
+# computed from SaleDate in the same single GROUP BY.
+from datetime import date, timedelta
+
+DAILY = "daily"
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+SEASONAL = "seasonal"
+
+BUCKETS = (DAILY, WEEKLY, MONTHLY, SEASONAL)
+
+# Each bucket is labelled by the date it starts on: weeks start on Monday,
+# seasons on the first of March, June, September and December
+MYSQL_BUCKETS = {
+    DAILY: "SaleDate",
+    WEEKLY: "DATE_SUB(SaleDate, INTERVAL WEEKDAY(SaleDate) DAY)",
+    MONTHLY: "DATE_SUB(SaleDate, INTERVAL DAYOFMONTH(SaleDate) - 1 DAY)",
+    SEASONAL: "DATE_SUB(DATE_SUB(SaleDate, INTERVAL DAYOFMONTH(SaleDate) - 1 DAY), INTERVAL MOD(MONTH(SaleDate), 3) MONTH)",
+}
+
+# The same buckets for the offline replica
+SQLITE_BUCKETS = {
+    DAILY: "date(SaleDate)",
+    WEEKLY: "date(SaleDate, '-' || ((CAST(strftime('%w', SaleDate) AS INTEGER) + 6) % 7) || ' days')",
+    MONTHLY: "date(SaleDate, 'start of month')",
+    SEASONAL: "date(SaleDate, 'start of month', '-' || (CAST(strftime('%m', SaleDate) AS INTEGER) % 3) || ' months')",
+}
+
+SEASON_NAMES = {12: "Winter", 3: "Spring", 6: "Summer", 9: "Autumn"}
+
+TIMESERIES_COLUMNS = ("Period", "Units Sold", "Revenue", "Sales")
+
+ALL_TIME = "All time"
+CUSTOM_RANGE = "Custom"
+RANGE_PRESETS = (ALL_TIME, "Last 7 days", "Last 30 days", "Last 90 days", "This year", "Last 12 months", CUSTOM_RANGE)
+
+
+def timeseries_query(bucket, start=None, end=None, product_id=None, vendor_id=None, buckets=MYSQL_BUCKETS):
+    """Return (sql, params) for units, revenue and sale count per bucket over [start, end]."""
+    if bucket not in buckets:
+        raise ValueError(f"Unknown bucket '{bucket}' (expected one of {', '.join(BUCKETS)}).")
+    if start is not None and end is not None and start > end:
+        raise ValueError("The start of the date range is after its end.")
+    # SaleDate is nullable (bulk import writes blank dates as NULL); such
+    # sales belong to no period
+    conditions = ["SaleDate IS NOT NULL"]
+    params = []
+    if product_id is not None:
+        conditions.append("ProductID = %s")
+        params.append(product_id)
+    if vendor_id is not None:
+        conditions.append("VendorID = %s")
+        params.append(vendor_id)
+    if start is not None:
+        conditions.append("SaleDate >= %s")
+        params.append(start)
+    if end is not None:
+        conditions.append("SaleDate <= %s")
+        params.append(end)
+    where = f"WHERE {' AND '.join(conditions)} "
+    sql = (
+        f"SELECT {buckets[bucket]} AS Period, COALESCE(SUM(QuantitySold), 0) AS UnitsSold, "
+        f"COALESCE(SUM(TotalPrice), 0) AS Revenue, COUNT(*) AS Sales "
+        f"FROM Sale {where}"
+        f"GROUP BY Period ORDER BY Period"
+    )
+    return sql, params
+
+
+def period_label(bucket, period):
+    """Human-readable name for a bucket's start date."""
+    if not isinstance(period, date):
+        period = date.fromisoformat(str(period)[:10])
+    if bucket == WEEKLY:
+        year, week, _ = period.isocalendar()
+        return f"{year}-W{week:02d}"
+    if bucket == MONTHLY:
+        return period.strftime("%Y-%m")
+    if bucket == SEASONAL:
+        name = SEASON_NAMES.get(period.month, period.strftime("%b"))
+        if period.month == 12:
+            return f"{name} {period.year}/{(period.year + 1) % 100:02d}"
+        return f"{name} {period.year}"
+    return period.isoformat()
+
+
+def preset_range(preset, today=None):
+    """(start, end) for the range picker's presets; None means unbounded."""
+    today = today or date.today()
+    if preset == "Last 7 days":
+        return today - timedelta(days=6), today
+    if preset == "Last 30 days":
+        return today - timedelta(days=29), today
+    if preset == "Last 90 days":
+        return today - timedelta(days=89), today
+    if preset == "This year":
+        return date(today.year, 1, 1), today
+    if preset == "Last 12 months":
+        return today - timedelta(days=364), today
+    return None, None
@@ -0,0 +1,80 @@
+import builtins
+import os
+import sys
+import time
+
+
+class StartupReport:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.marks = []
+        self.imports = []  # (depth, module, self seconds, cumulative seconds), children first
+        self._child_time = []
+        self._original_import = None
+
+    @classmethod
+    def from_argv(cls, argv):
+        enabled = "--startup-report" in argv or os.environ.get("FARMER_STARTUP_REPORT") == "1"
+        report = cls(enabled)
+        if enabled:
+            if "--startup-report" in argv:
+                argv.remove("--startup-report")
+            report.install_import_hook()
+        return report
+
+    def install_import_hook(self):
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Only first-time imports cost anything worth reporting
+        if level != 0 or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._child_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._child_time.pop()
+            if self._child_time:
+                self._child_time[-1] += elapsed
+            self.imports.append((len(self._child_time), name, elapsed - children, elapsed))
+
+    def mark(self, label):
+        if self.enabled:
+            self.marks.append((label, time.perf_counter() - self.started))
+
+    def format(self):
+        lines = ["import time:   self [us] | cumulative | imported package"]
+        for depth, name, self_time, cumulative in self.imports:
+            lines.append(f"import time: {self_time * 1e6:11.0f} | {cumulative * 1e6:10.0f} | {'  ' * depth}{name}")
+
+        lines.append("")
+        lines.append("startup phases (seconds since launch):")
+        for label, elapsed in self.marks:
+            lines.append(f"  {elapsed:8.3f}  {label}")
+
+        slowest = sorted((entry for entry in self.imports if entry[0] == 0), key=lambda entry: -entry[3])[:10]
+        if slowest:
+            lines.append("")
+            lines.append("slowest top-level imports:")
+            for _, name, _, cumulative in slowest:
+                lines.append(f"  {cumulative:8.3f}  {name}")
+        return "\n".join(lines)
+
+    def finish(self, label):
+        if not self.enabled:
+            return
+        self.mark(label)
+        self.uninstall_import_hook()
+        print(self.format(), file=sys.stderr)
@@ -0,0 +1,58 @@
+from collections import OrderedDict
+
+from mysql.connector import Error
+
+
+class StatementCache:
+    """Server-side prepared statements for one connection, least recently used evicted first.
+
+    Statements are keyed by (schema, sql) because table names are resolved
+    against the schema that was current when the statement was prepared.
+    """
+
+    def __init__(self, connection, max_size=64):
+        self.connection = connection
+        self.max_size = max(max_size, 1)
+        self._statements = OrderedDict()  # (schema, sql) -> (prepared cursor, sql)
+
+    def __len__(self):
+        return len(self._statements)
+
+    def cursor(self, schema, sql):
+        """Return (cursor, sql, hit, evicted) for the statement.
+
+        Execute with the returned sql: the prepared cursor only skips
+        re-preparing when it is handed the exact string it prepared.
+        """
+        key = (schema, sql)
+        entry = self._statements.get(key)
+        if entry is not None:
+            self._statements.move_to_end(key)
+            return entry[0], entry[1], True, 0
+
+        cursor = self.connection.cursor(prepared=True)
+        self._statements[key] = (cursor, sql)
+        evicted = 0
+        while len(self._statements) > self.max_size:
+            _, (old_cursor, _) = self._statements.popitem(last=False)
+            self._close(old_cursor)
+            evicted += 1
+        return cursor, sql, False, evicted
+
+    def discard(self, schema, sql):
+        # Called when a statement fails, e.g. its table was dropped
+        entry = self._statements.pop((schema, sql), None)
+        if entry is not None:
+            self._close(entry[0])
+
+    def clear(self):
+        for cursor, _ in self._statements.values():
+            self._close(cursor)
+        self._statements.clear()
+
+    def _close(self, cursor):
+        # Closing the cursor deallocates the statement on the server
+        try:
+            cursor.close()
+        except Error:
+            pass
@@ -0,0 +1,218 @@
+from mysql.connector import Error
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (QComboBox, QHBoxLayout, QHeaderView, QLabel, QLineEdit, QPushButton, QTableView,
+                             QVBoxLayout, QWidget)
+
+from table_filter import OPERATORS, TWO_VALUE_OPERATORS, compile_filters, describe_filters
+
+PAGE_SIZES = (100, 200, 500, 1000, 5000)
+FILTER_DEBOUNCE_MS = 300
+
+
+class TableBrowser(QWidget):
+    def __init__(self, model, query_executor=None, parent=None):
+        super().__init__(parent)
+        self.model = model
+        # Filters are read off the GUI thread when an executor is given
+        self.query_executor = query_executor
+        self.filter_job = None
+        self.requested_filter = (model.where, model.where_params)
+        # Don't deliver a filter result to a browser that has been replaced
+        self.destroyed.connect(lambda *args: self.cancel_filter())
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(5)
+
+        # Paging controls
+        controls = QWidget()
+        controls_layout = QHBoxLayout(controls)
+        controls_layout.setContentsMargins(0, 0, 0, 0)
+
+        page_size_label = QLabel("Rows per page:")
+        page_size_label.setStyleSheet("color: #d4d4d4; font-size: 13px; border: none;")
+        self.page_size_combo = QComboBox()
+        self.page_size_combo.addItems([str(size) for size in PAGE_SIZES])
+        if model.chunk_size in PAGE_SIZES:
+            self.page_size_combo.setCurrentIndex(PAGE_SIZES.index(model.chunk_size))
+        self.page_size_combo.currentTextChanged.connect(lambda text: self.model.set_chunk_size(int(text)))
+
+        self.first_btn = QPushButton("⏮ First")
+        self.end_btn = QPushButton("Jump to End ⏭")
+        self.first_btn.clicked.connect(self.model.go_to_start)
+        self.end_btn.clicked.connect(self.jump_to_end)
+        # Seeking needs a primary key; other tables page by OFFSET from the top
+        self.end_btn.setEnabled(model.supports_keyset())
+
+        controls.setStyleSheet("""
+            QPushButton, QComboBox {
+                background-color: #2d2d2d;
+                color: white;
+                border: 2px solid #3EB489;
+                padding: 4px 10px;
+                border-radius: 5px;
+                font-size: 13px;
+            }
+            QPushButton:hover {
+                background-color: #3EB489;
+                color: #1e1e1e;
+            }
+            QPushButton:disabled {
+                border: 2px solid #666666;
+                color: #666666;
+            }
+        """)
+
+        controls_layout.addWidget(page_size_label)
+        controls_layout.addWidget(self.page_size_combo)
+        controls_layout.addStretch()
+        controls_layout.addWidget(self.first_btn)
+        controls_layout.addWidget(self.end_btn)
+        layout.addWidget(controls)
+
+        # Filter bar; filters are kept per column and combined with AND
+        self.filters = {}
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filters)
+
+        filter_bar = QWidget()
+        filter_layout = QHBoxLayout(filter_bar)
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+
+        filter_label = QLabel("Filter:")
+        filter_label.setStyleSheet("color: #d4d4d4; font-size: 13px; border: none;")
+        self.filter_column_combo = QComboBox()
+        self.filter_column_combo.addItems(model.column_names())
+        self.filter_operator_combo = QComboBox()
+        self.filter_operator_combo.addItems(OPERATORS)
+        self.filter_value_input = QLineEdit()
+        self.filter_value_input.setPlaceholderText("Value")
+        self.filter_value2_input = QLineEdit()
+        self.filter_value2_input.setPlaceholderText("To")
+        self.filter_value2_input.setVisible(False)
+        self.clear_filters_btn = QPushButton("Clear Filters")
+
+        self.filter_column_combo.currentTextChanged.connect(self.show_column_filter)
+        self.filter_operator_combo.currentTextChanged.connect(self.filter_edited)
+        self.filter_value_input.textChanged.connect(self.filter_edited)
+        self.filter_value2_input.textChanged.connect(self.filter_edited)
+        self.filter_value_input.returnPressed.connect(self.apply_filters)
+        self.filter_value2_input.returnPressed.connect(self.apply_filters)
+        self.clear_filters_btn.clicked.connect(self.clear_filters)
+
+        filter_bar.setStyleSheet(controls.styleSheet() + """
+            QLineEdit {
+                background-color: #2d2d2d;
+                color: white;
+                border: 1px solid #3d3d3d;
+                padding: 4px;
+                border-radius: 5px;
+                font-size: 13px;
+            }
+        """)
+
+        filter_layout.addWidget(filter_label)
+        filter_layout.addWidget(self.filter_column_combo)
+        filter_layout.addWidget(self.filter_operator_combo)
+        filter_layout.addWidget(self.filter_value_input)
+        filter_layout.addWidget(self.filter_value2_input)
+        filter_layout.addWidget(self.clear_filters_btn)
+        layout.addWidget(filter_bar)
+
+        # Match count and query time, to spot filters that need an index
+        self.filter_status = QLabel("")
+        self.filter_status.setStyleSheet("color: #888888; font-size: 12px; border: none;")
+        layout.addWidget(self.filter_status)
+
+        # Table view; header clicks sort on the server
+        self.table_view = QTableView()
+        self.table_view.setModel(model)
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Stretch)
+        header.setSortIndicator(-1, Qt.AscendingOrder)
+        self.table_view.setSortingEnabled(model.supports_keyset())
+        self.table_view.verticalHeader().setVisible(False)
+        layout.addWidget(self.table_view)
+
+    def show_column_filter(self, column):
+        operator, value, value2 = self.filters.get(column, (OPERATORS[0], "", ""))
+        for widget in (self.filter_operator_combo, self.filter_value_input, self.filter_value2_input):
+            widget.blockSignals(True)
+        self.filter_operator_combo.setCurrentText(operator)
+        self.filter_value_input.setText(value)
+        self.filter_value2_input.setText(value2)
+        for widget in (self.filter_operator_combo, self.filter_value_input, self.filter_value2_input):
+            widget.blockSignals(False)
+        self.filter_value2_input.setVisible(operator in TWO_VALUE_OPERATORS)
+
+    def filter_edited(self, *args):
+        operator = self.filter_operator_combo.currentText()
+        self.filter_value2_input.setVisible(operator in TWO_VALUE_OPERATORS)
+        if operator in TWO_VALUE_OPERATORS:
+            self.filter_value_input.setPlaceholderText("From")
+        else:
+            self.filter_value_input.setPlaceholderText("Value")
+            self.filter_value2_input.clear()
+        column = self.filter_column_combo.currentText()
+        self.filters[column] = (operator, self.filter_value_input.text(), self.filter_value2_input.text())
+        # Wait for typing to pause before going to the server
+        self.filter_timer.start()
+
+    def apply_filters(self):
+        self.filter_timer.stop()
+        try:
+            where, params = compile_filters(self.filters)
+        except ValueError as e:
+            self.filter_status.setText(str(e))
+            return
+        if (where, params) == self.requested_filter:
+            return
+        self.requested_filter = (where, params)
+        if self.query_executor is None:
+            try:
+                result = self.model.fetch_filter(where, params)
+            except Error as e:
+                self.filter_failed(str(e))
+                return
+            self.show_filter(where, params, result)
+            return
+        # A newer filter makes the one still running irrelevant
+        self.query_executor.cancel(self.filter_job)
+        self.filter_status.setText("Filtering…")
+        self.filter_job = self.query_executor.submit(
+            self.model.fetch_filter, where, params,
+            on_result=lambda result, w=where, p=params: self.show_filter(w, p, result),
+            on_error=self.filter_failed
+        )
+
+    def show_filter(self, where, params, result):
+        self.filter_job = None
+        page, count, seconds = result
+        self.model.set_filter(where, params, page)
+        if where is None:
+            self.filter_status.setText("")
+            return
+        self.filter_status.setText(
+            f"{count:,} matching rows  ·  {seconds * 1000:.1f} ms  ·  {describe_filters(self.filters)}")
+
+    def filter_failed(self, message):
+        self.filter_job = None
+        # Let the same filter be retried
+        self.requested_filter = (self.model.where, self.model.where_params)
+        self.filter_status.setText(f"Filter failed: {message}")
+
+    def cancel_filter(self):
+        if self.query_executor is not None:
+            self.query_executor.cancel(self.filter_job)
+        self.filter_job = None
+
+    def clear_filters(self):
+        self.filters.clear()
+        self.show_column_filter(self.filter_column_combo.currentText())
+        self.apply_filters()
+
+    def jump_to_end(self):
+        self.model.jump_to_end()
+        self.table_view.scrollToBottom()
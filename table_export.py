@@ -0,0 +1,239 @@
+import argparse
+import csv
+import datetime
+import getpass
+import os
+import sys
+import time
+from decimal import Decimal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_EXPORT_CHUNK_SIZE = 50000
+EXPORT_FORMATS = ("csv", "parquet")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it can't be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def format_for_path(path):
+    return "parquet" if os.path.splitext(path)[1].lower() in (".parquet", ".pq") else "csv"
+
+
+def _arrow_type(column_type):
+    column_type = column_type.lower()
+    if column_type.startswith(("tinyint(1)", "bool")):
+        return pa.bool_()
+    if "int" in column_type:
+        return pa.int64()
+    if column_type.startswith(("decimal", "numeric")):
+        precision, _, scale = column_type[column_type.index("(") + 1:column_type.index(")")].partition(",")
+        return pa.decimal128(int(precision), int(scale or 0))
+    if column_type.startswith(("float", "double", "real")):
+        return pa.float64()
+    if column_type.startswith("date") and not column_type.startswith("datetime"):
+        return pa.date32()
+    if column_type.startswith(("datetime", "timestamp")):
+        return pa.timestamp("us")
+    if column_type.startswith(("blob", "binary", "varbinary", "longblob", "mediumblob")):
+        return pa.binary()
+    return pa.string()
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def _converter(arrow_type):
+    """Function turning one value into what pa.array accepts for arrow_type, or None.
+
+    MySQL returns ints for BOOLEAN columns, and rows from the offline replica
+    carry dates as ISO strings and decimals as floats or text.
+    """
+    if pa.types.is_boolean(arrow_type):
+        return bool
+    if pa.types.is_integer(arrow_type):
+        return int
+    if pa.types.is_date(arrow_type):
+        return _to_date
+    if pa.types.is_timestamp(arrow_type):
+        return (lambda value: value if isinstance(value, datetime.datetime)
+                else datetime.datetime.fromisoformat(str(value)))
+    if pa.types.is_decimal(arrow_type):
+        exponent = Decimal(1).scaleb(-arrow_type.scale)
+        return lambda value: Decimal(str(value)).quantize(exponent)
+    if pa.types.is_string(arrow_type):
+        return str
+    return None
+
+
+class _CsvWriter:
+    def __init__(self, path, column_names):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(column_names)
+
+    def write(self, rows):
+        self.writer.writerows(["" if value is None else value for value in row] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path, column_info, column_names=None):
+        # Schema comes from the table definition, so every chunk (one row
+        # group each) gets the same column types even if a chunk is all NULL.
+        # Generated columns are not in column_info and are left out.
+        self.schema = pa.schema([(name, _arrow_type(column_type)) for name, column_type, _ in column_info])
+        names = column_names or self.schema.names
+        self.order = [names.index(name) for name in self.schema.names]
+        self.converters = [_converter(field.type) for field in self.schema]
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        arrays = []
+        for field, index, convert in zip(self.schema, self.order, self.converters):
+            values = columns[index]
+            if convert is not None:
+                values = [None if value is None else convert(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class TableExporter:
+    def __init__(self, db_connection, database, table, chunk_size=DEFAULT_EXPORT_CHUNK_SIZE, progress_callback=None):
+        self.db_connection = db_connection
+        self.database = database
+        self.table = table
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def export(self, path, export_format=None):
+        export_format = export_format or format_for_path(path)
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        if export_format == "parquet" and pa is None:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow).")
+
+        column_info = self.db_connection.get_column_info(self.database, self.table)
+        exported = 0
+        started = time.perf_counter()
+        writer = None
+        chunks = self.db_connection.iter_table_chunks(self.database, self.table, self.chunk_size)
+        try:
+            # Only one chunk is alive at a time: it is written, then dropped
+            for description, rows in chunks:
+                if writer is None:
+                    if export_format == "parquet":
+                        writer = _ParquetWriter(path, column_info, [column[0] for column in description])
+                    else:
+                        writer = _CsvWriter(path, [column[0] for column in description])
+                writer.write(rows)
+                exported += len(rows)
+                if self.progress_callback:
+                    elapsed = max(time.perf_counter() - started, 1e-9)
+                    self.progress_callback(exported, exported / elapsed)
+                if self.cancelled:
+                    break
+        finally:
+            chunks.close()
+            if writer is not None:
+                writer.close()
+
+        if writer is None:
+            # Empty table: still produce a file with the header/schema
+            if export_format == "parquet":
+                _ParquetWriter(path, column_info).close()
+            else:
+                _CsvWriter(path, [column[0] for column in column_info]).close()
+
+        elapsed = time.perf_counter() - started
+        return {
+            "table": self.table,
+            "path": path,
+            "format": export_format,
+            "rows_exported": exported,
+            "seconds": elapsed,
+            "rows_per_sec": exported / elapsed if elapsed > 0 else 0.0,
+            "peak_rss_mb": peak_rss_mb(),
+            "cancelled": self.cancelled,
+        }
+
+
+def describe_result(result):
+    summary = (f"{result['rows_exported']:,} rows exported to {result['path']} in {result['seconds']:.1f}s "
+               f"({result['rows_per_sec']:,.0f} rows/sec)")
+    if result["peak_rss_mb"] is not None:
+        summary += f", peak RSS {result['peak_rss_mb']:.0f} MB"
+    if result["cancelled"]:
+        summary += "\nExport was cancelled; the file is incomplete."
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a table to CSV or Parquet without loading it into memory")
+    parser.add_argument("table")
+    parser.add_argument("output", help="output file; .parquet/.pq selects Parquet, anything else CSV")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="override the format chosen from the extension")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_EXPORT_CHUNK_SIZE)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password")
+    parser.add_argument("--database", default="farmer_schema")
+    args = parser.parse_args()
+
+    from app import DatabaseConnection
+
+    db_connection = DatabaseConnection()
+    password = args.password if args.password is not None else getpass.getpass()
+    if not db_connection.connect(args.host, args.user, password):
+        raise SystemExit(1)
+
+    last_report = [0.0]
+
+    def report(rows, rate):
+        now = time.perf_counter()
+        if now - last_report[0] >= 1:
+            last_report[0] = now
+            print(f"\r{rows:,} rows ({rate:,.0f} rows/sec)", end="", flush=True)
+
+    try:
+        exporter = TableExporter(db_connection, args.database, args.table, args.chunk_size, report)
+        result = exporter.export(args.output, args.format)
+    finally:
+        db_connection.close()
+    print()
+    print(describe_result(result))
+
+
+if __name__ == "__main__":
+    main()
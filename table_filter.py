@@ -0,0 +1,94 @@
+# Compiles the filter bar's per-column filters into a parameterized WHERE
+# clause. Values are always passed as parameters, never formatted into the SQL,
+# and each operator is written so MySQL can answer it from an index range.
+from datetime import date
+
+from keyset import quote_identifier
+
+EQUALS = "Equals"
+RANGE = "Between"
+PREFIX = "Starts with"
+DATE_RANGE = "Date range"
+
+OPERATORS = (EQUALS, RANGE, PREFIX, DATE_RANGE)
+
+# Operators that take a second (upper bound) value
+TWO_VALUE_OPERATORS = (RANGE, DATE_RANGE)
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{value}' is not a date (use YYYY-MM-DD).")
+
+
+def _column_clause(column, operator, value, value2):
+    quoted = quote_identifier(column)
+    if operator == EQUALS:
+        return [f"{quoted} = %s"], [value]
+    if operator == PREFIX:
+        # A prefix LIKE with no leading wildcard is still an index range scan
+        return [f"{quoted} LIKE %s"], [_escape_like(value) + "%"]
+    if operator == RANGE:
+        conditions, params = [], []
+        if value:
+            conditions.append(f"{quoted} >= %s")
+            params.append(value)
+        if value2:
+            conditions.append(f"{quoted} <= %s")
+            params.append(value2)
+        return conditions, params
+    if operator == DATE_RANGE:
+        # Compare the raw column (no DATE() wrapper) so an index on it still applies
+        conditions, params = [], []
+        if value:
+            conditions.append(f"{quoted} >= %s")
+            params.append(_parse_date(value))
+        if value2:
+            conditions.append(f"{quoted} < %s + INTERVAL 1 DAY")
+            params.append(_parse_date(value2))
+        return conditions, params
+    raise ValueError(f"Unknown filter operator: {operator}")
+
+
+def compile_filters(filters):
+    """Return (where, params) for a {column: (operator, value, value2)} mapping.
+
+    Filters with no values are ignored; where is None when nothing applies.
+    """
+    conditions = []
+    params = []
+    for column, (operator, value, value2) in filters.items():
+        value = (value or "").strip()
+        value2 = (value2 or "").strip()
+        if not value and not value2:
+            continue
+        if operator not in TWO_VALUE_OPERATORS and not value:
+            continue
+        column_conditions, column_params = _column_clause(column, operator, value, value2)
+        conditions.extend(column_conditions)
+        params.extend(column_params)
+    if not conditions:
+        return None, []
+    return " AND ".join(conditions), params
+
+
+def describe_filters(filters):
+    parts = []
+    for column, (operator, value, value2) in filters.items():
+        value = (value or "").strip()
+        value2 = (value2 or "").strip()
+        if not value and not value2:
+            continue
+        if operator in TWO_VALUE_OPERATORS:
+            parts.append(f"{column} {value or '…'} – {value2 or '…'}")
+        elif operator == PREFIX:
+            parts.append(f"{column} starts with '{value}'")
+        else:
+            parts.append(f"{column} = '{value}'")
+    return "; ".join(parts)
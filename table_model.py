@@ -0,0 +1,260 @@
+import time
+from collections import OrderedDict
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+class LazyTableModel(QAbstractTableModel):
+    def __init__(self, db_connection, database, table, chunk_size=DEFAULT_CHUNK_SIZE, max_cached_chunks=10,
+                 first_chunk=None, parent=None):
+        super().__init__(parent)
+        self.db_connection = db_connection
+        self.database = database
+        self.table = table
+        self.chunk_size = chunk_size
+        # Rows kept in memory are bounded by max_cached_chunks * chunk_size,
+        # i.e. the visible window plus a prefetch margin on either side.
+        self.max_cached_chunks = max(max_cached_chunks, 2)
+
+        # Tables with a primary key are paged by seeking past the last key
+        # shown; tables without one fall back to LIMIT/OFFSET and can't be sorted.
+        self.primary_key = db_connection.get_primary_key(database, table)
+        self.sort_column = None
+        self.descending = False
+        self.from_end = False
+        # Filter bar WHERE clause, applied to every page and to the match count
+        self.where = None
+        self.where_params = []
+
+        self._chunks = OrderedDict()
+        self._chunk_after = {}
+        self._columns = []
+        self._key_indexes = []
+        self._loaded_rows = 0
+        self._at_end = False
+        self._load_first_chunk(first_chunk)
+
+    @staticmethod
+    def fetch_first_chunk(db_connection, database, table, chunk_size=DEFAULT_CHUNK_SIZE):
+        # Safe to run on a worker thread; the result is passed back as first_chunk
+        if db_connection.get_primary_key(database, table):
+            return db_connection.get_page(database, table, limit=chunk_size)
+        return db_connection.get_table_chunk(database, table, 0, chunk_size)
+
+    def supports_keyset(self):
+        return bool(self.primary_key)
+
+    def _fetch_chunk(self, chunk_index, where=None, where_params=None, from_end=None):
+        # where/from_end default to the model's own; fetch_filter passes a new filter
+        if where_params is None:
+            where, where_params = self.where, self.where_params
+        if from_end is None:
+            from_end = self.from_end
+        if not self.primary_key:
+            return self.db_connection.get_table_chunk(
+                self.database, self.table, chunk_index * self.chunk_size, self.chunk_size,
+                where=where, where_params=where_params)
+        if from_end:
+            return self.db_connection.get_page(self.database, self.table, self.sort_column, self.descending,
+                                               limit=self.chunk_size, from_end=True,
+                                               where=where, where_params=where_params)
+        return self.db_connection.get_page(self.database, self.table, self.sort_column, self.descending,
+                                           after=self._chunk_after.get(chunk_index), limit=self.chunk_size,
+                                           where=where, where_params=where_params)
+
+    def _store_chunk(self, chunk_index, rows):
+        self._chunks[chunk_index] = rows
+        self._chunks.move_to_end(chunk_index)
+        # Remember where the next chunk starts so it can be re-read after eviction
+        if rows and self._key_indexes and not self.from_end:
+            self._chunk_after[chunk_index + 1] = tuple(rows[-1][i] for i in self._key_indexes)
+        while len(self._chunks) > self.max_cached_chunks:
+            self._chunks.popitem(last=False)
+
+    def _load_first_chunk(self, first_chunk=None):
+        # The first chunk may already have been read off the GUI thread
+        if first_chunk is None:
+            first_chunk = self._fetch_chunk(0)
+        rows, description = first_chunk
+        self._columns = [col[0] for col in description]
+        if self.primary_key:
+            key_columns = self.db_connection.get_page_key(self.database, self.table, self.sort_column)
+            self._key_indexes = [self._columns.index(column) for column in key_columns]
+        self._store_chunk(0, rows)
+        self._loaded_rows = len(rows)
+        self._at_end = self.from_end or len(rows) < self.chunk_size
+
+    def _reload(self, first_chunk=None):
+        self.beginResetModel()
+        self._chunks.clear()
+        self._chunk_after.clear()
+        self._loaded_rows = 0
+        self._at_end = False
+        self._load_first_chunk(first_chunk)
+        self.endResetModel()
+
+    def _row(self, row):
+        chunk_index, offset = divmod(row, self.chunk_size)
+        rows = self._chunks.get(chunk_index)
+        if rows is None:
+            # Chunk was evicted while scrolled away; re-read just that chunk
+            rows, _ = self._fetch_chunk(chunk_index)
+            self._store_chunk(chunk_index, rows)
+        else:
+            self._chunks.move_to_end(chunk_index)
+        if offset < len(rows):
+            return rows[offset]
+        return None
+
+    def column_names(self):
+        return list(self._columns)
+
+    def set_chunk_size(self, chunk_size):
+        if chunk_size != self.chunk_size:
+            self.chunk_size = chunk_size
+            self._reload()
+
+    def go_to_start(self):
+        self.from_end = False
+        self._reload()
+
+    def jump_to_end(self):
+        # Reads the last page directly by reversing the order, no OFFSET scan
+        if not self.primary_key:
+            return
+        self.from_end = True
+        self._reload()
+
+    def fetch_filter(self, where, where_params=()):
+        """Read the first page and match count for a WHERE clause without applying it.
+
+        Safe to run on a worker thread. Returns (page, matching rows, seconds
+        spent querying); pass page on to set_filter. The count is None with no
+        WHERE clause, as the filter bar has nothing to report then.
+        """
+        started = time.perf_counter()
+        where_params = list(where_params)
+        order = (self.sort_column, self.descending)
+        first_chunk = self._fetch_chunk(0, where, where_params, from_end=False)
+        count = None
+        if where:
+            count = self.db_connection.count_rows(self.database, self.table, where, where_params)
+        return (order, first_chunk), count, time.perf_counter() - started
+
+    def set_filter(self, where, where_params=(), page=None):
+        """Apply a WHERE clause, showing the page fetch_filter read for it if given."""
+        self.where = where
+        self.where_params = list(where_params)
+        self.from_end = False
+        first_chunk = None
+        if page is not None:
+            order, first_chunk = page
+            if order != (self.sort_column, self.descending):
+                # Re-sorted while the filter was running; that page is in the old order
+                first_chunk = None
+        self._reload(first_chunk)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if not self.primary_key:
+            return
+        sort_column = self._columns[column] if 0 <= column < len(self._columns) else None
+        descending = order == Qt.DescendingOrder and sort_column is not None
+        if sort_column == self.sort_column and descending == self.descending:
+            return
+        self.sort_column = sort_column
+        self.descending = descending
+        self.from_end = False
+        self._reload()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            row = self._row(index.row())
+            if row is None:
+                return None
+            return str(row[index.column()])
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self._columns):
+            return self._columns[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        # Read-only, same as the old QTableWidget cells
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._at_end
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._at_end:
+            return
+        chunk_index = self._loaded_rows // self.chunk_size
+        rows, _ = self._fetch_chunk(chunk_index)
+        if not rows:
+            self._at_end = True
+            return
+        self._at_end = len(rows) < self.chunk_size
+        self.beginInsertRows(QModelIndex(), self._loaded_rows, self._loaded_rows + len(rows) - 1)
+        self._store_chunk(chunk_index, rows)
+        self._loaded_rows += len(rows)
+        self.endInsertRows()
+
+
+class RowsTableModel(QAbstractTableModel):
+    """Read-only model over rows already in memory.
+
+    The view asks only for the cells it paints, so showing a result costs
+    the same for fifty rows or fifty thousand, unlike one QTableWidgetItem
+    per cell.
+    """
+
+    def __init__(self, rows, column_names, parent=None):
+        super().__init__(parent)
+        self._rows = rows
+        self._columns = list(column_names)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return str(self._rows[index.row()][index.column()])
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self._columns):
+            return self._columns[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
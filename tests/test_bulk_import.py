@@ -0,0 +1,73 @@
+import csv
+
+import pytest
+from mysql.connector import Error
+
+import bulk_import
+from bulk_import import TRANSIENT_RETRIES, BulkImporter
+
+
+class FakeDatabase:
+    def __init__(self, failures=()):
+        # Errors raised by the next add_rows calls, in order
+        self.failures = list(failures)
+        self.loaded = []
+
+    def get_columns(self, database, table):
+        return ["ProductID", "Name"]
+
+    def add_rows(self, database, table, columns, rows):
+        if self.failures:
+            raise self.failures.pop(0)
+        if any(row[1] == "bad" for row in rows):
+            raise Error(msg="Data too long", errno=1406)
+        self.loaded.extend(rows)
+        return len(rows)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(bulk_import.time, "sleep", lambda seconds: None)
+
+
+def write_csv(path, names):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ProductID", "Name"])
+        writer.writerows([i, name] for i, name in enumerate(names))
+    return str(path)
+
+
+def test_bad_row_is_rejected_and_the_rest_of_its_batch_loaded(tmp_path):
+    db = FakeDatabase()
+    path = write_csv(tmp_path / "rows.csv", ["a", "bad", "c", "d"])
+
+    result = BulkImporter(db, "db", "Product", batch_size=3).import_file(path)
+
+    assert [row[1] for row in db.loaded] == ["a", "c", "d"]
+    assert (result["rows_loaded"], result["rows_rejected"], result["batches_split"]) == (3, 1, 1)
+    with open(result["reject_path"]) as f:
+        assert list(csv.reader(f))[1] == ["1", "bad", "1406: Data too long"]
+
+
+def test_deadlocked_batch_is_retried_not_rejected(tmp_path):
+    db = FakeDatabase([Error(msg="Deadlock", errno=1213), Error(msg="Lost connection", errno=2013)])
+    path = write_csv(tmp_path / "rows.csv", ["a", "b", "c"])
+
+    result = BulkImporter(db, "db", "Product", batch_size=3).import_file(path)
+
+    assert len(db.loaded) == 3
+    assert (result["rows_rejected"], result["batches_split"], result["retries"]) == (0, 0, 2)
+    assert result["reject_path"] is None
+    assert result["error"] is None
+
+
+def test_import_stops_when_the_server_stays_unreachable(tmp_path):
+    db = FakeDatabase([Error(msg="Lost connection", errno=2013)] * (TRANSIENT_RETRIES + 1))
+    path = write_csv(tmp_path / "rows.csv", ["a", "b", "c", "d"])
+
+    result = BulkImporter(db, "db", "Product", batch_size=2).import_file(path)
+
+    assert db.loaded == []
+    assert (result["rows_loaded"], result["rows_rejected"]) == (0, 0)
+    assert result["error"] == "2013: Lost connection"
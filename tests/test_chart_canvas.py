@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+pytest.importorskip("matplotlib")
+
+from matplotlib.figure import Figure  # noqa: E402
+from PyQt5.QtCore import QSize  # noqa: E402
+from PyQt5.QtGui import QResizeEvent  # noqa: E402
+
+from chart_canvas import ChartCanvas  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def canvas(app, monkeypatch):
+    figure = Figure()
+    canvas = ChartCanvas(figure)
+    canvas.set_chart(lambda fig: fig.add_subplot().plot([1, 3, 2]))
+    canvas.renders = []
+    draw = Figure.draw
+    monkeypatch.setattr(Figure, "draw", lambda self, renderer: (canvas.renders.append(self.bbox.width),
+                                                                 draw(self, renderer)))
+    return canvas
+
+
+def resize(canvas, width, height=300):
+    canvas._resize(QResizeEvent(QSize(width, height), canvas.size()))
+    canvas.draw()
+
+
+def test_returning_to_a_rendered_size_is_blitted(canvas):
+    resize(canvas, 400)
+    resize(canvas, 600)
+    resize(canvas, 400)
+
+    assert canvas.renders == [400, 600]
+    assert canvas.get_renderer().width == 400
+
+
+def test_changing_the_chart_forgets_earlier_renders(canvas):
+    resize(canvas, 400)
+    resize(canvas, 600)
+    canvas.figure.axes[0].set_title("changed")
+    canvas.draw_idle()
+    resize(canvas, 400)
+
+    assert canvas.renders == [400, 600, 400]
@@ -0,0 +1,59 @@
+import math
+from decimal import Decimal
+
+import pytest
+
+from chart_downsampling import downsample_indices, line_marker, lttb_indices, mean_of, top_rows
+
+
+@pytest.mark.parametrize("count, threshold", [(1000, 500), (1001, 3), (5000, 100), (37, 10)])
+def test_lttb_keeps_both_endpoints_and_threshold_points(count, threshold):
+    values = [math.sin(i / 7) * i for i in range(count)]
+
+    indices = lttb_indices(values, threshold)
+
+    assert len(indices) == threshold
+    assert indices[0] == 0
+    assert indices[-1] == count - 1
+    assert indices == sorted(set(indices))
+
+
+@pytest.mark.parametrize("count, threshold", [(10, 500), (10, 10), (10, 2), (0, 5)])
+def test_lttb_leaves_short_series_alone(count, threshold):
+    assert lttb_indices(list(range(count)), threshold) == list(range(count))
+
+
+def test_lttb_keeps_a_lone_spike():
+    values = [0] * 1000
+    values[613] = 50
+
+    assert 613 in lttb_indices(values, 50)
+
+
+def test_lttb_reads_decimals_and_nulls():
+    values = [Decimal(i % 5) if i % 11 else None for i in range(300)]
+
+    assert len(lttb_indices(values, 30)) == 30
+
+
+def test_downsample_keeps_each_series_peaks():
+    rows = [(f"d{i}", 100 if i == 200 else 0, 100 if i == 800 else 0) for i in range(1000)]
+
+    indices = downsample_indices(rows, [1, 2], threshold=20)
+
+    assert {0, 200, 800, 999} <= set(indices)
+    assert len(indices) <= 40
+
+
+def test_top_rows_folds_the_rest_into_other():
+    rows = [(f"p{i}", i, Decimal(i) / 2, "x") for i in range(100)]
+
+    kept = top_rows(rows, 1, limit=5, combine={2: mean_of})
+
+    assert [row[0] for row in kept[:4]] == ["p99", "p98", "p97", "p96"]
+    assert kept[4] == ("Other (96)", sum(range(96)), mean_of([Decimal(i) / 2 for i in range(96)]), "")
+
+
+def test_line_marker_drops_markers_on_dense_lines():
+    assert line_marker(10) == 'o'
+    assert line_marker(1000) is None
@@ -0,0 +1,85 @@
+import mysql.connector
+import pytest
+from mysql.connector import Error
+
+import db_pool
+from db_pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.pings = 0
+        self.closed = False
+        self.in_transaction = False
+
+    def is_connected(self):
+        self.pings += 1
+        return True
+
+    def handle_unread_result(self):
+        pass
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(db_pool.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(mysql.connector, "connect", lambda **kwargs: FakeConnection())
+    return now
+
+
+def test_recently_used_connection_is_reused_without_a_ping(clock):
+    pool = ConnectionPool({}, min_size=1, ping_after_idle=30)
+
+    for _ in range(3):
+        with pool.connection() as connection:
+            pass
+
+    assert connection.pings == 0
+    assert pool.stats()["size"] == 1
+
+
+def test_connection_idle_past_the_threshold_is_pinged(clock):
+    pool = ConnectionPool({}, min_size=1, ping_after_idle=30)
+    with pool.connection() as connection:
+        pass
+
+    clock[0] += 31
+    with pool.connection() as again:
+        pass
+
+    assert again is connection
+    assert connection.pings == 1
+
+
+def test_server_error_keeps_the_connection(clock):
+    pool = ConnectionPool({}, min_size=1)
+
+    with pytest.raises(Error):
+        with pool.connection() as connection:
+            connection.in_transaction = True
+            raise Error(msg="Duplicate entry", errno=1062)
+
+    assert not connection.closed
+    assert not connection.in_transaction
+    assert pool.stats() == {"size": 1, "idle": 1, "in_use": 0, "min_size": 1, "max_size": 8}
+
+
+@pytest.mark.parametrize("error", [Error(msg="Lost connection", errno=2013), KeyError("row")])
+def test_connection_is_discarded_when_the_caller_fails_otherwise(clock, error):
+    pool = ConnectionPool({}, min_size=1)
+
+    with pytest.raises(type(error)):
+        with pool.connection() as connection:
+            raise error
+
+    assert connection.closed
+    assert pool.stats()["size"] == 0
+    with pool.connection() as replacement:
+        assert replacement is not connection
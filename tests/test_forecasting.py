@@ -0,0 +1,121 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from forecasting import (PARAMETER_GRID, REFIT_AFTER_DAYS, SEASON_LENGTH, ForecastParameterCache, fit_and_forecast,
+                         holt_winters, load_daily_sales, project, synthetic_sales)
+
+
+def reference_holt_winters(series, alpha, beta, gamma, m=SEASON_LENGTH):
+    """Textbook additive Holt-Winters, one value at a time, with the same initial state."""
+    level = sum(series[:m]) / m
+    trend = (sum(series[m:2 * m]) / m - level) / m
+    season = [value - level for value in series[:m]]
+    sse = 0.0
+    for t in range(m, len(series)):
+        y = series[t]
+        slot = t % m
+        sse += (y - (level + trend + season[slot])) ** 2
+        new_level = alpha * (y - season[slot]) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[slot] = gamma * (y - new_level) + (1 - gamma) * season[slot]
+        level = new_level
+    return sse, level, trend, season
+
+
+def reference_forecast(level, trend, season, days, horizon, m=SEASON_LENGTH):
+    return [max(level + trend * h + season[(days - 1 + h) % m], 0.0) for h in range(1, horizon + 1)]
+
+
+@pytest.fixture
+def series():
+    return synthetic_sales(products=4, days=60, seed=3)
+
+
+def test_vectorized_grid_matches_scalar_reference(series):
+    grid = PARAMETER_GRID[::7]
+    sse, level, trend, season = holt_winters(series, grid[:, 0:1], grid[:, 1:2], grid[:, 2:3])
+
+    assert sse.shape == (len(grid), len(series))
+    assert season.shape == (len(grid), len(series), SEASON_LENGTH)
+    for g, (alpha, beta, gamma) in enumerate(grid):
+        for p in range(len(series)):
+            expected = reference_holt_winters(series[p].tolist(), alpha, beta, gamma)
+            assert sse[g, p] == pytest.approx(expected[0])
+            assert level[g, p] == pytest.approx(expected[1])
+            assert trend[g, p] == pytest.approx(expected[2])
+            assert season[g, p] == pytest.approx(expected[3])
+
+
+def test_projection_matches_scalar_reference(series):
+    alpha, beta, gamma = 0.3, 0.05, 0.2
+    _, level, trend, season = holt_winters(series, alpha, beta, gamma)
+
+    forecast = project(level[0], trend[0], season[0], series.shape[1], horizon=10)
+
+    for p in range(len(series)):
+        _, ref_level, ref_trend, ref_season = reference_holt_winters(series[p].tolist(), alpha, beta, gamma)
+        assert forecast[p] == pytest.approx(
+            reference_forecast(ref_level, ref_trend, ref_season, series.shape[1], 10))
+
+
+def test_projection_never_goes_negative():
+    forecast = project(np.array([1.0]), np.array([-5.0]), np.zeros((1, SEASON_LENGTH)), 14, horizon=3)
+
+    assert forecast.tolist() == [[0.0, 0.0, 0.0]]
+
+
+def test_grid_search_picks_lowest_sse_and_cached_params_reproduce_it(series):
+    forecast, params, refitted = fit_and_forecast(series, horizon=7)
+
+    assert refitted == len(series)
+    for p in range(len(series)):
+        errors = [reference_holt_winters(series[p].tolist(), *grid)[0] for grid in PARAMETER_GRID]
+        assert params[:, p].tolist() == PARAMETER_GRID[int(np.argmin(errors))].tolist()
+
+    cached, cached_params, refitted = fit_and_forecast(series, params, np.ones(len(series), dtype=bool), horizon=7)
+    assert refitted == 0
+    assert np.array_equal(cached_params, params)
+    assert cached == pytest.approx(forecast)
+
+
+class ChunkedSales:
+    def __init__(self, rows, chunk_size):
+        self.rows = rows
+        self.chunk_size = chunk_size
+
+    def iter_query_chunks(self, database, sql, params, chunk_size):
+        for i in range(0, len(self.rows), self.chunk_size):
+            yield [], self.rows[i:i + self.chunk_size]
+
+
+def test_load_daily_sales_builds_a_dense_matrix():
+    end = datetime.date(2024, 3, 10)
+    rows = [
+        (7, datetime.date(2024, 3, 10), 4),
+        (3, "2024-03-08", 2),
+        (7, datetime.date(2024, 3, 8), None),
+        (7, datetime.datetime(2024, 3, 9, 12, 0), 1.5),
+    ]
+
+    product_ids, start, units = load_daily_sales(ChunkedSales(rows, 2), "db", end, history_days=3)
+
+    assert product_ids.tolist() == [3, 7]
+    assert start == datetime.date(2024, 3, 8)
+    assert units.tolist() == [[2, 0, 0], [0, 1.5, 4]]
+
+
+def test_cached_parameters_go_stale(tmp_path):
+    cache = ForecastParameterCache(str(tmp_path / "params.json"))
+    fitted_on = datetime.date(2024, 1, 1)
+    cache.store("db", np.array([1, 2]), np.array([[0.1, 0.2], [0.0, 0.01], [0.05, 0.1]]), fitted_on)
+    cache.save()
+
+    reloaded = ForecastParameterCache(str(tmp_path / "params.json"))
+    params, fresh = reloaded.lookup("db", np.array([2, 3]), fitted_on + datetime.timedelta(days=1))
+    assert fresh.tolist() == [True, False]
+    assert params[:, 0].tolist() == [0.2, 0.01, 0.1]
+
+    _, fresh = reloaded.lookup("db", np.array([2]), fitted_on + datetime.timedelta(days=REFIT_AFTER_DAYS))
+    assert not fresh.any()
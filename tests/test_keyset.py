@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+from keyset import keyset_predicate, page_query
+
+# SQLite orders NULLs the way MySQL does (first ascending, last descending)
+# and understands row constructor comparisons, so it can run the SQL as built
+ROWS = [
+    (1, None, "a"),
+    (2, 5, None),
+    (3, None, None),
+    (4, 5, "b"),
+    (5, 3, "a"),
+    (6, None, "b"),
+    (7, 3, None),
+    (8, 5, "a"),
+]
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE Item (ItemID INTEGER PRIMARY KEY, Rank INTEGER, Label TEXT)")
+    connection.executemany("INSERT INTO Item VALUES (?, ?, ?)", ROWS)
+    yield connection
+    connection.close()
+
+
+def run(connection, sql, params):
+    return connection.execute(sql.replace("%s", "?"), params).fetchall()
+
+
+def paginate(connection, order_columns, descending, limit=2):
+    indexes = [("ItemID", "Rank", "Label").index(column) for column in order_columns]
+    pages = []
+    after = None
+    while True:
+        sql, params = page_query("Item", order_columns, descending, after, limit, not_null=("ItemID",))
+        page = run(connection, sql, params)
+        if not page:
+            return pages
+        pages.extend(page)
+        after = [page[-1][index] for index in indexes]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("order_columns", [
+    ["Rank", "ItemID"],
+    ["Label", "Rank", "ItemID"],
+    ["Rank", "Label", "ItemID"],
+])
+def test_pages_match_a_full_ordered_scan(connection, order_columns, descending):
+    sql, params = page_query("Item", order_columns, descending, limit=len(ROWS))
+    expected = run(connection, sql, params)
+
+    assert paginate(connection, order_columns, descending) == expected
+
+
+def test_nothing_follows_null_when_nulls_sort_last():
+    assert keyset_predicate(["Rank"], [None], descending=True) == ("FALSE", [])
+
+
+def test_null_key_ascending_continues_with_non_null_values():
+    assert keyset_predicate(["Rank"], [None]) == ("`Rank` IS NOT NULL", [])
+
+
+def test_descending_includes_nulls_unless_column_is_not_null():
+    sql, params = keyset_predicate(["Rank", "ItemID"], [5, 4], descending=True, not_null=("ItemID",))
+    assert sql == "((`Rank`, `ItemID`) < (%s, %s) OR `Rank` IS NULL)"
+    assert params == [5, 4]
+
+    sql, _ = keyset_predicate(["Rank", "ItemID"], [5, 4], descending=True, not_null=("Rank", "ItemID"))
+    assert "IS NULL" not in sql
+
+
+def test_descending_row_constructor_needs_trailing_columns_not_null():
+    # (Rank, Label) < (5, 'a') is NULL for a row with Label NULL, which sorts after it
+    sql, _ = keyset_predicate(["Rank", "Label"], [5, "a"], descending=True)
+    assert "`Label` IS NULL" in sql
+
+
+def test_mismatched_lengths_are_rejected():
+    with pytest.raises(ValueError):
+        keyset_predicate(["Rank", "ItemID"], [1])
@@ -0,0 +1,59 @@
+import local_replica
+from local_replica import APPEND_OVERLAP, LocalReplica
+
+COLUMNS = {
+    "Product": [("ProductID", "int", "PRI"), ("Name", "varchar(100)", "")],
+    "Sale": [("SaleID", "int", "PRI"), ("ProductID", "int", ""), ("QuantitySold", "int", "")],
+}
+
+
+class FakeServer:
+    def __init__(self, tables, on_fetch=None):
+        self.tables = tables  # table -> rows sorted by key
+        self.on_fetch = on_fetch
+        self.pages = []
+
+    def get_column_info(self, database, table):
+        return COLUMNS.get(table, [])
+
+    def get_page(self, database, table, after=None, limit=200):
+        self.pages.append((table, after))
+        if self.on_fetch is not None:
+            self.on_fetch(table)
+        rows = [row for row in self.tables[table] if after is None or (row[0],) > after]
+        return rows[:limit], [(column[0],) for column in COLUMNS[table]]
+
+
+def test_append_table_pulls_only_past_the_overlap(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_replica, "REPLICATED_TABLES", {"Product": "full", "Sale": "append"})
+    replica = LocalReplica(str(tmp_path / "replica.sqlite3"))
+    sales = [(sale_id, 1, 1) for sale_id in range(1, 2001)]
+    server = FakeServer({"Product": [(1, "Apples")], "Sale": sales})
+    replica.pull(server, "db", full=True)
+
+    # A sale committed late, with an ID from a block reserved earlier
+    sales.insert(1899, (1900, 1, 5))
+    del sales[1900]
+    server.pages.clear()
+    replica.pull(server, "db", full=True)
+
+    assert server.pages == [("Product", None), ("Sale", (2000 - APPEND_OVERLAP,))]
+    rows, _ = replica.query("SELECT COUNT(*), SUM(QuantitySold) FROM Sale")
+    assert rows == [(2000, 2004)]
+
+
+def test_fetch_runs_without_the_write_lock_and_yields_to_local_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_replica, "REPLICATED_TABLES", {"Product": "full"})
+    replica = LocalReplica(str(tmp_path / "replica.sqlite3"))
+    replica.pull(FakeServer({"Product": [(1, "Apples")]}), "db")
+
+    def write_locally(table):
+        # Would deadlock if the pull still held the lock while fetching
+        replica.insert("Product", ["ProductID", "Name"], [2, "Pears"])
+
+    server = FakeServer({"Product": [(1, "Apples"), (3, "Plums")]}, on_fetch=write_locally)
+
+    assert replica.pull(server, "db") is None
+    rows, _ = replica.query("SELECT ProductID, Name FROM Product ORDER BY ProductID")
+    assert rows == [(1, "Apples"), (2, "Pears")]
+    assert replica.journal_counts() == {"pending": 1}
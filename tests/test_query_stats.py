@@ -0,0 +1,102 @@
+import pytest
+
+from query_stats import InstrumentedConnection, QueryStats, statement_shape
+
+
+@pytest.fixture
+def stats(tmp_path):
+    stats = QueryStats(buffer_size=3, slow_threshold=None, slow_log_path=str(tmp_path / "slow.log"))
+    yield stats
+    stats.close()
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.with_rows = False
+
+    def execute(self, operation, params=None):
+        self.with_rows = operation.startswith("SELECT")
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return FakeCursor(self.rows)
+
+
+@pytest.mark.parametrize("sql, shape", [
+    ("SELECT * FROM Product WHERE ProductID = 42", "SELECT * FROM Product WHERE ProductID = ?"),
+    ("SELECT * FROM Product WHERE Name = 'O''Brien'", "SELECT * FROM Product WHERE Name = ?"),
+    ("SELECT *\n  FROM Sale WHERE SaleID IN (%s, %s, %s)", "SELECT * FROM Sale WHERE SaleID IN (...)"),
+    ("INSERT INTO Sale VALUES (%s, %s), (%s, %s)", "INSERT INTO Sale VALUES (...)"),
+])
+def test_statement_shape_folds_values(sql, shape):
+    assert statement_shape(sql) == shape
+
+
+def test_summary_groups_by_shape_with_nearest_rank_percentiles(stats):
+    for milliseconds in range(1, 101):
+        stats.record(f"SELECT * FROM Sale WHERE SaleID = {milliseconds}", None, milliseconds / 1000, 1, 10)
+    stats.record("SELECT 1", None, 0.5, 1, 8)
+
+    sale, other = stats.summary()
+
+    assert sale["shape"] == "SELECT * FROM Sale WHERE SaleID = ?"
+    assert sale["calls"] == 100
+    assert (sale["p50"], sale["p95"], sale["p99"], sale["max"]) == (0.05, 0.095, 0.099, 0.1)
+    assert sale["rows"] == 100 and sale["bytes"] == 1000
+    assert other["shape"] == "SELECT ?"
+
+
+def test_recent_is_a_bounded_ring_buffer(stats):
+    for index in range(5):
+        stats.record(f"SELECT {index}", (index,), 0.001, 0, 0)
+
+    recent = stats.recent()
+
+    assert len(recent) == 3
+    assert recent[-1]["params_hash"] != recent[-2]["params_hash"]
+    assert len(stats.recent(limit=1)) == 1
+
+
+def test_slow_queries_are_logged(tmp_path):
+    stats = QueryStats(slow_threshold=0.1, slow_log_path=str(tmp_path / "slow.log"))
+    stats.record("SELECT * FROM Sale", None, 0.05, 0, 0)
+    stats.record("SELECT * FROM Inventory", None, 0.25, 3, 24)
+    stats.close()
+
+    log = (tmp_path / "slow.log").read_text()
+    assert "SELECT * FROM Inventory" in log
+    assert "250.0 ms rows=3" in log
+    assert "FROM Sale" not in log
+
+
+def test_instrumented_cursor_records_after_the_result_is_read(stats):
+    connection = InstrumentedConnection(FakeConnection([(1, "Apple"), (2, "Pear")]), stats)
+    cursor = connection.cursor()
+
+    cursor.execute("SELECT * FROM Product")
+    assert stats.recent() == []
+    assert cursor.fetchall() == [(1, "Apple"), (2, "Pear")]
+
+    (entry,) = stats.recent()
+    assert entry["rows"] == 2
+    assert entry["bytes"] == 2 * 8 + len("Apple") + len("Pear")
+
+
+def test_statements_without_results_record_immediately(stats):
+    cursor = InstrumentedConnection(FakeConnection([]), stats).cursor()
+
+    cursor.execute("UPDATE Inventory SET QuantityInStock = 0")
+
+    assert [entry["shape"] for entry in stats.recent()] == ["UPDATE Inventory SET QuantityInStock = ?"]
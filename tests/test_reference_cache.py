@@ -0,0 +1,73 @@
+import reference_cache
+from reference_cache import ReferenceCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_missing_rows_are_cached_too():
+    cache = ReferenceCache()
+    cache.put("db", "Product", 7, None)
+
+    assert cache.get("db", "Product", 7) == (True, None)
+    assert cache.get("db", "Product", 8) == (False, None)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(reference_cache.time, "monotonic", clock)
+    cache = ReferenceCache(ttl=60)
+    cache.put("db", "Product", 1, ("Apple",))
+
+    clock.now += 59
+    assert cache.get("db", "Product", 1) == (True, ("Apple",))
+    clock.now += 1
+    assert cache.get("db", "Product", 1) == (False, None)
+    assert cache.stats()["entries"] == 0
+
+
+def test_no_ttl_never_expires(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(reference_cache.time, "monotonic", clock)
+    cache = ReferenceCache(ttl=None)
+    cache.put("db", "Product", 1, ("Apple",))
+
+    clock.now += 10 ** 9
+    assert cache.get("db", "Product", 1)[0]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ReferenceCache(max_entries=2)
+    cache.put("db", "Product", 1, ("Apple",))
+    cache.put("db", "Product", 2, ("Pear",))
+    cache.get("db", "Product", 1)
+
+    cache.put("db", "Product", 3, ("Plum",))
+
+    assert cache.get("db", "Product", 2) == (False, None)
+    assert cache.get("db", "Product", 1)[0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_one_row_or_a_whole_table():
+    cache = ReferenceCache()
+    cache.put("db", "Product", 1, ("Apple",))
+    cache.put("db", "Product", 2, ("Pear",))
+    cache.put("db", "Vendor", 1, ("Acme",))
+    cache.put("other", "Product", 1, ("Apple",))
+
+    cache.invalidate("db", "Product", 1)
+    assert not cache.get("db", "Product", 1)[0]
+    assert cache.get("db", "Product", 2)[0]
+
+    cache.invalidate("db", "Product")
+    assert not cache.get("db", "Product", 2)[0]
+    assert cache.get("db", "Vendor", 1)[0]
+    assert cache.get("other", "Product", 1)[0]
@@ -0,0 +1,66 @@
+from render_cache import RenderCache, data_hash
+
+SIZE = (640.0, 480.0, 100.0)
+
+
+def test_least_recently_used_render_is_evicted_first():
+    cache = RenderCache(max_bytes=300)
+    cache.put("a", SIZE, "render a", 100)
+    cache.put("b", SIZE, "render b", 100)
+    cache.put("c", SIZE, "render c", 100)
+    assert cache.get("a", SIZE) == "render a"
+
+    cache.put("d", SIZE, "render d", 100)
+
+    assert cache.get("b", SIZE) is None
+    assert [cache.get(key, SIZE) for key in "acd"] == ["render a", "render c", "render d"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.total_bytes == 300
+
+
+def test_one_large_render_can_evict_several():
+    cache = RenderCache(max_bytes=300)
+    for key in "abc":
+        cache.put(key, SIZE, key, 100)
+
+    cache.put("big", SIZE, "big", 250)
+
+    assert cache.stats() == {"entries": 1, "bytes": 250, "hits": 0, "misses": 0, "evictions": 3}
+
+
+def test_render_over_budget_is_not_stored_and_drops_the_old_one():
+    cache = RenderCache(max_bytes=300)
+    cache.put("a", SIZE, "small", 100)
+
+    cache.put("a", SIZE, "huge", 400)
+
+    assert cache.get("a", SIZE) is None
+    assert cache.total_bytes == 0
+
+
+def test_rerender_replaces_the_entry_and_other_sizes_miss():
+    cache = RenderCache(max_bytes=1000)
+    cache.put("a", SIZE, "first", 100)
+    cache.put("a", (800.0, 600.0, 100.0), "resized", 150)
+
+    assert cache.get("a", SIZE) is None
+    assert cache.get("a", (800.0, 600.0, 100.0)) == "resized"
+    assert cache.stats() == {"entries": 1, "bytes": 150, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_clear_empties_the_cache():
+    cache = RenderCache(max_bytes=1000)
+    cache.put("a", SIZE, "render", 100)
+
+    cache.clear()
+
+    assert cache.get("a", SIZE) is None
+    assert cache.total_bytes == 0
+
+
+def test_data_hash_changes_with_any_value():
+    rows = [(1, "Apples", 2.5), (2, "Pears", 3)]
+
+    assert data_hash(rows) == data_hash([tuple(row) for row in rows])
+    assert data_hash(rows) != data_hash([(1, "Apples", 2.5), (2, "Pears", 4)])
+    assert data_hash([("a", "b")]) != data_hash([("ab",)])
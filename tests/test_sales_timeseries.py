@@ -0,0 +1,113 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from sales_timeseries import (DAILY, MONTHLY, SEASONAL, SQLITE_BUCKETS, WEEKLY, period_label, preset_range,
+                              timeseries_query)
+
+START = date(2023, 11, 20)
+DAYS = 500
+
+
+def bucket_start(bucket, day):
+    if bucket == WEEKLY:
+        return day - timedelta(days=day.weekday())
+    if bucket == MONTHLY:
+        return day.replace(day=1)
+    if bucket == SEASONAL:
+        month = day.month - day.month % 3
+        if month == 0:
+            return date(day.year - 1, 12, 1)
+        return date(day.year, month, 1)
+    return day
+
+
+@pytest.fixture
+def sales():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE Sale (SaleID INTEGER PRIMARY KEY, ProductID INTEGER, VendorID INTEGER, "
+                       "SaleDate TEXT, QuantitySold INTEGER, TotalPrice REAL)")
+    rows = []
+    for i in range(DAYS):
+        day = START + timedelta(days=i)
+        rows.append((i % 3, i % 2, day.isoformat(), 1 + i % 4, 2.5 * (1 + i % 4)))
+    connection.executemany("INSERT INTO Sale (ProductID, VendorID, SaleDate, QuantitySold, TotalPrice) "
+                           "VALUES (?, ?, ?, ?, ?)", rows)
+    # Bulk import leaves blank dates NULL; they belong to no period
+    connection.execute("INSERT INTO Sale (ProductID, VendorID, SaleDate, QuantitySold, TotalPrice) "
+                       "VALUES (1, 1, NULL, 9, 99.0)")
+    yield connection, rows
+    connection.close()
+
+
+def run(connection, bucket, **filters):
+    sql, params = timeseries_query(bucket, buckets=SQLITE_BUCKETS, **filters)
+    params = [value.isoformat() if hasattr(value, "isoformat") else value for value in params]
+    return connection.execute(sql.replace("%s", "?"), params).fetchall()
+
+
+def expected(rows, bucket, start=None, end=None, product_id=None, vendor_id=None):
+    totals = {}
+    for row_product, row_vendor, sale_date, quantity, price in rows:
+        day = date.fromisoformat(sale_date)
+        if (start is not None and day < start) or (end is not None and day > end):
+            continue
+        if (product_id is not None and row_product != product_id) or (vendor_id is not None and row_vendor != vendor_id):
+            continue
+        period = bucket_start(bucket, day).isoformat()
+        units, revenue, count = totals.get(period, (0, 0.0, 0))
+        totals[period] = (units + quantity, revenue + price, count + 1)
+    return [(period, *totals[period]) for period in sorted(totals)]
+
+
+@pytest.mark.parametrize("bucket", [DAILY, WEEKLY, MONTHLY, SEASONAL])
+def test_buckets_start_on_the_expected_day(sales, bucket):
+    connection, rows = sales
+
+    assert run(connection, bucket) == expected(rows, bucket)
+
+
+@pytest.mark.parametrize("filters", [
+    {"start": date(2024, 2, 27), "end": date(2024, 6, 2)},
+    {"start": date(2024, 12, 1)},
+    {"end": date(2023, 12, 31), "product_id": 1},
+    {"vendor_id": 0, "product_id": 2},
+])
+def test_filters_apply_before_grouping(sales, filters):
+    connection, rows = sales
+
+    assert run(connection, SEASONAL, **filters) == expected(rows, SEASONAL, **filters)
+
+
+def test_date_range_is_applied_to_the_raw_column():
+    sql, params = timeseries_query(MONTHLY, date(2024, 1, 1), date(2024, 3, 31), product_id=4)
+
+    assert "ProductID = %s AND SaleDate >= %s AND SaleDate <= %s" in sql
+    assert params == [4, date(2024, 1, 1), date(2024, 3, 31)]
+
+
+def test_bad_arguments_are_refused():
+    with pytest.raises(ValueError):
+        timeseries_query("hourly")
+    with pytest.raises(ValueError):
+        timeseries_query(DAILY, date(2024, 2, 1), date(2024, 1, 1))
+
+
+@pytest.mark.parametrize("bucket, period, label", [
+    (DAILY, "2024-03-05", "2024-03-05"),
+    (WEEKLY, date(2024, 12, 30), "2025-W01"),
+    (MONTHLY, "2024-03-01 00:00:00", "2024-03"),
+    (SEASONAL, date(2023, 12, 1), "Winter 2023/24"),
+    (SEASONAL, date(2024, 6, 1), "Summer 2024"),
+])
+def test_period_labels(bucket, period, label):
+    assert period_label(bucket, period) == label
+
+
+def test_preset_ranges_include_today():
+    today = date(2024, 3, 15)
+
+    assert preset_range("Last 7 days", today) == (date(2024, 3, 9), today)
+    assert preset_range("This year", today) == (date(2024, 1, 1), today)
+    assert preset_range("All time", today) == (None, None)
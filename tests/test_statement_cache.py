@@ -0,0 +1,83 @@
+from mysql.connector import Error
+
+from statement_cache import StatementCache
+
+
+class FakeCursor:
+    def __init__(self, fail_close=False):
+        self.closed = False
+        self.fail_close = fail_close
+
+    def close(self):
+        if self.fail_close:
+            raise Error(msg="Lost connection")
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self, prepared=False):
+        assert prepared
+        cursor = FakeCursor()
+        self.cursors.append(cursor)
+        return cursor
+
+
+def test_repeated_statement_reuses_its_cursor():
+    cache = StatementCache(FakeConnection())
+
+    cursor, sql, hit, evicted = cache.cursor("farmer_schema", "SELECT 1")
+    assert (sql, hit, evicted) == ("SELECT 1", False, 0)
+
+    again, _, hit, _ = cache.cursor("farmer_schema", "SELECT 1")
+    assert again is cursor
+    assert hit
+
+
+def test_same_sql_in_another_schema_is_prepared_separately():
+    cache = StatementCache(FakeConnection())
+
+    first, _, _, _ = cache.cursor("farmer_schema", "SELECT * FROM Product")
+    second, _, hit, _ = cache.cursor("archive", "SELECT * FROM Product")
+
+    assert second is not first
+    assert not hit
+    assert len(cache) == 2
+
+
+def test_least_recently_used_statement_is_evicted_and_closed():
+    connection = FakeConnection()
+    cache = StatementCache(connection, max_size=2)
+    a, _, _, _ = cache.cursor("db", "A")
+    b, _, _, _ = cache.cursor("db", "B")
+    cache.cursor("db", "A")
+
+    _, _, _, evicted = cache.cursor("db", "C")
+
+    assert evicted == 1
+    assert b.closed and not a.closed
+    assert cache.cursor("db", "A")[2]
+    assert not cache.cursor("db", "B")[2]
+
+
+def test_discard_and_clear_close_cursors():
+    cache = StatementCache(FakeConnection())
+    a, _, _, _ = cache.cursor("db", "A")
+    b, _, _, _ = cache.cursor("db", "B")
+
+    cache.discard("db", "A")
+    cache.discard("db", "missing")
+    assert a.closed and len(cache) == 1
+
+    cache.clear()
+    assert b.closed and len(cache) == 0
+
+
+def test_close_errors_are_ignored():
+    cache = StatementCache(FakeConnection(), max_size=1)
+    cursor, _, _, _ = cache.cursor("db", "A")
+    cursor.fail_close = True
+
+    assert cache.cursor("db", "B")[3] == 1
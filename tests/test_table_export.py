@@ -0,0 +1,62 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from table_export import TableExporter  # noqa: E402
+
+COLUMN_INFO = [
+    ("SaleID", "int", "PRI"),
+    ("Paid", "tinyint(1)", ""),
+    ("SaleDate", "date", ""),
+    ("RecordedAt", "datetime", ""),
+    ("TotalPrice", "decimal(10,2)", ""),
+    ("Note", "varchar(100)", ""),
+]
+
+
+class FakeDatabase:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def get_column_info(self, database, table):
+        return COLUMN_INFO
+
+    def iter_table_chunks(self, database, table, chunk_size):
+        description = [(column[0],) for column in COLUMN_INFO]
+        for rows in self.chunks:
+            yield description, rows
+
+
+def test_parquet_export_converts_booleans_and_dates(tmp_path):
+    path = str(tmp_path / "sales.parquet")
+    db = FakeDatabase([
+        # As MySQL returns them
+        [(1, 1, datetime.date(2024, 3, 1), datetime.datetime(2024, 3, 1, 9, 30), Decimal("12.50"), "first"),
+         (2, 0, None, None, None, None)],
+        # As the offline replica returns them
+        [(3, None, "2024-03-02", "2024-03-02 10:15:00", 7.1, 42)],
+    ])
+
+    result = TableExporter(db, "db", "Sale").export(path)
+
+    assert result["rows_exported"] == 3
+    table = pq.read_table(path)
+    assert table.column("Paid").to_pylist() == [True, False, None]
+    assert table.column("SaleDate").to_pylist() == [datetime.date(2024, 3, 1), None, datetime.date(2024, 3, 2)]
+    assert table.column("RecordedAt").to_pylist()[2] == datetime.datetime(2024, 3, 2, 10, 15)
+    assert table.column("TotalPrice").to_pylist() == [Decimal("12.50"), None, Decimal("7.10")]
+    assert table.column("Note").to_pylist() == ["first", None, "42"]
+
+
+def test_csv_export_writes_nulls_as_blanks(tmp_path):
+    path = str(tmp_path / "sales.csv")
+    db = FakeDatabase([[(1, 1, datetime.date(2024, 3, 1), None, Decimal("12.50"), None)]])
+
+    TableExporter(db, "db", "Sale").export(path)
+
+    with open(path) as f:
+        assert f.read().splitlines() == ["SaleID,Paid,SaleDate,RecordedAt,TotalPrice,Note",
+                                         "1,1,2024-03-01,,12.50,"]
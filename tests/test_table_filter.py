@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+from table_filter import DATE_RANGE, EQUALS, PREFIX, RANGE, compile_filters, describe_filters
+
+
+@pytest.mark.parametrize("value, pattern", [
+    ("Apple", "Apple%"),
+    ("50%", "50\\%%"),
+    ("a_b", "a\\_b%"),
+    ("C:\\tmp", "C:\\\\tmp%"),
+    ("\\%_", "\\\\\\%\\_%"),
+])
+def test_prefix_escapes_like_wildcards(value, pattern):
+    where, params = compile_filters({"Name": (PREFIX, value, "")})
+
+    assert where == "`Name` LIKE %s"
+    assert params == [pattern]
+
+
+def test_equals_passes_the_value_as_a_parameter():
+    where, params = compile_filters({"Name": (EQUALS, "O'Brien; DROP TABLE Sale", "")})
+
+    assert where == "`Name` = %s"
+    assert params == ["O'Brien; DROP TABLE Sale"]
+
+
+def test_filters_are_combined_with_and():
+    where, params = compile_filters({
+        "Price": (RANGE, "1", "10"),
+        "SaleDate": (DATE_RANGE, "2024-01-01", "2024-01-31"),
+    })
+
+    assert where == ("`Price` >= %s AND `Price` <= %s AND "
+                     "`SaleDate` >= %s AND `SaleDate` < %s + INTERVAL 1 DAY")
+    assert params == ["1", "10", date(2024, 1, 1), date(2024, 1, 31)]
+
+
+def test_open_ended_range_uses_one_bound():
+    assert compile_filters({"Price": (RANGE, "", "10")}) == ("`Price` <= %s", ["10"])
+
+
+def test_empty_filters_compile_to_nothing():
+    assert compile_filters({"Name": (PREFIX, "  ", ""), "Price": (RANGE, "", "")}) == (None, [])
+
+
+def test_bad_date_is_reported():
+    with pytest.raises(ValueError, match="YYYY-MM-DD"):
+        compile_filters({"SaleDate": (DATE_RANGE, "01/02/2024", "")})
+
+
+def test_describe_filters():
+    text = describe_filters({"Name": (PREFIX, "Ap", ""), "Price": (RANGE, "", "10")})
+
+    assert text == "Name starts with 'Ap'; Price … – 10"